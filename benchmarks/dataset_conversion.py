@@ -0,0 +1,110 @@
+"""
+Compares the dataset conversions on a synthetic plate dataset:
+
+    * dataset_to_dictionary / dictionary_to_dataset: the per-cell Python conversions
+    * dataset_to_dataframe / dataframe_to_dataset: the Polars conversions of dataset_utils
+    * polars from_dicts / polars to_list: letting Polars ingest and build the nested items itself
+
+Reports the mean time and the peak Python memory (tracemalloc, in a separate run) of each
+conversion. Polars' own buffers are allocated outside of Python and not traced.
+Requires polars.
+
+The API payload holds one Python dictionary per cell, so every conversion is bound by
+walking (or creating) those dictionaries. The Polars-native variants are slower than the
+single Python pass used by dataset_utils; the DataFrame conversions exist for convenience,
+not speed.
+
+Usage:
+    python benchmarks/dataset_conversion.py --rows 100000 --columns 8 --rounds 3
+"""
+
+import argparse
+import time
+import tracemalloc
+
+import polars as pl
+
+from bfabric_web_apps.utils.dataset_utils import (
+    dataset_to_dictionary,
+    dictionary_to_dataset,
+    dataset_to_dataframe,
+    dataframe_to_dataset,
+)
+
+
+def make_dictionary(rows, columns):
+    return {
+        f"Column {j}": [f"value {i}-{j}" for i in range(rows)]
+        for j in range(columns)
+    }
+
+
+ITEM_SCHEMA = {
+    "position": pl.Utf8,
+    "field": pl.List(pl.Struct({"attributeposition": pl.Utf8, "value": pl.Utf8})),
+}
+
+
+def polars_from_dicts(dataset):
+    """Polars-native read: ingest the nested items, explode the fields and pivot them into columns."""
+    names = {str(elt["position"]): elt["name"] for elt in dataset["attribute"]}
+    wide = (
+        pl.from_dicts(dataset["item"], schema=ITEM_SCHEMA)
+        .with_columns(pl.col("position").cast(pl.Int64))
+        .explode("field")
+        .unnest("field")
+        .pivot(on="attributeposition", index="position", values="value", aggregate_function="first")
+        .sort("position")
+    )
+    return wide.select([pl.col(position).alias(name) for position, name in names.items()])
+
+
+def polars_to_list(df):
+    """Polars-native write: build the items as a struct column and materialize it with to_list."""
+    fields = [
+        pl.struct(pl.lit(str(j + 1)).alias("attributeposition"), pl.col(name).cast(pl.Utf8).alias("value"))
+        for j, name in enumerate(df.columns)
+    ]
+    items = pl.struct(pl.concat_list(fields).alias("field"), pl.int_range(1, pl.len() + 1).cast(pl.Utf8).alias("position"))
+    return df.select(items.alias("item")).to_series().to_list()
+
+
+def measure(name, func, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        result = func()
+    elapsed = (time.perf_counter() - start) / rounds
+
+    # Memory is traced in a separate run, tracemalloc slows down allocations a lot
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{name:<24} {elapsed * 1000:>10.1f} ms {peak / 2**20:>10.1f} MiB peak")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--columns", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    dictionary = make_dictionary(args.rows, args.columns)
+    dataset = dictionary_to_dataset(dictionary, "benchmark", 1)
+
+    print(f"{args.rows:,d} rows x {args.columns} columns, {args.rounds} round(s)\n")
+
+    measure("dataset_to_dictionary", lambda: dataset_to_dictionary(dataset), args.rounds)
+    df = measure("dataset_to_dataframe", lambda: dataset_to_dataframe(dataset), args.rounds)
+    measure("polars from_dicts", lambda: polars_from_dicts(dataset), args.rounds)
+
+    measure("dictionary_to_dataset", lambda: dictionary_to_dataset(dictionary, "benchmark", 1), args.rounds)
+    measure("dataframe_to_dataset", lambda: dataframe_to_dataset(df, "benchmark", 1), args.rounds)
+    measure("polars to_list", lambda: polars_to_list(df), args.rounds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Measures the cold import time of bfabric_web_apps for the ways it is used:
+
+    * package: `import bfabric_web_apps` alone
+    * worker: what an RQ worker imports to run jobs
+    * cli: what the create_app_in_bfabric tool imports
+    * web app: what a Dash app imports (create_app and the layout)
+    * everything: all exported names resolved, i.e. the cost of the former eager import
+
+Every case runs in a fresh interpreter; the median wall time and the number of
+modules loaded are reported.
+
+Usage:
+    python benchmarks/import_time.py --rounds 5
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+CASES = {
+    "package": "import bfabric_web_apps",
+    "worker": "from bfabric_web_apps.utils.redis_worker_init import run_worker; from bfabric_web_apps import run_main_job",
+    "cli": "from bfabric_web_apps import create_app_in_bfabric",
+    "web app": "from bfabric_web_apps import create_app, get_static_layout",
+    "everything": "import bfabric_web_apps as b; [getattr(b, name) for name in b.__all__]",
+}
+
+PROBE = """
+import sys, time, json
+start = time.perf_counter()
+{statement}
+print(json.dumps({{"seconds": time.perf_counter() - start, "modules": len(sys.modules)}}))
+"""
+
+
+def measure(statement, rounds):
+    seconds, modules = [], 0
+    for _ in range(rounds):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE.format(statement=statement)],
+            capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        seconds.append(result["seconds"])
+        modules = result["modules"]
+    return statistics.median(seconds), modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'case':<12} {'median':>10} {'modules':>8}")
+    for name, statement in CASES.items():
+        try:
+            seconds, modules = measure(statement, args.rounds)
+        except subprocess.CalledProcessError as e:
+            print(f"{name:<12} failed: {e.stderr.strip().splitlines()[-1] if e.stderr else e}")
+            continue
+        print(f"{name:<12} {seconds * 1000:>8.1f} ms {modules:>8d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Compares the payload size and round-trip time of the Logger serialization paths:
+
+    * legacy pickle: the Logger pickled together with its live power user wrapper
+    * to_pickle / from_pickle: the Logger pickled without the wrapper
+    * to_dict / from_dict: the compact, JSON-compatible form
+
+Requires a valid B-Fabric config file (CONFIG_FILE_PATH) for the chosen environment.
+
+Usage:
+    python benchmarks/logger_serialization.py --environment test --lines 50 --rounds 200
+"""
+
+import argparse
+import base64
+import json
+import pickle
+import time
+
+from bfabric_web_apps.objects.Logger import Logger
+
+
+def legacy_to_pickle(logger):
+    """The pre-lazy payload: the pickled object including the live B-Fabric client."""
+    state = dict(logger.__dict__, _power_user_wrapper=logger.power_user_wrapper)
+    return {"data": base64.b64encode(pickle.dumps(state)).decode("utf-8")}
+
+
+def legacy_from_pickle(payload):
+    state = pickle.loads(base64.b64decode(payload["data"].encode("utf-8")))
+    logger = Logger.__new__(Logger)
+    logger.__dict__.update(state)
+    return logger
+
+
+def measure(name, dump, load, logger, rounds):
+    payload = dump(logger)
+    size = len(json.dumps(payload))
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        restored = load(json.loads(json.dumps(dump(logger))))
+        restored.power_user_wrapper  # Include wrapper resolution on the receiving side
+    elapsed = (time.perf_counter() - start) / rounds
+
+    print(f"{name:<12} {size:>12,d} bytes {elapsed * 1000:>10.3f} ms/round-trip")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--environment", default="test")
+    parser.add_argument("--lines", type=int, default=50, help="Number of pending log lines")
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    logger = Logger(jobid=1, username="benchmark", environment=args.environment)
+    for i in range(args.lines):
+        logger.log_operation("benchmark", f"Pending log line {i}", flush_logs=False)
+
+    measure("legacy", legacy_to_pickle, legacy_from_pickle, logger, args.rounds)
+    measure("to_pickle", Logger.to_pickle, Logger.from_pickle, logger, args.rounds)
+    measure("to_dict", Logger.to_dict, Logger.from_dict, logger, args.rounds)
+
+
+if __name__ == "__main__":
+    main()
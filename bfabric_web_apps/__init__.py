@@ -1,70 +1,126 @@
-import os
-
-# Export objects and classes
-from bfabric_web_apps.objects import BfabricInterface, Logger
-from bfabric_web_apps.objects.BfabricInterface import bfabric_interface
-
-# Export components
-from .utils import components
-
-# Export layouts
-from .layouts.layouts import get_static_layout
-
-# Export app initialization utilities
-from .utils.app_init import create_app
-from .utils.get_logger import get_logger
-from .utils.get_power_user_wrapper import get_power_user_wrapper
-from .utils.create_app_in_bfabric import create_app_in_bfabric
-from .utils.dataset_utils import (
-    dataset_to_dictionary, 
-    dictionary_to_dataset
+import importlib
+
+# The public API is resolved lazily (see __getattr__): `import bfabric_web_apps` stays cheap for
+# RQ workers and CLI tools, and dash, rq, redis and bfabric are only imported by the names that need them.
+
+# Exported modules: {name: module}
+_MODULES = {
+    "BfabricInterface": "bfabric_web_apps.objects.BfabricInterface",
+    "Logger": "bfabric_web_apps.objects.Logger",
+    "components": "bfabric_web_apps.utils.components",
+}
+
+# Exported objects, classes and functions: {module: names}
+_EXPORTS = {
+    # Export objects and classes
+    "bfabric_web_apps.objects.BfabricInterface": ("bfabric_interface",),
+
+    # Export layouts
+    "bfabric_web_apps.layouts.layouts": ("get_static_layout",),
+
+    # Export app initialization utilities
+    "bfabric_web_apps.utils.app_init": ("create_app",),
+    "bfabric_web_apps.utils.get_logger": ("get_logger",),
+    "bfabric_web_apps.utils.get_power_user_wrapper": ("get_power_user_wrapper", "clear_power_user_wrappers"),
+    "bfabric_web_apps.utils.create_app_in_bfabric": ("create_app_in_bfabric",),
+    "bfabric_web_apps.utils.dataset_utils": (
+        "dataset_to_dictionary",
+        "dictionary_to_dataset",
+        "dataset_to_dataframe",
+        "dataset_to_arrow",
+        "dataframe_to_dataset",
+        "check_column_lengths",
+        "diff_dataset",
+        "dataset_patch",
+    ),
+
+    # Export callbacks
+    "bfabric_web_apps.utils.callbacks": (
+        "process_url_and_token",
+        "process_url_and_token_to_session",
+        "bootstrap_session",
+        "submit_bug_report",
+        "populate_workunit_details",
+        "get_redis_queue_layout",
+        "get_redis_queue_updates",
+    ),
+
+    "bfabric_web_apps.utils.components": ("no_auth", "expired", "no_entity", "dev", "auth", "charge_switch"),
+
+    "bfabric_web_apps.utils.run_main_pipeline": ("run_main_job", "read_file_as_bytes"),
+    "bfabric_web_apps.utils.file_staging": ("stage_file", "stage_bytes", "cleanup_staging"),
+    "bfabric_web_apps.utils.session_store": ("create_session", "load_session", "delete_session"),
+
+    "bfabric_web_apps.utils.resource_utilities": (
+        "create_workunit",
+        "create_resource",
+        "create_workunits",
+        "create_workunits_batch",
+        "create_resources",
+        "register_resources",
+    ),
+
+    "bfabric_web_apps.utils.charging": ("create_charge",),
+    "bfabric_web_apps.utils.redis_worker_init": ("run_worker", "test_job"),
+    "bfabric_web_apps.utils.redis_queue": ("q", "scheduler"),
+    "bfabric_web_apps.utils.redis_connection": ("get_redis_connection", "redis_pool_stats"),
+    "bfabric_web_apps.utils.job_events": ("register_job_events",),
+}
+
+_ATTRIBUTES = {name: module for module, names in _EXPORTS.items() for name in names}
+
+# Settings exported as module constants, read from `config` on first access
+_SETTINGS = (
+    "REDIS_HOST",
+    "REDIS_PORT",
+
+    "HOST",
+    "PORT",
+    "DEV",
+    "DEBUG",
+
+    "CONFIG_FILE_PATH",
+
+    "DEVELOPER_EMAIL_ADDRESS",
+    "BUG_REPORT_EMAIL_ADDRESS",
+
+    "GSTORE_REMOTE_PATH",
+    "SCRATCH_PATH",
+    "TRX_LOGIN",
+    "TRX_SSH_KEY",
+    "URL",
+
+    "SERVICE_ID",
+    "DATASET_TEMPLATE_ID",
+
+    "REDIS_USERNAME",
+    "REDIS_PASSWORD",
 )
 
-# Export callbacks
-from .utils.callbacks import (
-    process_url_and_token, 
-    submit_bug_report,
-    populate_workunit_details,
-    get_redis_queue_layout
-)
-
-from .utils.config import settings as config
-from .utils.components import no_auth, expired, no_entity, dev, auth, charge_switch
-
-from. utils.run_main_pipeline import run_main_job, read_file_as_bytes
-
-from .utils.resource_utilities import (
-    create_workunit, 
-    create_resource, 
-    create_workunits, 
-    create_resources
-)
-
-from .utils.charging import create_charge
-from .utils.redis_worker_init import run_worker, test_job
-from .utils.redis_queue import q
-
-REDIS_HOST = config.REDIS_HOST
-REDIS_PORT = config.REDIS_PORT
+__all__ = sorted(set(_MODULES) | set(_ATTRIBUTES) | set(_SETTINGS) | {"config"})
 
-HOST = config.HOST
-PORT = config.PORT
-DEV = config.DEV
-DEBUG = config.DEBUG
 
-CONFIG_FILE_PATH = config.CONFIG_FILE_PATH
+def __getattr__(name):
+    """
+    Imports an exported name on first access and caches it in the module namespace.
 
-DEVELOPER_EMAIL_ADDRESS = config.DEVELOPER_EMAIL_ADDRESS
-BUG_REPORT_EMAIL_ADDRESS = config.BUG_REPORT_EMAIL_ADDRESS
+    A constant assigned by the application (e.g. `bfabric_web_apps.CONFIG_FILE_PATH = ...`)
+    is stored in the namespace as well, so it takes precedence and this is not called for it.
+    """
+    if name in _MODULES:
+        value = importlib.import_module(_MODULES[name])
+    elif name in _ATTRIBUTES:
+        value = getattr(importlib.import_module(_ATTRIBUTES[name]), name)
+    elif name == "config":
+        value = importlib.import_module("bfabric_web_apps.utils.config").settings
+    elif name in _SETTINGS:
+        value = getattr(__getattr__("config"), name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-GSTORE_REMOTE_PATH = config.GSTORE_REMOTE_PATH
-SCRATCH_PATH = config.SCRATCH_PATH
-TRX_LOGIN = config.TRX_LOGIN
-TRX_SSH_KEY = config.TRX_SSH_KEY
-URL = config.URL
+    globals()[name] = value
+    return value
 
-SERVICE_ID = config.SERVICE_ID
-DATASET_TEMPLATE_ID = config.DATASET_TEMPLATE_ID
 
-REDIS_USERNAME = config.REDIS_USERNAME
-REDIS_PASSWORD = config.REDIS_PASSWORD
\ No newline at end of file
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,3 +1,5 @@
+import warnings
+
 from dash import html, dcc
 import dash_bootstrap_components as dbc
 import bfabric_web_apps
@@ -12,6 +14,10 @@ def get_static_layout(base_title=None, main_content=None, documentation_content=
         main_content (html.Div): Content to be displayed in the "Main" tab.
         documentation_content (html.Div): Content for the "Documentation" tab.
         layout_config (dict): Configuration for the layout, determining which tabs are shown.
+            "client_stores": True keeps the token, entity, app data and token data in browser
+            stores, False keeps them only in the server-side session (see `load_session`).
+            Without the key, the browser stores are added and a DeprecationWarning is emitted,
+            because a future release will default to the server-side session only.
 
     Returns:
         html.Div: The complete static layout of the web app.
@@ -25,10 +31,33 @@ def get_static_layout(base_title=None, main_content=None, documentation_content=
     if layout_config.get("workunits", False):
         tab_list.append(dbc.Tab(dcc.Loading(get_workunits_tab()), label="Workunits", tab_id="workunits"))
     if layout_config.get("queue", False):
-        tab_list.append(dbc.Tab(get_queue_tab(), label="Queue", tab_id="queue"))
+        tab_list.append(dbc.Tab(get_queue_tab(push=layout_config.get("queue_push", False)), label="Queue", tab_id="queue"))
     if layout_config.get("bug", False):
         tab_list.append(dbc.Tab(dcc.Loading(get_report_bug_tab()), label="Report a Bug", tab_id="report-bug"))
 
+    # The session_id store is always present; the browser stores stay the default until apps have migrated
+    client_stores = layout_config.get("client_stores")
+    if client_stores is None:
+        warnings.warn(
+            "get_static_layout() will no longer add the 'token', 'token_data', 'entity', 'app_data' and "
+            "'dynamic-link-store' stores by default in a future release. Read the session with "
+            "load_session(session_id) and set layout_config={'client_stores': False}, or set "
+            "layout_config={'client_stores': True} to keep the stores.",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+        client_stores = True
+
+    session_stores = []
+    if client_stores:
+        session_stores = [
+            dcc.Store(id='token', storage_type='session'),
+            dcc.Store(id='entity', storage_type='session'),
+            dcc.Store(id='app_data', storage_type='session'),
+            dcc.Store(id='token_data', storage_type='session'),
+            dcc.Store(id='dynamic-link-store', storage_type='session'),  # Store for dynamic job link
+        ]
+
     if not include_header:
         header_row = dbc.Row()
 
@@ -88,11 +117,8 @@ def get_static_layout(base_title=None, main_content=None, documentation_content=
     return html.Div(
         children=[
             dcc.Location(id='url', refresh=False),
-            dcc.Store(id='token', storage_type='session'),
-            dcc.Store(id='entity', storage_type='session'),
-            dcc.Store(id='app_data', storage_type='session'),
-            dcc.Store(id='token_data', storage_type='session'),
-            dcc.Store(id='dynamic-link-store', storage_type='session'),  # Store for dynamic job link
+            dcc.Store(id='session_id', storage_type='session'),  # Server-side session ID, see load_session
+            *session_stores,
 
             dbc.Container(
                 children=[
@@ -323,7 +349,23 @@ def get_workunits_tab():
     )
 
 
-def get_queue_tab(): 
+def get_queue_tab(push=False):
+    """
+    Returns the Queue tab.
+
+    Args:
+        push (bool): Refresh on job events pushed by the workers (see `register_job_events`)
+                     instead of polling. The interval then only fires every JOB_EVENTS_FALLBACK_INTERVAL seconds.
+
+    Returns:
+        dbc.Row: The Queue tab content.
+    """
+    interval = bfabric_web_apps.config.JOB_EVENTS_FALLBACK_INTERVAL if push else 5
+
+    push_stores = [
+        dcc.Store(id="queue-events"),  # Latest job event, written by the clientside EventSource
+        dcc.Store(id="queue-events-url", data=bfabric_web_apps.config.JOB_EVENTS_PATH),
+    ] if push else []
 
     return dbc.Row(
         id="page-content-queue",
@@ -346,9 +388,11 @@ def get_queue_tab():
                 children = [
                     dcc.Interval(
                         id="queue-interval",
-                        interval=5 * 1000,  # in milliseconds
+                        interval=interval * 1000,  # in milliseconds
                         n_intervals=0,
                     ),
+                    dcc.Store(id="queue-cursor"),  # Change cursor for get_redis_queue_updates
+                    *push_stores,
                 ],
                 style={"display": "none"}
             )
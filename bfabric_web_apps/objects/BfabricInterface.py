@@ -6,7 +6,11 @@ import bfabric
 from bfabric import BfabricAuth
 from bfabric import BfabricClientConfig
 from bfabric_web_apps.utils.get_logger import get_logger
+from bfabric_web_apps.utils.get_power_user_wrapper import get_power_user_wrapper
+from bfabric_web_apps.objects.TTLCache import TTLCache
 import os
+import hashlib
+import time
 import bfabric_web_apps
 
 from bfabric_web_apps.utils.config import settings
@@ -14,9 +18,24 @@ from bfabric_web_apps.utils.config import settings
 HOST = settings.PRODUCTION_BFABRIC_DOMAIN
 VALIDATION_URL = f"https://{HOST}/bfabric/rest/token/validate?token="
 
+ENTITY_CLASS_MAP = {
+    "Run": "run",
+    "Sample": "sample",
+    "Project": "container",
+    "Order": "container",
+    "Container": "container",
+    "Plate": "plate",
+    "Workunit": "workunit",
+    "Resource": "resource",
+    "Dataset": "dataset"
+}
+
 class BfabricInterface( Bfabric ):
     _instance = None  # Singleton instance
-    _wrapper = None   # Shared wrapper instance
+    _wrappers = TTLCache(maxsize=settings.WRAPPER_POOL_SIZE, ttl=settings.WRAPPER_POOL_IDLE_TIMEOUT)  # (login, environment) -> (password hash, wrapper)
+    _token_cache = TTLCache(maxsize=settings.TOKEN_CACHE_SIZE, ttl=settings.TOKEN_CACHE_TTL)  # Validated tokens
+    _entity_cache = TTLCache(maxsize=settings.ENTITY_CACHE_SIZE, ttl=settings.ENTITY_CACHE_TTL)  # (environment, endpoint, id) -> (checked at, entity)
+    _app_data_cache = TTLCache(maxsize=settings.APP_DATA_CACHE_SIZE, ttl=settings.APP_DATA_CACHE_TTL)  # (environment, app id) -> app data JSON
     """
     A class to interface with the Bfabric API, providing methods to validate tokens,
     retrieve data, and send bug reports.
@@ -33,28 +52,79 @@ class BfabricInterface( Bfabric ):
         if cls._instance is None:
             cls._instance = super(BfabricInterface, cls).__new__(cls)
         return cls._instance
+
+    @staticmethod
+    def _wrapper_key(token_data):
+        """Return the pool key (user login, environment) for the given token data."""
+        return (
+            str(token_data.get("user_data")),
+            str(token_data.get("environment", "")).strip().lower()
+        )
     
     def _initialize_wrapper(self, token_data):
-        """Internal method to initialize the Bfabric wrapper after token validation."""
+        """
+        Internal method to initialize the Bfabric wrapper after token validation.
+
+        Wrappers are pooled per user login and environment, so concurrent sessions each reuse
+        their own authenticated client. Idle wrappers are evicted after WRAPPER_POOL_IDLE_TIMEOUT
+        seconds and the pool never holds more than WRAPPER_POOL_SIZE clients.
+        """
         if not token_data:
             raise ValueError("Token data is required to initialize the wrapper.")
 
-        # Create and store the wrapper
-        if self._wrapper is None:
-            self._wrapper = self.token_response_to_bfabric(token_data)
+        key = self._wrapper_key(token_data)
+        password_hash = hashlib.sha256(str(token_data.get("userWsPassword")).encode("utf-8")).hexdigest()
+
+        # Create the wrapper unless this user already has one with the same credentials
+        entry = self._wrappers.get(key)
+        if entry is None or entry[0] != password_hash:
+            entry = (password_hash, self.token_response_to_bfabric(token_data))
+
+        # (Re)storing the entry also resets its idle timer
+        self._wrappers.set(key, entry)
+
+        return entry[1]
+
+
+    def get_wrapper(self, token_data):
+        """
+        Return the wrapper of the given session.
+
+        The pooled wrapper is only reused if it was created with the same credentials
+        as the session's token data; otherwise a new one is created.
+
+        Args:
+            token_data (dict): Token data of the session.
 
+        Returns:
+            Bfabric: An authenticated Bfabric instance.
 
-    def get_wrapper(self):
-        """Return the existing wrapper or raise an error if not initialized."""
-        if self._wrapper is None:
+        Raises:
+            RuntimeError: If the token data holds no credentials, i.e. the token was not validated.
+        """
+        if not token_data or not token_data.get("userWsPassword"):
             raise RuntimeError("Bfabric wrapper is not initialized. Token validation must run first.")
-        return self._wrapper
+
+        return self._initialize_wrapper(token_data)
+
+    def wrapper_pool_stats(self) -> dict:
+        """
+        Returns the size and hit/miss counters of the per-user wrapper pool.
+
+        Returns:
+            dict: The pool statistics.
+        """
+        return self._wrappers.stats()
     
 
     def token_to_data(self, token):
         """
         Validates the given token and retrieves its associated data.
 
+        Successful validations are cached (keyed by a hash of the token) until the
+        earlier of TOKEN_CACHE_TTL and the token's expiryDateTime, so page refreshes
+        and callbacks reuse the parsed token data instead of calling B-Fabric again.
+
         Args:
             token (str): The token to validate.
 
@@ -67,6 +137,12 @@ class BfabricInterface( Bfabric ):
         if not token:
             return None
 
+        cache_key = hashlib.sha256(token.encode("utf-8")).hexdigest()
+        cached = self._token_cache.get(cache_key)
+        if cached is not None:
+            self._initialize_wrapper(json.loads(cached))
+            return cached
+
         validation_url = VALIDATION_URL + token
         res = requests.get(validation_url, headers={"Host": HOST})
 
@@ -112,6 +188,12 @@ class BfabricInterface( Bfabric ):
             # Initialize the wrapper right after validating the token
             self._initialize_wrapper(token_data)
 
+            token_data_json = json.dumps(token_data)
+
+            # Cache the validated token, but never beyond its expiry time
+            seconds_left = (datetime.datetime.strptime(expiry_time, "%Y-%m-%d %H:%M:%S") - current_time).total_seconds()
+            self._token_cache.set(cache_key, token_data_json, ttl=min(settings.TOKEN_CACHE_TTL, seconds_left))
+
             # Log the token validation process
             L = get_logger(token_data)
             L.log_operation(
@@ -121,10 +203,29 @@ class BfabricInterface( Bfabric ):
                     flush_logs=True
                 )
 
-            return json.dumps(token_data)
+            return token_data_json
         
 
 
+    def token_cache_stats(self) -> dict:
+        """
+        Returns the hit/miss counters of the token validation cache.
+
+        Returns:
+            dict: The cache statistics.
+        """
+        return self._token_cache.stats()
+
+    def invalidate_token(self, token):
+        """
+        Removes a token from the validation cache, forcing the next call to validate it again.
+
+        Args:
+            token (str): The token to invalidate.
+        """
+        if token:
+            self._token_cache.invalidate(hashlib.sha256(token.encode("utf-8")).hexdigest())
+
     def token_response_to_bfabric(self, token_response):
 
         """
@@ -150,6 +251,14 @@ class BfabricInterface( Bfabric ):
         """
         Retrieves entity data associated with the provided token.
 
+        The full entity is kept in a process-wide cache keyed by (environment, endpoint, id),
+        so users opening the same entity share one copy. A cached entity is served without
+        any API call for ENTITY_CACHE_REVALIDATE_AFTER seconds; after that it is revalidated
+        with a read conditioned on its `modified` timestamp, and only re-read when it changed.
+
+        The returned JSON holds the display fields and an `entity_handle`. The full API response
+        is only included with ENTITY_DATA_INCLUDE_FULL_RESPONSE; otherwise use `entity_full_response`.
+
         Args:
             token_data (dict): The token data.
 
@@ -158,24 +267,12 @@ class BfabricInterface( Bfabric ):
             {}: If the retrieval fails or token_data is invalid.
         """
 
-        entity_class_map = {
-            "Run": "run",
-            "Sample": "sample",
-            "Project": "container",
-            "Order": "container",
-            "Container": "container",
-            "Plate": "plate",
-            "Workunit": "workunit",
-            "Resource": "resource",
-            "Dataset": "dataset"
-        }
-
         if not token_data:
             return json.dumps({})
         
-        wrapper = self.get_wrapper()
+        wrapper = self.get_wrapper(token_data)
         entity_class = token_data.get('entityClass_data', None)
-        endpoint = entity_class_map.get(entity_class, None)
+        endpoint = ENTITY_CLASS_MAP.get(entity_class, None)
         entity_id = token_data.get('entity_id_data', None)
         jobId = token_data.get('jobId', None)
         username = token_data.get("user_data", "None")
@@ -183,27 +280,25 @@ class BfabricInterface( Bfabric ):
 
         if wrapper and entity_class and endpoint and entity_id and jobId:
             L = get_logger(token_data)
-            
-            # Log the read operation directly using Logger L
-            entity_data_dict = L.logthis(
-                api_call=wrapper.read,
-                endpoint=endpoint,
-                obj={"id": entity_id},
-                max_results=None,
-                params=None,
-                flush_logs=False
-            )[0]
 
-            
+            handle = {
+                "environment": str(environment).strip().lower(),
+                "endpoint": endpoint,
+                "id": entity_id,
+            }
+            entity_data_dict = self._read_entity(wrapper, L, handle)
+
             if entity_data_dict:
-                json_data = json.dumps({
+                entity_data = {
                     "name": entity_data_dict.get("name", ""),
                     "createdby": entity_data_dict.get("createdby"),
                     "created": entity_data_dict.get("created"),
                     "modified": entity_data_dict.get("modified"),
-                    "full_api_response": entity_data_dict,
-                })
-                return json_data
+                    "entity_handle": handle,
+                }
+                if settings.ENTITY_DATA_INCLUDE_FULL_RESPONSE:
+                    entity_data["full_api_response"] = entity_data_dict
+                return json.dumps(entity_data)
             else:
                 L.log_operation(
                     operation="entity_data",
@@ -217,12 +312,91 @@ class BfabricInterface( Bfabric ):
         else:
             print("Invalid input or entity information")
             return json.dumps({})
+
+    def _read_entity(self, wrapper, L, handle: dict):
+        """Returns the full entity for a handle, using and maintaining the shared entity cache."""
+        cache_key = (handle["environment"], handle["endpoint"], str(handle["id"]))
+        cached = self._entity_cache.get(cache_key)
+
+        if cached is not None:
+            checked_at, entity = cached
+            if time.monotonic() - checked_at < settings.ENTITY_CACHE_REVALIDATE_AFTER:
+                return entity
+
+            # Only fetch the entity again if it was modified since it was cached. An unchanged
+            # entity yields an empty result; errors of the read are raised to the caller.
+            if entity.get("modified"):
+                changed = wrapper.read(
+                    handle["endpoint"],
+                    {"id": handle["id"], "modifiedafter": entity.get("modified")},
+                    max_results=None
+                )
+                if len(changed) == 0:
+                    self._entity_cache.set(cache_key, (time.monotonic(), entity))
+                    return entity
+
+        # Log the read operation directly using Logger L
+        result = L.logthis(
+            api_call=wrapper.read,
+            endpoint=handle["endpoint"],
+            obj={"id": handle["id"]},
+            max_results=None,
+            params=None,
+            flush_logs=False
+        )
+        entity = result[0] if result else None
+
+        if entity:
+            self._entity_cache.set(cache_key, (time.monotonic(), entity))
+        return entity
+
+    def entity_full_response(self, entity_data: dict, token_data: dict = None) -> dict:
+        """
+        Returns the full B-Fabric API response of an entity returned by `entity_data`.
+
+        Args:
+            entity_data (dict): The (parsed) entity data of the session.
+            token_data (dict, optional): The token data, used to read the entity again if it is no longer cached.
+
+        Returns:
+            dict: The full API response, or {} if it is not available.
+        """
+        if not entity_data:
+            return {}
+        if "full_api_response" in entity_data:
+            return entity_data["full_api_response"]
+
+        handle = entity_data.get("entity_handle")
+        if not handle:
+            return {}
+
+        cached = self._entity_cache.get((handle["environment"], handle["endpoint"], str(handle["id"])))
+        if cached is not None:
+            return cached[1]
+
+        if token_data:
+            return self._read_entity(self.get_wrapper(token_data), get_logger(token_data), handle) or {}
+        return {}
+
+    def invalidate_entity(self, environment: str, endpoint: str, entity_id):
+        """
+        Removes an entity from the shared entity cache.
+
+        Args:
+            environment (str): The environment of the entity.
+            endpoint (str): The B-Fabric endpoint of the entity (e.g. "container").
+            entity_id (int): The ID of the entity.
+        """
+        self._entity_cache.invalidate((str(environment).strip().lower(), endpoint, str(entity_id)))
         
 
     def app_data(self, token_data: dict) -> str:
         """
         Retrieves application data (App Name and Description) associated with the provided token.
 
+        Application metadata is shared by all users of a deployment, so successful lookups are
+        cached process-wide per (environment, application ID) for APP_DATA_CACHE_TTL seconds.
+
         Args:
             token_data (dict): The token data.
 
@@ -243,6 +417,11 @@ class BfabricInterface( Bfabric ):
             print("Invalid application_data format in token_data")
             return json.dumps({})  # Return empty JSON if app_id is invalid
 
+        cache_key = (str(token_data.get("environment", "")).strip().lower(), app_id)
+        cached = self._app_data_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         # Define API endpoint
         endpoint = "application"
         
@@ -250,7 +429,7 @@ class BfabricInterface( Bfabric ):
         L = get_logger(token_data)
         
         # Get API wrapper
-        wrapper = self.get_wrapper()
+        wrapper = self.get_wrapper(token_data)
         if not wrapper:
             print("Failed to get Bfabric API wrapper")
             return json.dumps({})
@@ -278,13 +457,61 @@ class BfabricInterface( Bfabric ):
         # Extract App ID, Name, and Description
         app_info = app_data_dict[0]  # First (and only) result
 
-        json_data = json.dumps({
+        json_data = self._app_info_to_json(app_info)
+        self._app_data_cache.set(cache_key, json_data)
+
+        return json_data
+
+    @staticmethod
+    def _app_info_to_json(app_info: dict) -> str:
+        """Extracts the App ID, Name, and Description of an application API response as a JSON string."""
+        return json.dumps({
             "id": app_info.get("id", "Unknown"),
             "name": app_info.get("name", "Unknown"),
             "description": app_info.get("description", "No description available")
         })
 
-        return json_data
+    def warm_app_data(self, app_ids, environment: str = "production") -> int:
+        """
+        Pre-loads the application metadata cache using the power user's credentials.
+
+        Args:
+            app_ids (list[int]): IDs of the applications to load.
+            environment (str, optional): The environment (e.g., production, test). Defaults to "production".
+
+        Returns:
+            int: Number of applications cached.
+        """
+        if not isinstance(app_ids, (list, tuple, set)):
+            app_ids = [app_ids]
+
+        environment = str(environment).strip().lower()
+        wrapper = get_power_user_wrapper({"environment": environment})
+
+        try:
+            applications = wrapper.read("application", {"id": [int(app_id) for app_id in app_ids]}, max_results=None)
+        except Exception as e:
+            print(f"Failed to warm up application data for {list(app_ids)}: {e}")
+            return 0
+
+        for app_info in applications:
+            self._app_data_cache.set((environment, int(app_info["id"])), self._app_info_to_json(app_info))
+
+        return len(applications)
+
+    def invalidate_app_data(self, environment: str = None, app_id: int = None):
+        """
+        Removes application metadata from the cache.
+
+        Args:
+            environment (str, optional): Environment of the application to invalidate.
+            app_id (int, optional): ID of the application to invalidate.
+                If either argument is omitted, the whole application cache is cleared.
+        """
+        if environment is None or app_id is None:
+            self._app_data_cache.clear()
+        else:
+            self._app_data_cache.invalidate((str(environment).strip().lower(), int(app_id)))
      
     
     def send_bug_report(self, token_data = None, entity_data = None, description = None):
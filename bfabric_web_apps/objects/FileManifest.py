@@ -0,0 +1,200 @@
+import os
+import posixpath
+from array import array
+from fnmatch import fnmatchcase
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from bfabric_web_apps.utils.config import settings
+
+# How symbolic links are treated while scanning:
+#   "skip":   ignored
+#   "files":  links to files are listed, links to directories are not descended into (like Path.rglob)
+#   "follow": links to files are listed and links to directories are descended into, each directory once
+SYMLINK_POLICIES = ("skip", "files", "follow")
+
+
+class FileManifest:
+    """
+    Compact list of the files found under a set of root paths, each tagged with a value
+    (e.g. the container ID of its root).
+
+    Every directory path is stored once in a table, and each file only keeps the index of
+    its directory, its name and the index of its tag in two arrays. Millions of files
+    then cost about one name string each instead of one full path string plus a dict entry.
+    """
+
+    def __init__(self):
+        self.dirs = []              # Directory paths, shared by their files
+        self.tags = []              # Distinct tag values
+        self.names = []             # File names
+        self.dir_ids = array("L")   # Directory index of each file
+        self.tag_ids = array("L")   # Tag index of each file
+        self.missing = []           # Roots that do not exist
+        self.errors = []            # (path, error message) of directories and entries that could not be read
+        self._tag_index = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def __iter__(self):
+        """
+        Yields the files.
+
+        Yields:
+            tuple: (file path, tag).
+        """
+        dirs, tags = self.dirs, self.tags
+        for dir_id, name, tag_id in zip(self.dir_ids, self.names, self.tag_ids):
+            yield os.path.join(dirs[dir_id], name), tags[tag_id]
+
+    def _add_dir(self, path):
+        self.dirs.append(path)
+        return len(self.dirs) - 1
+
+    def _tag_id(self, tag):
+        if tag not in self._tag_index:
+            self._tag_index[tag] = len(self.tags)
+            self.tags.append(tag)
+        return self._tag_index[tag]
+
+    def _add_files(self, dir_id, names, tag_id):
+        self.names.extend(names)
+        self.dir_ids.extend([dir_id] * len(names))
+        self.tag_ids.extend([tag_id] * len(names))
+
+    @classmethod
+    def scan(cls, roots: dict, include=None, exclude=None, symlinks: str = None, max_workers: int = None):
+        """
+        Lists all files under the given roots, scanning directories in parallel with os.scandir.
+
+        Glob patterns containing a "/" are matched against the path relative to the root,
+        other patterns against the file name. A directory matching an exclude pattern is
+        not scanned. Roots that are files are always listed.
+
+        Args:
+            roots (dict): {file or directory path: tag}.
+            include (list[str], optional): Only list files matching one of these patterns. Defaults to all files.
+            exclude (list[str], optional): Skip files and directories matching one of these patterns.
+            symlinks (str, optional): "skip", "files" or "follow" (see SYMLINK_POLICIES). Defaults to MANIFEST_SYMLINKS.
+            max_workers (int, optional): Directories scanned at once. Defaults to MANIFEST_SCAN_WORKERS.
+
+        Returns:
+            FileManifest: The manifest. Roots that do not exist are listed in `missing`, and
+            directories or entries that could not be read in `errors`.
+
+        Raises:
+            ValueError: If the symlink policy is unknown.
+        """
+        symlinks = symlinks or settings.MANIFEST_SYMLINKS
+        if symlinks not in SYMLINK_POLICIES:
+            raise ValueError(f"Unknown symlink policy '{symlinks}', expected one of {SYMLINK_POLICIES}")
+
+        include = list(include or [])
+        exclude = list(exclude or [])
+        manifest = cls()
+        visited = set()  # (device, inode) of the scanned directories, when following links
+
+        def matches(patterns, rel_path, name):
+            return any(fnmatchcase(rel_path if "/" in pattern else name, pattern) for pattern in patterns)
+
+        def scan_dir(path, rel_path):
+            # Runs in a worker thread: returns the listed file names, the subdirectories to scan and the errors
+            files, subdirs, errors = [], [], []
+            try:
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        entry_rel = posixpath.join(rel_path, entry.name) if rel_path else entry.name
+                        try:
+                            is_link = entry.is_symlink()
+                            if is_link and symlinks == "skip":
+                                continue
+                            if entry.is_dir(follow_symlinks=symlinks == "follow"):
+                                if not matches(exclude, entry_rel, entry.name):
+                                    subdirs.append((entry.path, entry_rel))
+                            elif entry.is_file():
+                                if exclude and matches(exclude, entry_rel, entry.name):
+                                    continue
+                                if include and not matches(include, entry_rel, entry.name):
+                                    continue
+                                files.append(entry.name)
+                        except OSError as e:
+                            errors.append((entry.path, str(e)))  # Entry vanished or is not accessible
+            except OSError as e:
+                errors.append((path, str(e)))
+            return files, subdirs, errors
+
+        def first_visit(path):
+            if symlinks != "follow":
+                return True
+            try:
+                stat = os.stat(path)
+            except OSError:
+                return False
+            key = (stat.st_dev, stat.st_ino)
+            if key in visited:
+                return False
+            visited.add(key)
+            return True
+
+        with ThreadPoolExecutor(max_workers=max_workers or settings.MANIFEST_SCAN_WORKERS) as executor:
+            running = {}
+
+            def submit(path, rel_path, tag_id):
+                if first_visit(path):
+                    running[executor.submit(scan_dir, path, rel_path)] = (path, tag_id)
+
+            for root, tag in roots.items():
+                path = Path(root)
+                tag_id = manifest._tag_id(tag)
+                if path.is_file():
+                    manifest._add_files(manifest._add_dir(os.path.dirname(str(path))), [path.name], tag_id)
+                elif path.is_dir():
+                    submit(str(path), "", tag_id)
+                else:
+                    manifest.missing.append(root)
+
+            # Results are only merged here, in the calling thread, so the tables need no locking
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path, tag_id = running.pop(future)
+                    files, subdirs, errors = future.result()
+                    manifest.errors.extend(errors)
+                    if files:
+                        manifest._add_files(manifest._add_dir(path), files, tag_id)
+                    for subdir, rel_path in subdirs:
+                        submit(subdir, rel_path, tag_id)
+
+        return manifest
+
+    def counts(self):
+        """
+        Returns the number of files per tag.
+
+        Returns:
+            dict: {tag: number of files}.
+        """
+        counts = [0] * len(self.tags)
+        for tag_id in self.tag_ids:
+            counts[tag_id] += 1
+        return dict(zip(self.tags, counts))
+
+    def join(self, values: dict):
+        """
+        Maps every file to the value of its tag, lazily in a single pass over the files.
+
+        The paths are built one at a time, so e.g. `register_resources` can consume them
+        without a {file path: value} dictionary of all files.
+
+        Args:
+            values (dict): {tag: value}, e.g. {container ID: workunit ID}.
+
+        Yields:
+            tuple: (file path, value) for the files whose tag has a value.
+        """
+        dirs = self.dirs
+        by_tag_id = [values.get(tag) for tag in self.tags]  # Looked up once per tag, not once per file
+        for dir_id, name, tag_id in zip(self.dir_ids, self.names, self.tag_ids):
+            if by_tag_id[tag_id] is not None:
+                yield os.path.join(dirs[dir_id], name), by_tag_id[tag_id]
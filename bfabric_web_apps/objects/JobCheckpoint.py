@@ -0,0 +1,197 @@
+import json
+
+from bfabric_web_apps.utils.config import settings
+
+
+class JobCheckpoint:
+    """
+    Records the completed steps of a queued job, and their outputs, in Redis.
+
+    When an RQ job is retried or requeued after its worker died, it runs again under the
+    same job ID and finds the checkpoint of the previous attempt, so finished steps can be
+    skipped and their outputs (e.g. the created workunits) reused.
+
+    Outside of an RQ worker, or with CHECKPOINTS_ENABLED off, the checkpoint is disabled:
+    nothing is recorded and every step runs.
+    """
+
+    def __init__(self, job_id: str = None, connection=None, ttl: int = None):
+        """
+        Initializes the checkpoint of a job.
+
+        Args:
+            job_id (str, optional): The RQ job ID. None disables the checkpoint.
+            connection (redis.Redis, optional): Redis connection. Defaults to the shared connection.
+            ttl (int, optional): Seconds the checkpoint is kept after its last update. Defaults to CHECKPOINT_TTL.
+        """
+        self.job_id = job_id
+        self.enabled = job_id is not None
+        self.ttl = ttl or settings.CHECKPOINT_TTL
+        self.key = f"bfabric_web_apps:checkpoint:{job_id}"
+
+        if self.enabled and connection is None:
+            from bfabric_web_apps.utils.redis_connection import get_redis_connection
+            connection = get_redis_connection()
+        self.connection = connection
+
+        self._steps = self._load() if self.enabled else {}
+        self.resumed = bool(self._steps)  # A previous attempt of the job recorded completed steps
+
+    @classmethod
+    def for_current_job(cls):
+        """
+        Returns the checkpoint of the RQ job running in this worker.
+
+        Returns:
+            JobCheckpoint: The checkpoint (disabled outside of an RQ job or with CHECKPOINTS_ENABLED off).
+        """
+        if not settings.CHECKPOINTS_ENABLED:
+            return cls()
+
+        from rq import get_current_job
+        job = get_current_job()
+        if job is None:
+            return cls()
+        return cls(job.id, connection=job.connection)
+
+    def _load(self):
+        try:
+            raw = self.connection.hgetall(self.key)
+        except Exception as e:
+            print(f"Could not load checkpoint of job {self.job_id}, running all steps: {e}")
+            return {}
+        return {
+            (name.decode("utf-8") if isinstance(name, bytes) else name): json.loads(value)
+            for name, value in raw.items()
+        }
+
+    def done(self, step: str):
+        """
+        Checks whether a step completed in a previous attempt.
+
+        Args:
+            step (str): The step name.
+
+        Returns:
+            bool: True if the step is recorded as completed.
+        """
+        return step in self._steps
+
+    def get(self, step: str, default=None):
+        """
+        Returns the recorded output of a step.
+
+        Args:
+            step (str): The step name.
+            default: Returned if the step is not recorded.
+
+        Returns:
+            any: The output passed to `save`.
+        """
+        return self._steps.get(step, default)
+
+    def save(self, step: str, output=None):
+        """
+        Records a step as completed.
+
+        A failure to write the checkpoint is printed and never fails the job.
+
+        Args:
+            step (str): The step name.
+            output: JSON-serializable output of the step, returned by `get` on resume.
+        """
+        self._steps[step] = output
+        if not self.enabled:
+            return
+
+        try:
+            pipe = self.connection.pipeline()
+            pipe.hset(self.key, step, json.dumps(output))
+            pipe.expire(self.key, self.ttl)
+            pipe.execute()
+        except Exception as e:
+            print(f"Could not record step {step} of job {self.job_id}: {e}")
+
+    def record(self, step: str, items: dict):
+        """
+        Records items completed within a step that is still running, e.g. the resource ID of each registered file.
+
+        Unlike `save`, this does not mark the step as completed: a resumed step uses `recorded`
+        to skip the items it already processed. A failure to write is printed and never fails the job.
+
+        Args:
+            step (str): The step name.
+            items (dict): {item key: JSON-serializable value}.
+        """
+        if not self.enabled or not items:
+            return
+
+        try:
+            pipe = self.connection.pipeline()
+            pipe.hset(f"{self.key}:items:{step}", mapping={key: json.dumps(value) for key, value in items.items()})
+            pipe.expire(f"{self.key}:items:{step}", self.ttl)
+            pipe.execute()
+        except Exception as e:
+            print(f"Could not record {len(items)} item(s) of step {step} of job {self.job_id}: {e}")
+
+    def recorded(self, step: str, keys: list):
+        """
+        Returns the values recorded with `record` for some items of a step.
+
+        Args:
+            step (str): The step name.
+            keys (list): The item keys.
+
+        Returns:
+            list: The recorded value, or None, for each key.
+        """
+        if not self.enabled or not keys:
+            return [None] * len(keys)
+
+        try:
+            values = self.connection.hmget(f"{self.key}:items:{step}", keys)
+        except Exception as e:
+            print(f"Could not load recorded items of step {step} of job {self.job_id}: {e}")
+            return [None] * len(keys)
+        return [json.loads(value) if value is not None else None for value in values]
+
+    def clear(self):
+        """
+        Removes the checkpoint, so a requeued job runs all steps again.
+
+        Called when the job completes. A failure is printed and never fails the job;
+        the checkpoint then expires after its TTL.
+        """
+        self._steps = {}
+        if not self.enabled:
+            return
+
+        try:
+            self.connection.delete(self.key, *self.connection.scan_iter(match=f"{self.key}:items:*"))
+        except Exception as e:
+            print(f"Could not remove checkpoint of job {self.job_id}: {e}")
+
+
+def run_step(checkpoint, step, logger, func, *args, **kwargs):
+    """
+    Runs a step unless it completed in a previous attempt of the job.
+
+    Args:
+        checkpoint (JobCheckpoint): The job's checkpoint.
+        step (str): The step name.
+        logger (Logger): Logger receiving a message when the step is skipped.
+        func (callable): The step function. Its return value is recorded as the step's output.
+        *args, **kwargs: Arguments of the step function.
+
+    Returns:
+        any: The output of the step, from this run or the previous one.
+    """
+    if checkpoint.done(step):
+        logger.log_operation("Info | ORIGIN: run_main_job function", f"Step '{step}' already completed in a previous attempt, skipped.",
+                             params=None, flush_logs=False)
+        print(f"Step '{step}' already completed in a previous attempt, skipped.")
+        return checkpoint.get(step)
+
+    output = func(*args, **kwargs)
+    checkpoint.save(step, output)
+    return output
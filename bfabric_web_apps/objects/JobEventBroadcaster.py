@@ -0,0 +1,167 @@
+import os
+import json
+import time
+import queue
+import threading
+
+from bfabric_web_apps.utils.config import settings
+
+
+class JobEventBroadcaster:
+    """
+    Fans out job state transitions published by the workers to the connected browsers.
+
+    A single background thread per web process subscribes to the Redis job events
+    channel and copies every event into the queue of each connected client, so Redis
+    sees one subscriber per process regardless of the number of open Queue tabs.
+    """
+
+    def __init__(self, channel: str = None, client_queue_size: int = 100):
+        """
+        Initializes the broadcaster. The subscriber thread is only started when the first client connects.
+
+        Args:
+            channel (str, optional): Redis pub/sub channel. Defaults to JOB_EVENTS_CHANNEL.
+            client_queue_size (int): Events buffered per client before the oldest ones are dropped.
+        """
+        self.channel = channel or settings.JOB_EVENTS_CHANNEL
+        self.client_queue_size = client_queue_size
+
+        self.events = 0    # Events received from Redis
+        self.dropped = 0   # Events dropped for slow clients
+
+        self._lock = threading.Lock()
+        self._clients = set()
+        self._thread = None
+        self._pid = None
+
+    def _ensure_started(self):
+        """Starts the subscriber thread, also after the process has been forked."""
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="bfabric-job-events", daemon=True)
+            self._thread.start()
+
+    def subscribe(self):
+        """
+        Registers a client.
+
+        Returns:
+            queue.Queue: The queue receiving the client's events (JSON strings).
+        """
+        self._ensure_started()
+        client = queue.Queue(maxsize=self.client_queue_size)
+        with self._lock:
+            self._clients.add(client)
+        return client
+
+    def unsubscribe(self, client):
+        """
+        Removes a client registered with `subscribe`.
+
+        Args:
+            client (queue.Queue): The client's queue.
+        """
+        with self._lock:
+            self._clients.discard(client)
+
+    def stream(self, heartbeat: float = None):
+        """
+        Yields the events of one client in the Server-Sent Events format.
+
+        A comment line is sent every `heartbeat` seconds without events, so proxies
+        keep the connection open and disconnected clients are noticed.
+
+        Args:
+            heartbeat (float, optional): Seconds between keep-alive comments. Defaults to JOB_EVENTS_HEARTBEAT.
+
+        Yields:
+            str: SSE frames.
+        """
+        heartbeat = heartbeat or settings.JOB_EVENTS_HEARTBEAT
+        client = self.subscribe()
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    event = client.get(timeout=heartbeat)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: job\ndata: {event}\n\n"
+        finally:
+            self.unsubscribe(client)
+
+    def publish_local(self, event: str):
+        """
+        Delivers an event to all clients of this process.
+
+        Args:
+            event (str): The event as JSON string.
+        """
+        self.events += 1
+        with self._lock:
+            clients = list(self._clients)
+
+        for client in clients:
+            try:
+                client.put_nowait(event)
+            except queue.Full:
+                # Drop the oldest event: the client refreshes the whole tab on any event anyway
+                try:
+                    client.get_nowait()
+                except queue.Empty:
+                    pass
+                self.dropped += 1
+                try:
+                    client.put_nowait(event)
+                except queue.Full:
+                    pass
+
+    def _run(self):
+        # Imported here so the web process only opens the subscription when push mode is used
+        from bfabric_web_apps.utils.redis_connection import get_redis_connection
+
+        delay = 1.0
+        while True:
+            pubsub = None
+            try:
+                pubsub = get_redis_connection().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                delay = 1.0
+
+                for message in pubsub.listen():
+                    data = message.get("data")
+                    if isinstance(data, bytes):
+                        data = data.decode("utf-8", errors="replace")
+                    self.publish_local(data)
+            except Exception as e:
+                print(f"Job event subscription failed: {e}. Reconnecting in {delay:.0f}s.")
+                # Tell clients to refresh once reconnected, events may have been missed
+                self.publish_local(json.dumps({"status": "resync", "time": time.time()}))
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+
+            time.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+    def stats(self):
+        """
+        Returns the broadcaster counters.
+
+        Returns:
+            dict: {"clients", "events", "dropped"}.
+        """
+        with self._lock:
+            clients = len(self._clients)
+        return {"clients": clients, "events": self.events, "dropped": self.dropped}
+
+
+job_event_broadcaster = JobEventBroadcaster()
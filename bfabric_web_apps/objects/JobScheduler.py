@@ -0,0 +1,345 @@
+import json
+import time
+import uuid
+import threading
+
+from rq import Queue, Worker
+from rq.exceptions import NoSuchJobError
+from rq.job import Job
+
+from bfabric_web_apps.utils.config import settings
+
+PRIORITIES = ("high", "normal", "low")
+
+# RQ job statuses after which the resources of a job are released
+FINISHED_STATUSES = {"finished", "failed", "stopped", "canceled"}
+
+
+class JobScheduler:
+    """
+    Scheduling layer in front of an RQ queue.
+
+    Jobs submitted with `enqueue` wait in Redis until the queue has room for their
+    resource class, and are then handed to the RQ queue. Waiting jobs are dispatched by
+    priority ("high", "normal", "low") and, within a priority, round-robin across users,
+    so a bulk submission of one user cannot starve the others. Every dispatch decision
+    is recorded and can be read with `decisions()`.
+
+    Resource classes (SCHEDULER_RESOURCE_CLASSES) declare the CPU and memory slots a job
+    needs and its timeout; the queue capacity (SCHEDULER_CAPACITY) is the total number of
+    slots of the workers listening on the queue.
+    """
+
+    def __init__(self, queue_name: str, connection=None, capacity: dict = None, resource_classes: dict = None):
+        """
+        Initializes the scheduler of a queue.
+
+        Args:
+            queue_name (str): Name of the RQ queue the jobs are dispatched to.
+            connection (redis.Redis, optional): Redis connection. Defaults to the shared connection.
+            capacity (dict, optional): Slots of the queue, e.g. {"cpu": 32, "memory_gb": 128}. Defaults to SCHEDULER_CAPACITY.
+            resource_classes (dict, optional): {class: {"cpu", "memory_gb", "timeout"}}. Defaults to SCHEDULER_RESOURCE_CLASSES.
+        """
+        if connection is None:
+            from bfabric_web_apps.utils.redis_connection import get_redis_connection
+            connection = get_redis_connection()
+
+        self.queue_name = queue_name
+        self.connection = connection
+        self.capacity = capacity or settings.SCHEDULER_CAPACITY
+        self.resource_classes = resource_classes or settings.SCHEDULER_RESOURCE_CLASSES
+        self.queue = Queue(name=queue_name, connection=connection, default_timeout=10000000)
+
+        prefix = f"bfabric_web_apps:scheduler:{queue_name}"
+        self._users_key = prefix + ":users:{priority}"              # Users with pending jobs, scored by last dispatch time
+        self._pending_key = prefix + ":pending:{priority}:{user}"   # Pending job IDs of a user
+        self._running_key = prefix + ":running"                     # job_id -> reserved slots (JSON)
+        self._used_key = prefix + ":used"                           # Reserved slots per resource
+        self._served_key = prefix + ":served"                       # user -> last dispatch time
+        self._decisions_key = prefix + ":decisions"
+        self._lock_key = prefix + ":lock"
+
+    def enqueue(self, func, *args, user: str = "anonymous", priority: str = "normal", resource_class: str = "small", **kwargs):
+        """
+        Submits a job. It is dispatched to the RQ queue as soon as its resource class fits.
+
+        Args:
+            func (callable): The job function, e.g. `run_main_job`.
+            *args: Positional arguments of the job function.
+            user (str): The submitting user, used for fairness.
+            priority (str): "high", "normal" or "low".
+            resource_class (str): One of the configured resource classes.
+            **kwargs: Keyword arguments of the job function.
+
+        Returns:
+            rq.job.Job: The job. It is saved in Redis but only enqueued once dispatched.
+
+        Raises:
+            ValueError: If the priority or resource class is unknown, or the class exceeds the queue capacity.
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority '{priority}', expected one of {PRIORITIES}")
+        needs = self._needs(resource_class)
+        if any(needs[resource] > self.capacity.get(resource, 0) for resource in needs):
+            raise ValueError(f"Resource class '{resource_class}' ({needs}) exceeds the capacity of queue '{self.queue_name}' ({self.capacity})")
+
+        job = Job.create(
+            func,
+            args=args,
+            kwargs=kwargs,
+            connection=self.connection,
+            id=str(uuid.uuid4()),
+            timeout=self.resource_classes[resource_class].get("timeout"),
+            origin=self.queue_name,
+            meta={"scheduler": {"user": user, "priority": priority, "resource_class": resource_class, "submitted_at": time.time()}},
+        )
+        job.save()
+
+        last_served = float(self.connection.hget(self._served_key, user) or 0)
+
+        pipe = self.connection.pipeline()
+        pipe.rpush(self._pending_key.format(priority=priority, user=user), job.id)
+        pipe.zadd(self._users_key.format(priority=priority), {user: last_served}, nx=True)
+        pipe.execute()
+
+        self._record("submitted", job.id, user=user, priority=priority, resource_class=resource_class)
+        self.dispatch()
+        return job
+
+    def dispatch(self):
+        """
+        Moves pending jobs into the RQ queue while their resource classes fit.
+
+        Called after every submission and whenever a job ends. Runs under a Redis lock,
+        so concurrent calls from several processes do not overbook the queue.
+
+        Returns:
+            list[str]: IDs of the dispatched jobs.
+        """
+        lock = self.connection.lock(self._lock_key, timeout=30, blocking_timeout=5)
+        if not lock.acquire():
+            return []
+
+        try:
+            self.reconcile()
+            used = self._used()
+            dispatched = []
+
+            for priority in PRIORITIES:
+                users_key = self._users_key.format(priority=priority)
+                position = 0
+
+                # Round-robin: the least recently served user whose next job fits gets one job dispatched
+                while position < self.connection.zcard(users_key):
+                    user = _decode(self.connection.zrange(users_key, position, position)[0])
+                    pending_key = self._pending_key.format(priority=priority, user=user)
+                    job_id = _decode(self.connection.lindex(pending_key, 0))
+
+                    if job_id is None:
+                        self.connection.zrem(users_key, user)
+                        continue
+
+                    try:
+                        job = Job.fetch(job_id, connection=self.connection)
+                    except NoSuchJobError:
+                        # Deleted or expired while waiting: drop it, or it blocks the user's later jobs
+                        self.connection.lrem(pending_key, 1, job_id)
+                        self._record("dropped", job_id, user=user, priority=priority)
+                        continue
+
+                    resource_class = job.meta["scheduler"]["resource_class"]
+                    needs = self._needs(resource_class)
+
+                    if not self._fits(needs, used):
+                        # Keep the user's turn, but let smaller jobs of the next users through
+                        position += 1
+                        continue
+
+                    pipe = self.connection.pipeline()
+                    pipe.lpop(pending_key)
+                    pipe.hset(self._running_key, job_id, json.dumps(needs))
+                    for resource, amount in needs.items():
+                        pipe.hincrby(self._used_key, resource, amount)
+                    served_at = time.time()
+                    pipe.zadd(users_key, {user: served_at})
+                    pipe.hset(self._served_key, user, served_at)
+                    pipe.execute()
+
+                    for resource, amount in needs.items():
+                        used[resource] = used.get(resource, 0) + amount
+
+                    self.queue.enqueue_job(job, at_front=priority == "high")
+                    dispatched.append(job_id)
+                    position = 0
+
+                    self._record(
+                        "dispatched", job_id,
+                        user=user, priority=priority, resource_class=resource_class,
+                        waited=round(time.time() - job.meta["scheduler"]["submitted_at"], 1), used=dict(used),
+                    )
+
+                if self.connection.zcard(users_key):
+                    break  # Lower priorities wait until the higher ones fit
+
+            return dispatched
+        finally:
+            try:
+                lock.release()
+            except Exception:
+                pass
+
+    def release(self, job_id: str):
+        """
+        Returns the slots reserved by a job. Called by the workers when a job ends.
+
+        Args:
+            job_id (str): The job ID.
+
+        Returns:
+            bool: True if the job held a reservation.
+        """
+        reserved = self.connection.hget(self._running_key, job_id)
+        if reserved is None or not self.connection.hdel(self._running_key, job_id):
+            return False
+
+        pipe = self.connection.pipeline()
+        for resource, amount in json.loads(reserved).items():
+            pipe.hincrby(self._used_key, resource, -amount)
+        pipe.execute()
+
+        self._record("released", job_id)
+        return True
+
+    def reconcile(self):
+        """
+        Releases the reservations of jobs that ended without the worker releasing them (e.g. a killed worker).
+
+        Returns:
+            list[str]: IDs of the released jobs.
+        """
+        job_ids = [_decode(job_id) for job_id in self.connection.hkeys(self._running_key)]
+        if not job_ids:
+            return []
+
+        pipe = self.connection.pipeline(transaction=False)
+        for job_id in job_ids:
+            pipe.hget(Job.key_for(job_id), "status")
+        statuses = pipe.execute()
+
+        released = []
+        for job_id, status in zip(job_ids, statuses):
+            if status is None or _decode(status) in FINISHED_STATUSES:
+                if self.release(job_id):
+                    released.append(job_id)
+        return released
+
+    def decisions(self, limit: int = 100):
+        """
+        Returns the most recent scheduling decisions, newest first.
+
+        Args:
+            limit (int): Maximum number of decisions.
+
+        Returns:
+            list[dict]: Decisions with the keys time, action (submitted, dispatched, released, dropped) and job_id, plus details.
+        """
+        return [json.loads(entry) for entry in self.connection.lrange(self._decisions_key, 0, limit - 1)]
+
+    def stats(self):
+        """
+        Returns the pending jobs per priority and user, and the reserved slots.
+
+        Returns:
+            dict: {"pending": {priority: {user: count}}, "used": {resource: slots}, "capacity": {resource: slots}}.
+        """
+        pending = {}
+        for priority in PRIORITIES:
+            users = [_decode(user) for user in self.connection.zrange(self._users_key.format(priority=priority), 0, -1)]
+            pipe = self.connection.pipeline(transaction=False)
+            for user in users:
+                pipe.llen(self._pending_key.format(priority=priority, user=user))
+            pending[priority] = dict(zip(users, pipe.execute()))
+
+        return {"pending": pending, "used": self._used(), "capacity": dict(self.capacity)}
+
+    def _needs(self, resource_class):
+        if resource_class not in self.resource_classes:
+            raise ValueError(f"Unknown resource class '{resource_class}', expected one of {list(self.resource_classes)}")
+        declared = self.resource_classes[resource_class]
+        return {resource: declared.get(resource, 0) for resource in self.capacity}
+
+    def _used(self):
+        return {_decode(resource): int(amount) for resource, amount in self.connection.hgetall(self._used_key).items()}
+
+    def _fits(self, needs, used):
+        return all(used.get(resource, 0) + amount <= self.capacity[resource] for resource, amount in needs.items())
+
+    def _record(self, action, job_id, **details):
+        entry = dict(details, time=time.time(), action=action, job_id=job_id)
+        pipe = self.connection.pipeline()
+        pipe.lpush(self._decisions_key, json.dumps(entry))
+        pipe.ltrim(self._decisions_key, 0, settings.SCHEDULER_DECISION_LOG_SIZE - 1)
+        pipe.execute()
+
+
+def release_scheduled_job(job, connection):
+    """
+    Releases the slots of a job submitted through a JobScheduler and dispatches waiting jobs.
+
+    Args:
+        job (rq.job.Job): The ended job. Jobs enqueued without a scheduler are ignored.
+        connection (redis.Redis): Redis connection.
+    """
+    if "scheduler" not in (job.meta or {}):
+        return
+
+    scheduler = JobScheduler(job.origin, connection=connection)
+    if scheduler.release(job.id):
+        scheduler.dispatch()
+
+
+class SchedulerWorker(Worker):
+    """
+    RQ worker releasing the slots of jobs submitted through a `JobScheduler`.
+
+    Used by `run_worker` for every worker. Slots are released as soon as a job ends, and
+    every SCHEDULER_RECONCILE_INTERVAL seconds a background thread reconciles and
+    dispatches the worker's queues, which frees the slots of jobs whose worker died.
+    """
+
+    def work(self, *args, **kwargs):
+        stop = threading.Event()
+        interval = settings.SCHEDULER_RECONCILE_INTERVAL
+        if interval:
+            threading.Thread(target=self._reconcile_periodically, args=(stop, interval), daemon=True).start()
+        try:
+            return super().work(*args, **kwargs)
+        finally:
+            stop.set()
+
+    def handle_job_success(self, job, *args, **kwargs):
+        super().handle_job_success(job, *args, **kwargs)
+        self._release(job)
+
+    def handle_job_failure(self, job, *args, **kwargs):
+        super().handle_job_failure(job, *args, **kwargs)
+        self._release(job)
+
+    def _release(self, job):
+        # Best effort: a Redis error must not turn a finished job into a failed one
+        try:
+            release_scheduled_job(job, self.connection)
+        except Exception as e:
+            print(f"Failed to release the scheduler slots of job {job.id}: {e}")
+
+    def _reconcile_periodically(self, stop, interval):
+        while not stop.wait(interval):
+            for queue_name in self.queue_names():
+                try:
+                    JobScheduler(queue_name, connection=self.connection).dispatch()
+                except Exception as e:
+                    print(f"Failed to reconcile the scheduler of queue {queue_name}: {e}")
+
+
+def _decode(value):
+    return value.decode("utf-8") if isinstance(value, bytes) else value
@@ -0,0 +1,203 @@
+import os
+import time
+import queue
+import atexit
+import threading
+
+from bfabric_web_apps.utils.config import settings
+from bfabric_web_apps.utils.get_power_user_wrapper import get_power_user_wrapper
+
+
+class LogShipper:
+    """
+    Ships Logger entries to B-Fabric from a background thread.
+
+    Entries are buffered per (job ID, environment) and coalesced into a single
+    `job` save per batch, which is sent when either the batch size or the time
+    window is reached. Pending entries are flushed on `flush()` and at interpreter exit.
+    """
+
+    def __init__(self, batch_size: int = None, flush_interval: float = None, max_queue_size: int = None, max_retries: int = None):
+        """
+        Initializes the LogShipper. The background thread is only started on first use.
+
+        Args:
+            batch_size (int, optional): Number of buffered lines that triggers a save. Defaults to LOG_SHIPPER_BATCH_SIZE.
+            flush_interval (float, optional): Maximum number of seconds a line stays buffered. Defaults to LOG_SHIPPER_FLUSH_INTERVAL.
+            max_queue_size (int, optional): Maximum number of pending submissions. Defaults to LOG_SHIPPER_MAX_QUEUE_SIZE.
+            max_retries (int, optional): How often a failed save is retried before its lines are dropped. Defaults to LOG_SHIPPER_MAX_RETRIES.
+        """
+        self.batch_size = batch_size or settings.LOG_SHIPPER_BATCH_SIZE
+        self.flush_interval = flush_interval or settings.LOG_SHIPPER_FLUSH_INTERVAL
+        self.max_queue_size = max_queue_size or settings.LOG_SHIPPER_MAX_QUEUE_SIZE
+        self.max_retries = settings.LOG_SHIPPER_MAX_RETRIES if max_retries is None else max_retries
+
+        self.shipped = 0   # Lines successfully saved to B-Fabric
+        self.saves = 0     # Number of job saves sent
+        self.retries = 0   # Number of retried saves
+        self.dropped = 0   # Lines given up on (queue full or retries exhausted)
+
+        self._lock = threading.Lock()
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._atexit_registered = False
+
+    def _ensure_started(self):
+        """Starts the background thread, also after the process has been forked (e.g. by an RQ worker)."""
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+
+            self._pid = os.getpid()
+            self._queue = queue.Queue(maxsize=self.max_queue_size)
+            self._thread = threading.Thread(target=self._run, name="bfabric-log-shipper", daemon=True)
+            self._thread.start()
+
+            if not self._atexit_registered:
+                atexit.register(self.close)
+                self._atexit_registered = True
+
+    def submit(self, jobid, environment: str, lines: list):
+        """
+        Queues log lines for a job.
+
+        Args:
+            jobid (int): The ID of the B-Fabric job the lines belong to.
+            environment (str): The environment of the job (e.g., production, test).
+            lines (list[str]): The log lines.
+        """
+        if not lines:
+            return
+
+        self._ensure_started()
+
+        try:
+            self._queue.put(((jobid, environment), list(lines)), timeout=1)
+        except queue.Full:
+            self.dropped += len(lines)
+            print(f"Log shipper queue is full, dropped {len(lines)} log line(s) for job {jobid}")
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Sends all pending lines and waits until they have been processed.
+
+        Lines whose save failed are waited for until they are saved or dropped after their last retry.
+
+        Args:
+            timeout (float, optional): Maximum number of seconds to wait. Defaults to waiting indefinitely.
+
+        Returns:
+            bool: True if all lines were processed in time, False otherwise.
+        """
+        if self._thread is None or self._pid != os.getpid():
+            return True
+
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def close(self):
+        """Flushes pending lines before the interpreter exits."""
+        self.flush(timeout=settings.LOG_SHIPPER_EXIT_TIMEOUT)
+
+    def stats(self) -> dict:
+        """
+        Returns the shipper counters.
+
+        Returns:
+            dict: Queue depth, shipped lines, saves, retries and dropped lines.
+        """
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "shipped": self.shipped,
+            "saves": self.saves,
+            "retries": self.retries,
+            "dropped": self.dropped,
+        }
+
+    def _run(self):
+        """
+        Background loop: collect lines, then save them when the batch is full or the window has passed.
+
+        A failed save is not retried inline: its lines are set aside with a retry time, and the
+        loop keeps shipping the other jobs meanwhile. Lines submitted for a job waiting for a
+        retry are appended to its pending lines, so they are saved in order.
+        """
+        buffer = {}
+        buffered_lines = 0
+        window_end = None
+        retrying = {}  # (job ID, environment) -> [lines, attempts, retry time]
+        waiters = []   # flush() events, set once nothing is buffered or waiting for a retry
+
+        while True:
+            deadlines = [entry[2] for entry in retrying.values()]
+            if window_end is not None:
+                deadlines.append(window_end)
+            wait = None if not deadlines else max(0.0, min(deadlines) - time.monotonic())
+
+            try:
+                item = self._queue.get(timeout=wait)
+            except queue.Empty:
+                item = None
+
+            if isinstance(item, threading.Event):
+                self._ship_all(buffer, retrying)
+                buffer, buffered_lines, window_end = {}, 0, None
+                waiters.append(item)
+            elif item is not None:
+                key, lines = item
+                if key in retrying:
+                    retrying[key][0].extend(lines)
+                else:
+                    buffer.setdefault(key, []).extend(lines)
+                    buffered_lines += len(lines)
+                    if window_end is None:
+                        window_end = time.monotonic() + self.flush_interval
+
+            if buffered_lines >= self.batch_size or (window_end is not None and time.monotonic() >= window_end):
+                self._ship_all(buffer, retrying)
+                buffer, buffered_lines, window_end = {}, 0, None
+
+            now = time.monotonic()
+            for key in [key for key, entry in retrying.items() if entry[2] <= now]:
+                lines, attempts, _ = retrying.pop(key)
+                self._ship(key, lines, attempts, retrying)
+
+            if waiters and not retrying:
+                for waiter in waiters:
+                    waiter.set()
+                waiters = []
+
+    def _ship_all(self, buffer: dict, retrying: dict):
+        """Saves the buffered lines, one `job` save per (job ID, environment)."""
+        for key, lines in buffer.items():
+            self._ship(key, lines, 0, retrying)
+
+    def _ship(self, key, lines, attempts, retrying):
+        """Saves the lines of one job. On failure, they are queued in `retrying` with exponential backoff, or dropped."""
+        jobid, environment = key
+
+        try:
+            wrapper = get_power_user_wrapper({"environment": environment})
+            wrapper.save("job", {"id": jobid, "logthis": "\n".join(lines)})
+            self.shipped += len(lines)
+            self.saves += 1
+        except Exception as e:
+            if attempts < self.max_retries:
+                self.retries += 1
+                retrying[key] = [lines, attempts + 1, time.monotonic() + self._retry_delay(attempts)]
+            else:
+                self.dropped += len(lines)
+                print(f"Failed to save log to B-Fabric: {e}")
+
+    def _retry_delay(self, attempt: int) -> float:
+        """Seconds to wait before retrying a save that failed `attempt + 1` times."""
+        return min(2 ** attempt, 30)
+
+
+# Create a globally accessible instance
+log_shipper = LogShipper()
@@ -1,16 +1,24 @@
 import os
 import pickle
+import threading
 from typing import List
 from bfabric import Bfabric
 from datetime import datetime as dt
 import base64
 import bfabric_web_apps
+from bfabric_web_apps.utils.get_power_user_wrapper import get_power_user_wrapper
+from bfabric_web_apps.utils.config import settings
+from bfabric_web_apps.objects.LogShipper import log_shipper
 
 
 class Logger:
     """
     A Logger class to manage and batch API call logs locally and flush them to the backend when needed.
     """
+
+    # Guards `logs` when pipeline steps log from several threads (class level, so it is never pickled)
+    _logs_lock = threading.Lock()
+
     def __init__(self, jobid: int, username: str, environment: str):
         """
         Initializes the Logger with a job ID, username, and environment.
@@ -22,10 +30,27 @@ class Logger:
         """
         self.jobid = jobid
         self.username = username
+        self.environment = environment
         self.config_file_path = bfabric_web_apps.CONFIG_FILE_PATH
-        self.power_user_wrapper = self._get_power_user_wrapper(environment)
+        self._power_user_wrapper = None  # Only set explicitly, otherwise resolved from the shared client registry
         self.logs = []
 
+    @property
+    def power_user_wrapper(self) -> Bfabric:
+        """
+        The power user B-Fabric wrapper for this logger's environment.
+
+        Unless a wrapper was assigned, it is looked up on every use, so a Logger shared by
+        several threads uses the client of the calling thread.
+        """
+        if self._power_user_wrapper is None:
+            return self._get_power_user_wrapper(self.environment)
+        return self._power_user_wrapper
+
+    @power_user_wrapper.setter
+    def power_user_wrapper(self, wrapper: Bfabric):
+        self._power_user_wrapper = wrapper
+
     def _get_power_user_wrapper(self, environment) -> Bfabric:
         """
         Initializes a B-Fabric wrapper using the power user's credentials.
@@ -36,11 +61,58 @@ class Logger:
         Returns:
             Bfabric: An authenticated Bfabric instance.
         """
-        power_user_wrapper = Bfabric.from_config(
-            config_path = os.path.expanduser(self.config_file_path),
-            config_env = environment.upper()
+        # Per-environment client of the calling thread (rebuilt only when the config file changes)
+        return get_power_user_wrapper({"environment": environment})
+
+    def __getstate__(self):
+        """Excludes the live B-Fabric client from pickles; it is rebuilt lazily after unpickling."""
+        state = self.__dict__.copy()
+        state["_power_user_wrapper"] = None
+        return state
+
+    def __setstate__(self, state):
+        """Restores a pickled Logger, including pickles created before the wrapper became lazy."""
+        wrapper = state.pop("power_user_wrapper", None)
+        state.setdefault("_power_user_wrapper", wrapper)
+        state.setdefault("environment", None)
+        self.__dict__.update(state)
+
+    def to_dict(self) -> dict:
+        """
+        Serializes the Logger into a compact, JSON-compatible dictionary.
+
+        Only the job ID, username, environment and pending log lines are included, so the
+        result is small and independent of the B-Fabric client's internals.
+
+        Returns:
+            dict: The serialized Logger.
+        """
+        return {
+            "jobid": self.jobid,
+            "username": self.username,
+            "environment": self.environment,
+            "logs": list(self.logs),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """
+        Restores a Logger serialized with `to_dict`. The power user wrapper is resolved
+        lazily from the shared client registry on first use.
+
+        Args:
+            data (dict): The serialized Logger.
+
+        Returns:
+            Logger: The restored Logger object.
+        """
+        logger = cls(
+            jobid=data.get("jobid"),
+            username=data.get("username"),
+            environment=data.get("environment"),
         )
-        return power_user_wrapper
+        logger.logs = list(data.get("logs", []))
+        return logger
 
     def to_pickle(self):
         """
@@ -75,6 +147,7 @@ class Logger:
             message (str): A detailed message about the operation.
             params (dict, optional): Additional parameters to log. Defaults to None.
             flush_logs (bool, optional): Whether to immediately flush the logs to the backend. Defaults to True.
+                With LOG_SHIPPER_ENABLED, flushed logs are handed to the background log shipper.
         """
         # Define the timestamp format
         timestamp = dt.now().strftime('%Y-%m-%d %H:%M:%S')
@@ -92,27 +165,47 @@ class Logger:
             log_entry += f" | PARAMETERS: {params}"
 
         # Flush or store the log entry
+        with self._logs_lock:
+            self.logs.append(log_entry)
+
         if flush_logs:
-            self.logs.append(log_entry)  # Temporarily append for flushing
             self.flush_logs()  # Flush all logs, including the new one
-        else:
-            self.logs.append(log_entry)  # Append to local logs
 
 
 
-    def flush_logs(self):
+    def flush_logs(self, wait: bool = False):
         """
         Send all accumulated logs for this job to the backend and clear the local cache.
+
+        With LOG_SHIPPER_ENABLED, the logs are queued on the background log shipper, which
+        coalesces them into one `job` save per batch window. Otherwise they are saved synchronously.
+
+        Args:
+            wait (bool, optional): Block until the log shipper has saved all queued logs. Use this at
+                the end of a job to make sure nothing is lost. Defaults to False.
         """
-        if not self.logs:
+        if settings.LOG_SHIPPER_ENABLED:
+            with self._logs_lock:
+                logs, self.logs = self.logs, []
+            if logs:
+                log_shipper.submit(self.jobid, self.environment, logs)
+            if wait:
+                log_shipper.flush()
+            return
+
+        with self._logs_lock:
+            logs, self.logs = self.logs, []
+
+        if not logs:
             return  # No logs to flush
 
         try:
-            full_log_message = "\n".join(self.logs)
+            full_log_message = "\n".join(logs)
             self.power_user_wrapper.save("job", {"id": self.jobid, "logthis": full_log_message})
-            self.logs = []  # Clear logs after successful flush
         except Exception as e:
             print(f"Failed to save log to B-Fabric: {e}")
+            with self._logs_lock:
+                self.logs = logs + self.logs  # Keep them for the next flush
 
     def logthis(self, api_call: callable, *args, params=None , flush_logs: bool = True, **kwargs) -> any:
         """
@@ -0,0 +1,155 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from bfabric_web_apps.utils.config import settings
+
+
+class StepGraph:
+    """
+    Runs named steps with explicit dependencies on a bounded thread pool.
+
+    A step starts as soon as all steps it depends on have finished, so independent steps
+    overlap. Each step receives the results of all finished steps. A step that raises is
+    recorded as failed and its dependents still run, like the sequential pipeline did:
+    steps are expected to log their own errors and handle missing inputs.
+    """
+
+    def __init__(self, max_workers: int = None):
+        """
+        Initializes an empty graph.
+
+        Args:
+            max_workers (int, optional): Maximum number of steps running at once. Defaults to PIPELINE_MAX_WORKERS.
+        """
+        self.max_workers = max_workers or settings.PIPELINE_MAX_WORKERS
+        self.steps = {}      # name -> (func, deps)
+        self.results = {}    # name -> return value (None for failed steps)
+        self.errors = {}     # name -> exception
+        self.timings = {}    # name -> (start, end) in seconds since the graph started
+        self._lock = threading.Lock()
+
+    def add(self, name: str, func, deps=()):
+        """
+        Adds a step.
+
+        Args:
+            name (str): Unique step name.
+            func (callable): Called with the results dictionary of the finished steps.
+            deps (iterable[str]): Names of the steps that must finish first.
+
+        Returns:
+            StepGraph: The graph, to chain calls.
+
+        Raises:
+            ValueError: If the name is taken or a dependency is unknown.
+        """
+        if name in self.steps:
+            raise ValueError(f"Step '{name}' is already defined")
+        unknown = [dep for dep in deps if dep not in self.steps]
+        if unknown:
+            raise ValueError(f"Step '{name}' depends on undefined step(s) {unknown}")
+
+        self.steps[name] = (func, tuple(deps))
+        return self
+
+    def run(self):
+        """
+        Runs all steps and waits for them to finish.
+
+        Returns:
+            dict: The results of all steps.
+        """
+        started = time.perf_counter()
+        pending = dict(self.steps)
+        running = {}
+
+        def execute(name, func):
+            start = time.perf_counter() - started
+            try:
+                with self._lock:
+                    results = dict(self.results)
+                return func(results)
+            finally:
+                self.timings[name] = (start, time.perf_counter() - started)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                finished = set(self.results) | set(self.errors)
+                for name, (func, deps) in list(pending.items()):
+                    if all(dep in finished for dep in deps):
+                        running[executor.submit(execute, name, func)] = name
+                        del pending[name]
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        result = future.result()
+                        with self._lock:
+                            self.results[name] = result
+                    except Exception as e:
+                        print(f"Step '{name}' failed: {e}")
+                        with self._lock:
+                            self.errors[name] = e
+                            self.results[name] = None
+
+        return self.results
+
+    def critical_path(self):
+        """
+        Returns the chain of steps that determined the total run time.
+
+        Starting from the step that finished last, follows the dependency that finished
+        last back to a step without dependencies.
+
+        Returns:
+            list[tuple]: (step name, duration in seconds) from the first to the last step.
+        """
+        if not self.timings:
+            return []
+
+        name = max(self.timings, key=lambda step: self.timings[step][1])
+        path = []
+        while name is not None:
+            start, end = self.timings[name]
+            path.append((name, end - start))
+            deps = self.steps[name][1]
+            name = max(deps, key=lambda dep: self.timings[dep][1]) if deps else None
+
+        return list(reversed(path))
+
+    def timing_report(self):
+        """
+        Formats the total run time and the critical path.
+
+        Returns:
+            str: e.g. "Total 12.3s, critical path: save_files 0.2s -> bash 11.0s -> workunits 1.1s".
+        """
+        total = max((end for _, end in self.timings.values()), default=0.0)
+        path = " -> ".join(f"{name} {duration:.1f}s" for name, duration in self.critical_path())
+        return f"Total {total:.1f}s, critical path: {path}"
+
+
+def run_concurrently(func, items, max_workers: int = None):
+    """
+    Calls `func` for every item on a bounded thread pool, e.g. for per-container sub-tasks of a step.
+
+    B-Fabric clients are not thread-safe: `func` must get its clients itself (e.g. with
+    `get_power_user_wrapper`, which returns a client per thread) instead of sharing one
+    created by the caller.
+
+    Args:
+        func (callable): Called with one item.
+        items (iterable): The items.
+        max_workers (int, optional): Maximum concurrent calls. Defaults to PIPELINE_MAX_WORKERS.
+
+    Returns:
+        list: The return values, in item order.
+    """
+    items = list(items)
+    if len(items) <= 1:
+        return [func(item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=min(len(items), max_workers or settings.PIPELINE_MAX_WORKERS)) as executor:
+        return list(executor.map(func, items))
@@ -0,0 +1,110 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    A bounded, thread-safe cache with per-entry expiry and least-recently-used eviction.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300):
+        """
+        Initializes the cache.
+
+        Args:
+            maxsize (int): The maximum number of entries kept in the cache.
+            ttl (float): The default time to live of an entry, in seconds.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.RLock()
+
+    def get(self, key, default=None):
+        """
+        Returns the cached value for a key, or the default if it is missing or expired.
+
+        Args:
+            key: The cache key.
+            default: The value returned on a cache miss.
+
+        Returns:
+            any: The cached value or the default.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl: float = None):
+        """
+        Stores a value in the cache, evicting the least recently used entries if the cache is full.
+
+        Args:
+            key: The cache key.
+            value: The value to store.
+            ttl (float, optional): Time to live for this entry in seconds. Defaults to the cache TTL.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        """
+        Removes a single entry from the cache.
+
+        Args:
+            key: The cache key.
+
+        Returns:
+            bool: True if an entry was removed, False otherwise.
+        """
+        with self._lock:
+            return self._entries.pop(key, None) is not None
+
+    def clear(self):
+        """Removes all entries from the cache."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """
+        Returns the cache counters.
+
+        Returns:
+            dict: The current size, maximum size, hits, misses and evictions.
+        """
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
@@ -1,8 +1,19 @@
 from dash import Dash
 import dash_bootstrap_components as dbc
 
-def create_app():
-    """Initialize and return a Dash app instance with suppressed callback exceptions."""
+def create_app(warmup_app_ids=None, warmup_environment="production"):
+    """
+    Initialize and return a Dash app instance with suppressed callback exceptions.
+
+    Args:
+        warmup_app_ids (list[int], optional): Application IDs whose metadata is loaded into the
+            application metadata cache right away, so the first sessions skip that lookup.
+        warmup_environment (str, optional): Environment of the warm-up applications. Defaults to "production".
+    """
+    if warmup_app_ids:
+        from bfabric_web_apps.objects.BfabricInterface import bfabric_interface
+        bfabric_interface.warm_app_data(warmup_app_ids, warmup_environment)
+
     return Dash(
         __name__,
         suppress_callback_exceptions=True,  # Allow dynamic callbacks
@@ -0,0 +1,283 @@
+import os
+import re
+import signal
+import tempfile
+import threading
+import subprocess
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime as dt
+
+from .config import settings as config
+
+# Name of the log files created by run_bash_commands: bash_<job id>_<timestamp>.log
+BASH_LOG_PATTERN = re.compile(r"bash_[^_]+_\d{8}_\d{6}\.log")
+
+
+def normalize_command_groups(bash_commands):
+    """
+    Normalizes bash commands into sequential groups of parallel commands.
+
+    Each element of `bash_commands` is either a single command or a list of commands.
+    A list forms a group whose commands run in parallel; groups run one after another.
+    A command is a string or a dict {"cmd": str, "timeout": seconds}.
+
+    Example:
+        ["prepare.sh", ["align A", "align B"], "merge.sh"]
+        runs prepare.sh, then both aligns in parallel, then merge.sh.
+
+    Args:
+        bash_commands (list): The commands.
+
+    Returns:
+        list[list[dict]]: The groups, each a list of {"cmd": str, "timeout": float or None}.
+    """
+    groups = []
+    for entry in bash_commands:
+        entries = entry if isinstance(entry, (list, tuple)) else [entry]
+        group = []
+        for command in entries:
+            if isinstance(command, dict):
+                group.append({"cmd": command["cmd"], "timeout": command.get("timeout")})
+            else:
+                group.append({"cmd": str(command), "timeout": None})
+        if group:
+            groups.append(group)
+    return groups
+
+
+def run_bash_commands(bash_commands, logger=None, timeout=None, log_path=None, buffer_lines=None, progress_interval=None, max_parallel=None):
+    """
+    Runs bash commands group by group, streaming their output.
+
+    stdout and stderr are read line by line while the command runs. The last
+    `buffer_lines` lines of each stream are kept in memory, and every line is written
+    to the log file at `log_path`. While a command runs, a progress message is
+    sent through `logger` every `progress_interval` seconds.
+
+    Args:
+        bash_commands (list): The commands, see `normalize_command_groups`.
+        logger (Logger, optional): Logger used for progress messages.
+        timeout (float, optional): Default timeout per command in seconds. Defaults to BASH_COMMAND_TIMEOUT (no timeout).
+        log_path (str, optional): File receiving the full output. Defaults to a new file in BASH_LOG_DIR.
+        buffer_lines (int, optional): Lines kept in memory per stream. Defaults to BASH_OUTPUT_BUFFER_LINES.
+        progress_interval (float, optional): Seconds between progress messages. Defaults to BASH_PROGRESS_INTERVAL.
+        max_parallel (int, optional): Maximum commands running at once within a group. Defaults to BASH_MAX_PARALLEL.
+
+    Returns:
+        tuple: (results, log_path) where results is a list of dicts with the keys
+               cmd, status (SUCCESS, FAILURE, TIMEOUT or ERROR), returncode, stdout, stderr,
+               truncated, duration and exception, in command order.
+    """
+    timeout = config.BASH_COMMAND_TIMEOUT if timeout is None else timeout
+    buffer_lines = buffer_lines or config.BASH_OUTPUT_BUFFER_LINES
+    progress_interval = progress_interval or config.BASH_PROGRESS_INTERVAL
+    max_parallel = max_parallel or config.BASH_MAX_PARALLEL
+
+    if log_path is None:
+        log_dir = os.path.expanduser(config.BASH_LOG_DIR or os.path.join(tempfile.gettempdir(), "bfabric_web_apps_bash"))
+        os.makedirs(log_dir, exist_ok=True)
+        prune_bash_logs(log_dir, config.BASH_LOG_KEEP - 1)
+        job_id = getattr(logger, "jobid", None) or os.getpid()
+        log_path = os.path.join(log_dir, f"bash_{job_id}_{dt.now().strftime('%Y%m%d_%H%M%S')}.log")
+
+    results = []
+    index = 0
+
+    with open(log_path, "a", buffering=1) as log_file:
+        log_lock = threading.Lock()
+
+        for group in normalize_command_groups(bash_commands):
+            numbered = list(enumerate(group, start=index + 1))
+            index += len(group)
+
+            def run(numbered_command):
+                number, command = numbered_command
+                return _run_command(
+                    number,
+                    command["cmd"],
+                    command["timeout"] if command["timeout"] is not None else timeout,
+                    log_file,
+                    log_lock,
+                    buffer_lines,
+                    progress_interval,
+                    logger,
+                )
+
+            if len(numbered) == 1:
+                results.append(run(numbered[0]))
+            else:
+                with ThreadPoolExecutor(max_workers=min(len(numbered), max_parallel)) as executor:
+                    results.extend(executor.map(run, numbered))
+
+    return results, log_path
+
+
+def prune_bash_logs(log_dir, keep=None):
+    """
+    Deletes the oldest bash log files created by `run_bash_commands` in a directory.
+
+    Only files named like `bash_<job id>_<timestamp>.log` are considered. Several workers may
+    prune the same directory at once, so files removed by another worker are skipped.
+
+    Args:
+        log_dir (str): The log directory.
+        keep (int, optional): Number of the newest log files to keep. Defaults to BASH_LOG_KEEP.
+    """
+    keep = config.BASH_LOG_KEEP if keep is None else keep
+    logs = []
+    try:
+        with os.scandir(log_dir) as entries:
+            for entry in entries:
+                if not BASH_LOG_PATTERN.fullmatch(entry.name):
+                    continue
+                try:
+                    if entry.is_file():
+                        logs.append((entry.stat().st_mtime, entry.path))
+                except FileNotFoundError:
+                    continue
+    except OSError:
+        return
+
+    logs.sort(reverse=True)
+    for _, path in logs[max(keep, 0):]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def format_bash_results(results, log_path=None):
+    """
+    Formats command results into a single log string.
+
+    Args:
+        results (list[dict]): Results returned by `run_bash_commands`.
+        log_path (str, optional): Path of the full output, mentioned when output was truncated.
+
+    Returns:
+        str: The formatted log.
+    """
+    parts = []
+    for result in results:
+        parts.append("---------------------------------------------------------\n")
+        parts.append("Executing Command\n")
+
+        if result["status"] == "ERROR":
+            parts.append(f"Command: {result['cmd']}\nStatus: ERROR\nException: {result['exception']}\n")
+            continue
+
+        if result["status"] == "SUCCESS":
+            label, output = "Output", result["stdout"]
+        else:
+            label, output = "Error Output", result["stderr"]
+
+        parts.append(f"Command: {result['cmd']}\nStatus: {result['status']}\n{label}:\n{output}\n")
+
+        if result["truncated"] and log_path:
+            parts.append(f"(Output truncated, full output in {log_path})\n")
+
+    return "".join(parts)
+
+
+def _run_command(number, cmd, timeout, log_file, log_lock, buffer_lines, progress_interval, logger):
+    """Runs a single command, streaming its output into ring buffers and the log file."""
+    buffers = {"stdout": deque(maxlen=buffer_lines), "stderr": deque(maxlen=buffer_lines)}
+    counts = {"stdout": 0, "stderr": 0}
+    start = time.monotonic()
+
+    def write_log(line):
+        with log_lock:
+            log_file.write(line)
+
+    write_log(f"[{dt.now().strftime('%Y-%m-%d %H:%M:%S')}] [command {number}] START: {cmd}\n")
+
+    try:
+        process = subprocess.Popen(
+            cmd,
+            shell=True,
+            text=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            bufsize=1,
+            errors="replace",
+            start_new_session=True,  # Own process group, so a timeout kills the whole pipeline
+        )
+    except Exception as e:
+        write_log(f"[command {number}] ERROR: {e}\n")
+        return _result(cmd, "ERROR", None, buffers, counts, start, exception=str(e))
+
+    def read_stream(name, stream):
+        for line in stream:
+            line = line.rstrip("\n")
+            buffers[name].append(line)
+            counts[name] += 1
+            write_log(f"[command {number} {name}] {line}\n")
+        stream.close()
+
+    readers = [
+        threading.Thread(target=read_stream, args=("stdout", process.stdout), daemon=True),
+        threading.Thread(target=read_stream, args=("stderr", process.stderr), daemon=True),
+    ]
+    for reader in readers:
+        reader.start()
+
+    status = None
+    deadline = start + timeout if timeout else None
+
+    while status is None:
+        wait = progress_interval
+        if deadline is not None:
+            wait = min(wait, max(0.0, deadline - time.monotonic()))
+
+        try:
+            process.wait(timeout=wait)
+            status = "SUCCESS" if process.returncode == 0 else "FAILURE"
+        except subprocess.TimeoutExpired:
+            if deadline is not None and time.monotonic() >= deadline:
+                _kill_process_group(process)
+                status = "TIMEOUT"
+            elif logger is not None:
+                last_line = buffers["stdout"][-1] if buffers["stdout"] else ""
+                logger.log_operation(
+                    "Progress | ORIGIN: run_main_job function",
+                    f"Command {number} running for {time.monotonic() - start:.0f}s, "
+                    f"{counts['stdout']} stdout / {counts['stderr']} stderr lines so far. Last output: {last_line}",
+                    params=None,
+                    flush_logs=True,
+                )
+
+    for reader in readers:
+        reader.join()
+
+    if status == "TIMEOUT":
+        buffers["stderr"].append(f"Command timed out after {timeout}s")
+
+    write_log(f"[command {number}] {status} (exit code {process.returncode}) after {time.monotonic() - start:.1f}s\n")
+    print(f"Command {number} {status}: {cmd}")
+
+    return _result(cmd, status, process.returncode, buffers, counts, start)
+
+
+def _kill_process_group(process):
+    """Kills a command and all processes it started."""
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        process.kill()
+    process.wait()
+
+
+def _result(cmd, status, returncode, buffers, counts, start, exception=None):
+    """Builds the result dictionary of a command."""
+    return {
+        "cmd": cmd,
+        "status": status,
+        "returncode": returncode,
+        "stdout": "\n".join(buffers["stdout"]).strip(),
+        "stderr": "\n".join(buffers["stderr"]).strip(),
+        "truncated": counts["stdout"] > len(buffers["stdout"]) or counts["stderr"] > len(buffers["stderr"]),
+        "duration": time.monotonic() - start,
+        "exception": exception,
+    }
@@ -1,13 +1,14 @@
-from dash import Input, Output, State, html, dcc
+from dash import Input, Output, State, html, dcc, Patch, no_update
 from bfabric_web_apps.objects.BfabricInterface import bfabric_interface
 import json
 import dash_bootstrap_components as dbc
 from datetime import datetime as dt
 from bfabric_web_apps.utils.get_logger import get_logger
-from rq import Queue
-from .redis_connection import redis_conn
-from rq.registry import StartedJobRegistry, FailedJobRegistry, FinishedJobRegistry
+from .session_store import create_session, load_session
+from .queue_monitor import get_queue_snapshot, get_queue_changes
 from bfabric_web_apps.utils.config import settings
+from concurrent.futures import ThreadPoolExecutor
+import time
 
 def process_url_and_token(url_params):
     """
@@ -36,7 +37,9 @@ def process_url_and_token(url_params):
     # TODO: Implement environment spec once implemented in bfabric production
     # environment = url_params.split('environment=')[1].split('&')[0].strip().lower()
 
+    start_time = time.perf_counter()
     tdata_raw = bfabric_interface.token_to_data(token)
+    token_time = time.perf_counter() - start_time
 
     if tdata_raw:
         if tdata_raw == "EXPIRED":
@@ -47,10 +50,9 @@ def process_url_and_token(url_params):
         return None, None, None, None, base_title, None, None
 
     if tdata:
-        entity_data_json = bfabric_interface.entity_data(tdata)
-        app_data_json = bfabric_interface.app_data(tdata)
-        entity_data = json.loads(entity_data_json)
-        app_data = json.loads(app_data_json)
+        entity_data, app_data, timings = bootstrap_session(tdata)
+        timings["token"] = token_time
+        print("Session bootstrap timings (s):", {phase: round(seconds, 3) for phase, seconds in timings.items()})
         page_title = (
             f"{tdata.get('entityClass_data', 'Unknown')} - {entity_data.get('name', 'Unknown')} "
             f"({tdata.get('environment', 'Unknown')} System)"
@@ -97,25 +99,109 @@ def process_url_and_token(url_params):
         return None, None, None, None, base_title, None, None
 
 
-def submit_bug_report(n_clicks, bug_description, token, entity_data):
+def process_url_and_token_to_session(url_params):
     """
-    Submits a bug report based on user input, token, and entity data.
+    Like `process_url_and_token`, but keeps the session objects server-side.
+
+    The token, token data, entity data, application data and job link are stored in Redis
+    (see `create_session`) and only the session ID is returned, to be put in the
+    "session_id" store. Callbacks read the objects with `load_session(session_id)`.
+
+    Args:
+        url_params (str): The URL parameters containing the token.
+
+    Returns:
+        tuple: A tuple containing:
+               - session_id (str): Session ID, None if the token is missing, invalid or expired.
+               - page_title (str): Title for the page header.
+               - session_details (list): HTML-formatted session details.
+               - job_link (str): Dynamically generated link to the job page.
+    """
+    token, tdata, entity_data, app_data, page_title, session_details, job_link = process_url_and_token(url_params)
+
+    if not tdata:
+        return None, page_title, session_details, job_link
+
+    session_id = create_session(token, tdata, entity_data, app_data, job_link)
+    return session_id, page_title, session_details, job_link
+
+
+def bootstrap_session(token_data, timeout=None):
+    """
+    Fetches the entity and application data of a validated session concurrently.
+
+    Both lookups run in parallel under one overall timeout. A lookup that fails or does
+    not finish in time falls back to an empty dictionary, like a failed lookup did before.
+
+    Args:
+        token_data (dict): Token metadata of a validated token.
+        timeout (float, optional): Overall timeout in seconds. Defaults to SESSION_BOOTSTRAP_TIMEOUT.
+
+    Returns:
+        tuple: A tuple containing:
+               - entity_data (dict): Retrieved entity information.
+               - app_data (dict): Retrieved application information.
+               - timings (dict): Seconds spent per lookup ("entity", "app") and in total ("bootstrap").
+    """
+    timeout = settings.SESSION_BOOTSTRAP_TIMEOUT if timeout is None else timeout
+    timings = {}
+    start_time = time.perf_counter()
+
+    def timed(phase, lookup):
+        phase_start = time.perf_counter()
+        try:
+            return lookup(token_data)
+        finally:
+            timings[phase] = time.perf_counter() - phase_start
+
+    executor = ThreadPoolExecutor(max_workers=2)
+    futures = {
+        "entity": executor.submit(timed, "entity", bfabric_interface.entity_data),
+        "app": executor.submit(timed, "app", bfabric_interface.app_data),
+    }
+
+    results = {}
+    for phase, future in futures.items():
+        remaining = max(0.0, timeout - (time.perf_counter() - start_time))
+        try:
+            results[phase] = json.loads(future.result(timeout=remaining))
+        except Exception as e:
+            print(f"Session bootstrap: {phase} lookup failed or timed out, using fallback: {e!r}")
+            results[phase] = {}
+
+    # Do not wait for lookups that timed out
+    executor.shutdown(wait=False)
+    timings["bootstrap"] = time.perf_counter() - start_time
+
+    return results["entity"], results["app"], timings
+
+
+def submit_bug_report(n_clicks, bug_description, token=None, entity_data=None, session_id=None):
+    """
+    Submits a bug report based on user input and the session's token and entity data.
+
+    The token and entity data are loaded from the server-side session (see
+    `process_url_and_token_to_session`). Apps that opted out of server-side sessions
+    pass the token and entity data from the browser stores instead.
 
     Args:
         n_clicks (int): The number of times the submit button has been clicked.
         bug_description (str): The description of the bug provided by the user.
-        token (str): The authentication token.
-        entity_data (dict): The data related to the current entity.
+        token (str, optional): The authentication token, without a session.
+        entity_data (dict, optional): The data related to the current entity, without a session.
+        session_id (str, optional): The session ID from the "session_id" store.
 
     Returns:
         tuple: A tuple containing two boolean values indicating success and failure status of the submission.
                (is_open_success, is_open_failure)
     """
 
-    print("submit bug report", token)
-
+    if session_id:
+        session = load_session(session_id)
+        token_data = session.token_data or {}
+        entity_data = session.entity_data
     # Parse token data if token is provided, otherwise set it to an empty dictionary
-    if token:
+    elif token:
         token_data = json.loads(bfabric_interface.token_to_data(token))
     else:
         token_data = {}
@@ -175,18 +261,22 @@ def submit_bug_report(n_clicks, bug_description, token, entity_data):
     return False, False
 
 
-def populate_workunit_details(token_data):
+def populate_workunit_details(token_data=None, session_id=None):
 
     """
     Function to populate workunit data for the current app instance.
 
     Args: 
-        token_data (dict): Token metadata.
+        token_data (dict, optional): Token metadata, for apps without server-side sessions.
+        session_id (str, optional): The session ID from the "session_id" store.
 
     Returns:
         html.Div: A div containing the populated workunit data.
     """
 
+    if session_id:
+        token_data = load_session(session_id).token_data
+
     environment_urls = {
         "test": f"https://{settings.TEST_BFABRIC_DOMAIN}/bfabric/workunit/show.html?id=",
         "production": f"https://{settings.PRODUCTION_BFABRIC_DOMAIN}/bfabric/workunit/show.html?id="
@@ -197,11 +287,11 @@ def populate_workunit_details(token_data):
         jobId = token_data.get('jobId', None)
         print("jobId", jobId)
         
-        job = bfabric_interface.get_wrapper().read("job", {"id": jobId})[0]
+        job = bfabric_interface.get_wrapper(token_data).read("job", {"id": jobId})[0]
         workunits = job.get("workunit", [])
 
         if workunits:
-            wus = bfabric_interface.get_wrapper().read(
+            wus = bfabric_interface.get_wrapper(token_data).read(
                 "workunit", 
                 {"id": [wu["id"] for wu in workunits]}
             )
@@ -238,105 +328,115 @@ def populate_workunit_details(token_data):
     else:
         return html.Div()
 
+# Card text class and background color per job status
+JOB_CARD_STYLES = {
+    "Running": ("text-success", "#d4edda"),
+    "Failed": ("text-danger", "#f8d7da"),
+    "Completed": ("text-primary", "#d1ecf1"),
+}
+
+
+def _job_card(job):
+    text_class, background = JOB_CARD_STYLES[job["status"]]
+    body = [
+        html.H6(f"Job ID: {job['id']}", className="card-title"),
+        html.P(f"Function: {job['func_name']}", className="card-text"),
+        html.P(f"Status: {job['status']}", className=text_class),
+    ]
+    if job["status"] == "Completed":
+        body.append(html.P(f"Finished at: {job['ended_at']}", className="text-muted"))
+
+    return dbc.Card(dbc.CardBody(body), style={"maxWidth": "36vw", "backgroundColor": background}, className="mb-2")
+
+
+def _queue_card(queue_name, queue_snapshot):
+    stats = queue_snapshot["stats"]
+
+    stats_row = dbc.Row([
+        dbc.Col([
+            html.P([html.B("Jobs in queue: "), f"{stats['Jobs in queue']}"]),
+            html.P([html.B("Running: "), f"{stats['Running']}"]),
+        ],width=6),
+        dbc.Col([
+            html.P([html.B("Failed: "), f"{stats['Failed']}"]),
+            html.P([html.B("Completed: "), f"{stats['Completed']}"]),
+        ], width=6)
+    ])
+
+    hidden = sum(stats[status] for status in JOB_CARD_STYLES) - len(queue_snapshot["jobs"])
+    more = [html.P(f"... and {hidden} older jobs", className="text-muted")] if hidden > 0 else []
+
+    return dbc.Col([
+        dbc.Card(
+            [
+                dbc.CardHeader(html.H5(f"Queue: {queue_name}")),
+                dbc.CardBody([
+                    stats_row,
+                    html.Hr(),
+                    *[_job_card(job) for job in queue_snapshot["jobs"]],
+                    *more
+                ], style={"maxHeight": "58vh", "overflow-y": "scroll"})
+            ],
+            style={"maxWidth": "36vw", "backgroundColor": "#f8f9fa", "max-height":"60vh"}, className="mb-4"
+        )
+    ])
+
+
+def _queue_layout(snapshot):
+    queue_cards = [_queue_card(queue_name, queue) for queue_name, queue in snapshot.items()]
+
+    container_children = dbc.Row(queue_cards)
+
+    return dbc.Container(container_children, className="mt-4")
+
+
 def get_redis_queue_layout():
-    # Get all queues dynamically
-    queues = Queue.all(connection=redis_conn)
-
-    queue_cards = []
-
-    print("QUEUES", queues)
-    
-    for queue in queues:
-        queue_name = queue.name
-
-        # Get queue stats
-        started_registry = StartedJobRegistry(queue_name, connection=redis_conn)
-        failed_registry = FailedJobRegistry(queue_name, connection=redis_conn)
-        finished_registry = FinishedJobRegistry(queue_name, connection=redis_conn)
-
-        stats = {
-            "Jobs in queue": queue.count,
-            "Running": started_registry.count,
-            "Failed": failed_registry.count,
-            "Completed": finished_registry.count,
-        }
-
-        print("STAT", stats)
-
-        stats_row = dbc.Row([
-            dbc.Col([
-                html.P([html.B("Jobs in queue: "), f"{queue.count}"]),
-                html.P([html.B("Running: "), f"{started_registry.count}"]),
-            ],width=6),
-            dbc.Col([
-                html.P([html.B("Failed: "), f"{failed_registry.count}"]),
-                html.P([html.B("Completed: "), f"{finished_registry.count}"]),
-            ], width=6)
-        ])
-
-        # Fetch job details
-        job_cards = []
-        for job_id in started_registry.get_job_ids():
-            job = queue.fetch_job(job_id)
-            if job:
-                job_cards.append(
-                    dbc.Card(
-                        dbc.CardBody([
-                            html.H6(f"Job ID: {job.id}", className="card-title"),
-                            html.P(f"Function: {job.func_name}", className="card-text"),
-                            html.P(f"Status: Running", className="text-success"),
-                        ]),
-                        style={"maxWidth": "36vw", "backgroundColor": "#d4edda"}, className="mb-2"
-                    )
-                )
+    """
+    Builds the Queue tab content: one card per queue with its counts and newest jobs.
 
-        for job_id in failed_registry.get_job_ids():
-            job = queue.fetch_job(job_id)
-            if job:
-                job_cards.append(
-                    dbc.Card(
-                        dbc.CardBody([
-                            html.H6(f"Job ID: {job.id}", className="card-title"),
-                            html.P(f"Function: {job.func_name}", className="card-text"),
-                            html.P(f"Status: Failed", className="text-danger"),
-                        ]),
-                        style={"maxWidth": "36vw", "backgroundColor": "#f8d7da"}, className="mb-2"
-                    )
-                )
+    All queues are read in two pipelined Redis round trips and at most
+    QUEUE_MONITOR_MAX_CARDS jobs are listed per queue (see `get_queue_snapshot`).
 
-        for job_id in finished_registry.get_job_ids():
-            job = queue.fetch_job(job_id)
-            if job:
-                finished_time = job.ended_at.strftime("%Y-%m-%d %H:%M:%S") if job.ended_at else "Unknown"
-                job_cards.append(
-                    dbc.Card(
-                        dbc.CardBody([
-                            html.H6(f"Job ID: {job.id}", className="card-title"),
-                            html.P(f"Function: {job.func_name}", className="card-text"),
-                            html.P(f"Status: Completed", className="text-primary"),
-                            html.P(f"Finished at: {finished_time}", className="text-muted"),
-                        ]),
-                        style={"maxWidth": "36vw", "backgroundColor": "#d1ecf1"}, className="mb-2"
-                    )
-                )
+    Returns:
+        dbc.Container: The queue cards.
+    """
+    return _queue_layout(get_queue_snapshot())
 
-        # Create queue card
-        queue_card = dbc.Col([
-            dbc.Card(
-                [
-                    dbc.CardHeader(html.H5(f"Queue: {queue_name}")),
-                    dbc.CardBody([
-                        stats_row,  # Fixed: Convert dictionary to list
-                        html.Hr(),
-                        *job_cards  # Add job sub-cards
-                    ], style={"maxHeight": "58vh", "overflow-y": "scroll"})
-                ],
-                style={"maxWidth": "36vw", "backgroundColor": "#f8f9fa", "max-height":"60vh"}, className="mb-4"
-            )
-        ])
 
-        queue_cards.append(queue_card)
+def get_redis_queue_updates(cursor=None):
+    """
+    Returns only what changed in the Queue tab since the last poll.
 
-    container_children = dbc.Row(queue_cards)
+    On the first poll, or when queues were added or removed, the full layout is returned.
+    Otherwise only the cards of changed queues are sent as a `dash.Patch`, and
+    `dash.no_update` is returned when nothing changed.
 
-    return dbc.Container(container_children, className="mt-4")
+    Example:
+        @app.callback(
+            [Output("page-content-queue-children", "children"), Output("queue-cursor", "data")],
+            [Input("queue-interval", "n_intervals")],
+            [State("queue-cursor", "data")]
+        )
+        def update_queues(n_intervals, cursor):
+            return get_redis_queue_updates(cursor)
+
+    Args:
+        cursor (dict, optional): The cursor returned by the previous call (kept in the "queue-cursor" store).
+
+    Returns:
+        tuple: (children, cursor) where children is the full layout, a Patch or no_update.
+    """
+    snapshot, changed, new_cursor = get_queue_changes(cursor)
+
+    if not cursor or cursor.get("queues") != new_cursor["queues"]:
+        return _queue_layout(snapshot), new_cursor
+
+    if not changed:
+        return no_update, no_update
+
+    patch = Patch()
+    queue_names = new_cursor["queues"]
+    for queue_name in changed:
+        # children = Container(Row([queue cards])) -> Row is the container's child
+        patch["props"]["children"]["props"]["children"][queue_names.index(queue_name)] = _queue_card(queue_name, snapshot[queue_name])
+    return patch, new_cursor
@@ -10,6 +10,14 @@ class Settings(BaseSettings):
     REDIS_USERNAME: Optional[str] = None
     REDIS_PASSWORD: Optional[str] = None
 
+    # Shared Redis connection pool (see get_redis_connection)
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_POOL_TIMEOUT: float = 10.0
+    REDIS_SOCKET_CONNECT_TIMEOUT: float = 5.0
+    REDIS_SOCKET_TIMEOUT: Optional[float] = None
+    REDIS_HEALTH_CHECK_INTERVAL: int = 30
+    REDIS_RETRY_ATTEMPTS: int = 3
+
     CONFIG_FILE_PATH: str = "~/.bfabricpy.yml"
 
     HOST: str = "127.0.0.1"
@@ -28,16 +36,132 @@ class Settings(BaseSettings):
     TRX_SSH_KEY: str = "/home/user/.ssh/your_ssh_key"
     URL: str = "https:/fgcz/dummy/url"
 
+    # Commands used to transfer attachments to gstore (can point to local stand-ins for testing)
+    SCP_COMMAND: str = "scp"
+    SSH_COMMAND: str = "ssh"
+    G_REQ_COMMAND: str = "/usr/local/ngseq/bin/g-req"
+
+    # Copy all attachments of an entity in one SCP session and one remote g-req call
+    GSTORE_BATCH_TRANSFER: bool = True
+
+    # Polling for transferred attachments to arrive on gstore
+    GSTORE_TRANSFER_TIMEOUT: float = 60.0
+    GSTORE_TRANSFER_POLL_INTERVAL: float = 1.0
+    GSTORE_TRANSFER_POLL_BACKOFF: float = 2.0
+    # "ssh" polls on the TRX login host, "auto" only if GSTORE_REMOTE_PATH is visible there, "off" never polls
+    GSTORE_ARRIVAL_CHECK: str = "auto"
+    GSTORE_TRANSFER_DELAY: float = 10.0  # Seconds waited instead of polling when the arrival cannot be checked
+
+    # Staging area for files passed to run_main_job by reference (must be shared by web app and workers)
+    STAGING_PATH: Optional[str] = None
+    STAGING_CHUNK_SIZE: int = 4 * 1024 * 1024
+    STAGING_MAX_AGE: int = 7 * 24 * 3600
+    STAGING_CLEANUP_INTERVAL: int = 3600  # stage_file removes old staged files at most this often
+
+    # Execution of bash commands in run_main_job
+    BASH_COMMAND_TIMEOUT: Optional[float] = None
+    BASH_OUTPUT_BUFFER_LINES: int = 1000
+    BASH_PROGRESS_INTERVAL: float = 60.0
+    BASH_MAX_PARALLEL: int = 4
+    BASH_LOG_DIR: Optional[str] = None
+    BASH_LOG_KEEP: int = 20
+
     # Which service id to use for the charge 
     SERVICE_ID: int = 0
 
     # Which dataset template id to use for dataset creation
     DATASET_TEMPLATE_ID: int = 0
 
+    # "create" saves a new dataset per container, "sync" updates the one linked to the workunit if its content changed
+    DATASET_MODE: str = "create"
+    DATASET_SYNC_KEY_COLUMN: str = ""  # Field matching rows in "sync" mode, empty for the first field
+
     # B-Fabric url paths
     PRODUCTION_BFABRIC_DOMAIN: str = "fgcz-bfabric.uzh.ch"
     TEST_BFABRIC_DOMAIN: str = "fgcz-bfabric-test.uzh.ch"
 
+    # Maximum number of objects sent in one multi-object B-Fabric save call
+    BFABRIC_SAVE_CHUNK_SIZE: int = 100
+
+    # Maximum number of concurrent save calls when registering resources
+    RESOURCE_REGISTRATION_WORKERS: int = 4
+
+    # Token validation cache (entries never outlive the token's expiryDateTime)
+    TOKEN_CACHE_SIZE: int = 1024
+    TOKEN_CACHE_TTL: int = 300
+
+    # Shared cache of entities read on session start
+    ENTITY_CACHE_SIZE: int = 1024
+    ENTITY_CACHE_TTL: int = 3600
+    ENTITY_CACHE_REVALIDATE_AFTER: int = 30
+
+    # Include the full entity API response in entity_data (stored in the browser session)
+    ENTITY_DATA_INCLUDE_FULL_RESPONSE: bool = False
+
+    # Process-wide cache of application metadata (id, name, description)
+    APP_DATA_CACHE_SIZE: int = 256
+    APP_DATA_CACHE_TTL: int = 3600
+
+    # Overall timeout for the concurrent entity/application lookups of a new session
+    SESSION_BOOTSTRAP_TIMEOUT: float = 15.0
+
+    # Maximum number of job cards listed per queue in the Queue tab
+    QUEUE_MONITOR_MAX_CARDS: int = 50
+
+    # Push updates of the Queue tab: workers publish job state transitions on a Redis channel
+    JOB_EVENTS_ENABLED: bool = True
+    JOB_EVENTS_CHANNEL: str = "bfabric_web_apps:job_events"
+    JOB_EVENTS_PATH: str = "/job-events"
+    JOB_EVENTS_HEARTBEAT: float = 15.0
+    JOB_EVENTS_DEBOUNCE: float = 0.5
+    JOB_EVENTS_FALLBACK_INTERVAL: int = 60
+    # Whether the server can hold event streams open (threaded or gevent workers); None detects it per request
+    JOB_EVENTS_STREAMING: Optional[bool] = None
+
+    # Worker pool (run_worker with processes > 1): seconds to wait for running jobs on shutdown
+    # (None waits until they finish) and maximum delay before restarting a crashed worker
+    WORKER_DRAIN_TIMEOUT: Optional[float] = None
+    WORKER_RESTART_MAX_DELAY: int = 60
+
+    # Job scheduler (redis_queue.scheduler): slots of the workers of a queue, and the slots and
+    # timeout (seconds) of each resource class
+    SCHEDULER_CAPACITY: dict = {"cpu": 8, "memory_gb": 32}
+    SCHEDULER_RESOURCE_CLASSES: dict = {
+        "small": {"cpu": 1, "memory_gb": 2, "timeout": 3600},
+        "medium": {"cpu": 4, "memory_gb": 8, "timeout": 6 * 3600},
+        "large": {"cpu": 8, "memory_gb": 32, "timeout": 24 * 3600},
+    }
+    SCHEDULER_DECISION_LOG_SIZE: int = 1000
+    SCHEDULER_RECONCILE_INTERVAL: float = 60.0  # Seconds between reconcile and dispatch runs of each worker, 0 disables
+
+    # Scanning of the resource directories of run_main_job (see FileManifest)
+    MANIFEST_SCAN_WORKERS: int = 8
+    MANIFEST_SYMLINKS: str = "files"
+    RESOURCE_INCLUDE_GLOBS: Optional[list] = None
+    RESOURCE_EXCLUDE_GLOBS: Optional[list] = None
+
+    # Maximum number of run_main_job steps (and per-container sub-tasks of a step) running at once
+    PIPELINE_MAX_WORKERS: int = 4
+
+    # Per-job checkpoints: a retried or requeued RQ job skips the steps completed before
+    CHECKPOINTS_ENABLED: bool = True
+    CHECKPOINT_TTL: int = 7 * 24 * 3600
+
+    # Minimum lifetime in seconds of a server-side session (it otherwise expires with its token)
+    SESSION_MIN_TTL: int = 300
+
+    # Per-user pool of authenticated Bfabric clients
+    WRAPPER_POOL_SIZE: int = 256
+    WRAPPER_POOL_IDLE_TIMEOUT: int = 1800
+
+    # Background shipping of Logger entries to B-Fabric
+    LOG_SHIPPER_ENABLED: bool = True
+    LOG_SHIPPER_BATCH_SIZE: int = 200
+    LOG_SHIPPER_FLUSH_INTERVAL: float = 2.0
+    LOG_SHIPPER_MAX_QUEUE_SIZE: int = 10000
+    LOG_SHIPPER_MAX_RETRIES: int = 3
+    LOG_SHIPPER_EXIT_TIMEOUT: float = 10.0
+
     class Config:
 
         env_file = ".env"  
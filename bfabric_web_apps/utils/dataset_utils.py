@@ -7,6 +7,21 @@ def is_numeric(value):
         return False
 
 
+def check_column_lengths(dictionary):
+    """
+    Checks that all columns of a dataset dictionary have the same length.
+
+    Args:
+        dictionary (dict): A dictionary where the keys are the attribute names and the values are lists of field values.
+
+    Raises:
+        ValueError: If the columns have different lengths.
+    """
+    lengths = {name: len(values) for name, values in dictionary.items()}
+    if len(set(lengths.values())) > 1:
+        raise ValueError(f"All columns must have the same length, got {lengths}.")
+
+
 def dataset_to_dictionary(dataset): 
 
     """
@@ -71,14 +86,17 @@ def dictionary_to_dataset(dictionary, dataset_name, containerid, dataset_templat
     if not dictionary:
         return {}
 
+    check_column_lengths(dictionary)
+
     # Create a list of attributes
-    attributes = [{"name": name, "position": str(i+1)} for i, name in enumerate(dictionary.keys())]
+    positions = [str(j+1) for j in range(len(dictionary))]
+    attributes = [{"name": name, "position": position} for name, position in zip(dictionary.keys(), positions)]
 
-    # Create a list of items
-    items = []
-    for i in range(len(next(iter(dictionary.values())))):  # Get the length of the first value list
-        item = [{"attributeposition": str(j+1), "value": dictionary[name][i]} for j, name in enumerate(dictionary.keys())]
-        items.append({"field": item, "position": str(i+1)})
+    # Create a list of items, row by row
+    items = [
+        {"field": [{"attributeposition": position, "value": value} for position, value in zip(positions, row)], "position": str(i+1)}
+        for i, row in enumerate(zip(*dictionary.values()))
+    ]
 
     to_return = {"attribute": attributes, "item": items, "name": dataset_name, "containerid": containerid}
 
@@ -90,4 +108,271 @@ def dictionary_to_dataset(dictionary, dataset_name, containerid, dataset_templat
         # Add the linked workunit ID to the dataset
         to_return["workunitid"] = linked_workunit_id
 
-    return to_return
\ No newline at end of file
+    return to_return
+
+
+def _polars():
+    """Imports polars, which is only needed for the columnar conversions."""
+    try:
+        import polars as pl
+    except ImportError as e:
+        raise ImportError('The columnar dataset conversions require polars (pip install "bfabric-web-apps[polars]").') from e
+    return pl
+
+
+def _dataset_columns(dataset):
+    """
+    Gathers the field values of a dataset into one list per attribute, in item order.
+
+    Returns:
+        tuple: (attribute names in position order, {name: list of values}), missing fields are None.
+    """
+    attributes = sorted(dataset.get("attribute", []), key=lambda elt: int(elt.get("position")))
+    position_map = {str(elt.get("position")): elt.get("name") for elt in attributes}
+    items = dataset.get("item", [])
+
+    # Fill preallocated column lists in one pass over the items, without per-row containers
+    columns = {position: [None] * len(items) for position in position_map}
+    for i, item in enumerate(items):
+        for field in item.get("field", []):
+            column = columns.get(str(field.get("attributeposition")))
+            if column is not None:
+                column[i] = field.get("value")
+
+    return list(position_map.values()), {name: columns[position] for position, name in position_map.items()}
+
+
+def dataset_to_dataframe(dataset):
+    """
+    Convert a B-Fabric API Dataset Response to a Polars DataFrame.
+
+    Columns are named and ordered by the dataset attributes, rows by their item position,
+    and missing fields become nulls. This is a convenience for working on the dataset as a
+    table, not a faster `dataset_to_dictionary`: the response holds one Python dictionary
+    per cell, and walking them dominates either conversion. The fields are gathered into
+    column lists in a single Python pass and each list is handed to Polars at once, which
+    is faster than letting Polars ingest the nested items (`pl.from_dicts`, explode and
+    pivot), see benchmarks/dataset_conversion.py.
+
+    Args:
+        dataset (dict): B-Fabric API Dataset Response
+
+    Returns:
+        polars.DataFrame: One column per attribute.
+    """
+    pl = _polars()
+
+    if not dataset:
+        return pl.DataFrame()
+
+    names, columns = _dataset_columns(dataset)
+    items = dataset.get("item", [])
+
+    df = pl.DataFrame(columns, schema={name: pl.Utf8 for name in names}, strict=False)
+    rows = pl.Series("row", [int(item.get("position", i + 1)) for i, item in enumerate(items)], dtype=pl.Int64)
+    if not rows.is_sorted():
+        df = df.with_columns(rows).sort("row").drop("row")
+    return df
+
+
+def dataset_to_arrow(dataset):
+    """
+    Convert a B-Fabric API Dataset Response to a PyArrow Table.
+
+    Args:
+        dataset (dict): B-Fabric API Dataset Response
+
+    Returns:
+        pyarrow.Table: One column per attribute (see `dataset_to_dataframe`).
+    """
+    return dataset_to_dataframe(dataset).to_arrow()
+
+
+def dataframe_to_dataset(df, dataset_name, containerid, dataset_template_id=0, linked_workunit_id=0):
+    """
+    Convert a Polars DataFrame (or PyArrow Table, or dictionary of equal-length columns) to a B-Fabric API Dataset.
+
+    The columns are cast to strings by Polars in one step per column; values are sent as strings.
+    The API expects one dictionary per cell, so building the items takes about as long as
+    `dictionary_to_dataset`; they are built with a comprehension over the column lists, which
+    is faster than materializing a Polars struct column with `to_list`.
+
+    Args:
+        df (polars.DataFrame | pyarrow.Table | dict): The dataset content, one column per attribute.
+        dataset_name (str): Name of the dataset.
+        containerid (int): ID of the container the dataset belongs to.
+        dataset_template_id (int, optional): Dataset template ID.
+        linked_workunit_id (int, optional): ID of the workunit the dataset is linked to.
+
+    Returns:
+        dict: A B-Fabric API Dataset ready to be sent to the API.
+    """
+    pl = _polars()
+
+    if isinstance(df, dict):
+        check_column_lengths(df)
+        df = pl.DataFrame(df, strict=False)
+    elif not isinstance(df, pl.DataFrame):
+        df = pl.from_arrow(df)
+
+    if not isinstance(dataset_name, str):
+        raise ValueError("Dataset name must be a string.")
+
+    if not is_numeric(containerid):
+        raise ValueError("Container ID must be a numeric string or integer.")
+
+    if not isinstance(dataset_template_id, int):
+        raise ValueError("Dataset template ID must be an integer.")
+
+    if not isinstance(linked_workunit_id, int):
+        raise ValueError("Linked workunit ID must be an integer.")
+
+    if df.width == 0:
+        return {}
+
+    positions = [str(j+1) for j in range(df.width)]
+    attributes = [{"name": name, "position": position} for name, position in zip(df.columns, positions)]
+
+    # Cast column-wise, then assemble the nested items straight from the column lists
+    columns = [series.to_list() for series in df.select(pl.all().cast(pl.Utf8)).get_columns()]
+    items = [
+        {"field": [{"attributeposition": position, "value": value} for position, value in zip(positions, row)], "position": str(i+1)}
+        for i, row in enumerate(zip(*columns))
+    ]
+
+    to_return = {"attribute": attributes, "item": items, "name": dataset_name, "containerid": containerid}
+
+    if dataset_template_id:
+        # Add the dataset template ID to the dataset
+        to_return["datasettemplateid"] = dataset_template_id
+
+    if linked_workunit_id:
+        # Add the linked workunit ID to the dataset
+        to_return["workunitid"] = linked_workunit_id
+
+    return to_return
+
+
+def _cell(value):
+    """Normalizes a field value for comparison: B-Fabric returns every value as a string."""
+    return None if value is None else str(value)
+
+
+def _row_keys(values):
+    """Keys matching rows between datasets: the key value and its occurrence, so duplicate keys pair up in order."""
+    seen = {}
+    keys = []
+    for value in values:
+        value = _cell(value)
+        seen[value] = seen.get(value, 0) + 1
+        keys.append((value, seen[value]))
+    return keys
+
+
+def diff_dataset(dataset, dictionary, key_column=None):
+    """
+    Compare an existing B-Fabric dataset with the new content of the dataset.
+
+    Rows are matched on the values of `key_column` (e.g. the sample name), so inserting or
+    removing a row does not mark the rows after it as changed. Columns are matched by name.
+
+    Args:
+        dataset (dict): B-Fabric API Dataset Response of the existing dataset.
+        dictionary (dict): The new content, keys are attribute names and values are lists of field values.
+        key_column (str, optional): Attribute identifying a row. Defaults to the first column of `dictionary`.
+
+    Returns:
+        dict: The differences:
+              - key_column (str): The attribute rows were matched on.
+              - added_columns / removed_columns (list[str]): Attribute names only in the new / existing dataset.
+              - added_rows / removed_rows (int): Rows whose key is only in the new / existing dataset.
+              - changed_rows (list[int]): 1-based positions, in the new content, of the matched rows whose values differ.
+              - changed_cells (int): Number of differing values in those rows.
+              - reordered (bool): True if the matched rows are in a different order.
+              - changed (bool): True if the dataset has to be saved again.
+
+    Raises:
+        ValueError: If the columns have different lengths or `key_column` is not a column of `dictionary`.
+    """
+    check_column_lengths(dictionary)
+
+    new_columns = list(dictionary)
+    key_column = key_column or next(iter(new_columns), None)
+    if new_columns and key_column not in dictionary:
+        raise ValueError(f"Key column '{key_column}' is not a column of the dataset {new_columns}.")
+
+    existing_columns, existing = _dataset_columns(dataset) if dataset else ([], {})
+    existing_rows = len((dataset or {}).get("item", []))
+    new_rows = len(next(iter(dictionary.values()), []))
+
+    new_keys = _row_keys(dictionary[key_column]) if new_columns else []
+    existing_keys = _row_keys(existing.get(key_column, [None] * existing_rows))
+    existing_index = {key: i for i, key in enumerate(existing_keys)}
+
+    shared = [name for name in new_columns if name in existing]
+    matched = []
+    changed_rows = []
+    changed_cells = 0
+    for i, key in enumerate(new_keys):
+        j = existing_index.get(key)
+        if j is None:
+            continue
+        matched.append(j)
+        differing = sum(1 for name in shared if _cell(existing[name][j]) != _cell(dictionary[name][i]))
+        if differing:
+            changed_rows.append(i + 1)
+            changed_cells += differing
+
+    diff = {
+        "key_column": key_column,
+        "added_columns": [name for name in new_columns if name not in existing_columns],
+        "removed_columns": [name for name in existing_columns if name not in new_columns],
+        "added_rows": new_rows - len(matched),
+        "removed_rows": existing_rows - len(matched),
+        "changed_rows": changed_rows,
+        "changed_cells": changed_cells,
+        "reordered": matched != sorted(matched),
+    }
+    diff["changed"] = (
+        existing_columns != new_columns or bool(diff["added_rows"] or diff["removed_rows"] or changed_rows or diff["reordered"])
+    )
+    return diff
+
+
+def dataset_patch(dataset, dictionary, diff=None, linked_workunit_id=0, key_column=None):
+    """
+    Build the update of an existing B-Fabric dataset, or {} if it is up to date.
+
+    B-Fabric does not document how a dataset save merges a partial item list into the
+    existing items, so whenever the content changed (see `diff_dataset`) the update carries
+    the complete attribute and item lists, which replace the existing ones. A dataset whose
+    content did not change is not saved again, and only relinked if `linked_workunit_id` differs.
+
+    Args:
+        dataset (dict): B-Fabric API Dataset Response of the existing dataset.
+        dictionary (dict): The new content, keys are attribute names and values are lists of field values.
+        diff (dict, optional): The result of `diff_dataset`, computed if not given.
+        linked_workunit_id (int, optional): ID of the workunit the dataset is linked to.
+        key_column (str, optional): Attribute identifying a row when `diff` is computed, see `diff_dataset`.
+
+    Returns:
+        dict: A B-Fabric API Dataset update (with the dataset ID), or {} if nothing changed.
+    """
+    diff = diff or diff_dataset(dataset, dictionary, key_column)
+
+    relink = bool(linked_workunit_id) and str(linked_workunit_id) != str((dataset.get("workunit") or {}).get("id"))
+    if not diff["changed"] and not relink:
+        return {}
+
+    patch = {"id": dataset.get("id")}
+    if diff["changed"]:
+        positions = [str(j+1) for j in range(len(dictionary))]
+        patch["attribute"] = [{"name": name, "position": position} for name, position in zip(dictionary.keys(), positions)]
+        patch["item"] = [
+            {"field": [{"attributeposition": position, "value": value} for position, value in zip(positions, row)], "position": str(i+1)}
+            for i, row in enumerate(zip(*dictionary.values()))
+        ]
+    if relink:
+        patch["workunitid"] = linked_workunit_id
+
+    return patch
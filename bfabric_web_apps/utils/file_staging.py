@@ -0,0 +1,214 @@
+import io
+import os
+import time
+import hashlib
+import tempfile
+
+from .config import settings as config
+
+# Time of this process' last cleanup of the staging area, see stage_file
+_last_cleanup = 0.0
+
+
+def get_staging_path():
+    """
+    Returns the staging directory shared by the web process and the workers, creating it if needed.
+
+    Returns:
+        str: The staging directory (STAGING_PATH).
+
+    Raises:
+        RuntimeError: If STAGING_PATH is not set. A local default would not be readable by workers on other hosts.
+    """
+    if not config.STAGING_PATH:
+        raise RuntimeError("STAGING_PATH is not set: configure a directory shared by the web app and the workers to stage files.")
+
+    staging_path = os.path.expanduser(config.STAGING_PATH)
+    os.makedirs(staging_path, exist_ok=True)
+    return staging_path
+
+
+def is_staged_reference(value):
+    """
+    Checks whether a value is a reference returned by `stage_file` / `stage_bytes`.
+
+    Args:
+        value: Any value of a files_as_byte_strings dictionary.
+
+    Returns:
+        bool: True if the value is a staging reference.
+    """
+    return isinstance(value, dict) and "staged_sha256" in value
+
+
+def stage_file(source, chunk_size=None):
+    """
+    Streams a file into the content-addressed staging area.
+
+    The file is copied chunk by chunk and stored under its SHA-256 digest, so identical
+    content is staged only once. Pass the returned reference to `run_main_job` (in place of
+    the file's bytes in `files_as_byte_strings`) to keep the file content out of the job payload.
+
+    At most once per STAGING_CLEANUP_INTERVAL seconds, staged files unused for STAGING_MAX_AGE
+    seconds are removed (see `cleanup_staging`). Staged files are not removed once written to
+    their destination, because other jobs, or a retry of the same job, may still need them.
+
+    Args:
+        source (str | file-like): Path of the file, or a binary file-like object.
+        chunk_size (int, optional): Bytes read per chunk. Defaults to STAGING_CHUNK_SIZE.
+
+    Returns:
+        dict: A reference {"staged_sha256": digest, "size": bytes}.
+    """
+    chunk_size = chunk_size or config.STAGING_CHUNK_SIZE
+    staging_path = get_staging_path()
+    _cleanup_periodically()
+
+    if isinstance(source, (str, os.PathLike)):
+        with open(os.path.expanduser(source), "rb") as f:
+            return stage_file(f, chunk_size)
+
+    digest = hashlib.sha256()
+    size = 0
+
+    fd, tmp_path = tempfile.mkstemp(dir=staging_path, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            for chunk in iter(lambda: source.read(chunk_size), b""):
+                digest.update(chunk)
+                tmp.write(chunk)
+                size += len(chunk)
+
+        staged_path = os.path.join(staging_path, digest.hexdigest())
+        if os.path.exists(staged_path):
+            os.remove(tmp_path)
+            os.utime(staged_path)  # Keep it from being cleaned up while in use
+        else:
+            os.replace(tmp_path, staged_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    return {"staged_sha256": digest.hexdigest(), "size": size}
+
+
+def stage_bytes(data: bytes):
+    """
+    Stores a byte string in the content-addressed staging area.
+
+    Args:
+        data (bytes): The file content, e.g. a decoded Dash upload.
+
+    Returns:
+        dict: A reference {"staged_sha256": digest, "size": bytes}.
+    """
+    return stage_file(io.BytesIO(data))
+
+
+def _current_umask():
+    """Returns the process umask without changing it, where the platform allows it."""
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("Umask:"):
+                    return int(line.split()[1], 8)
+    except (OSError, ValueError):
+        pass
+
+    # os.umask can only be read by setting it, so set it back right away
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return umask
+
+
+def write_staged_file(reference, destination, chunk_size=None):
+    """
+    Streams a staged file to its destination and verifies its checksum.
+
+    The content is written to a temporary file next to the destination and only moved
+    into place once its SHA-256 digest matches the reference.
+
+    Args:
+        reference (dict): A reference returned by `stage_file` / `stage_bytes`.
+        destination (str): Path of the file to write.
+        chunk_size (int, optional): Bytes copied per chunk. Defaults to STAGING_CHUNK_SIZE.
+
+    Returns:
+        int: Number of bytes written.
+
+    Raises:
+        FileNotFoundError: If the staged file no longer exists.
+        ValueError: If the written content does not match the reference checksum.
+    """
+    chunk_size = chunk_size or config.STAGING_CHUNK_SIZE
+    staged_path = os.path.join(get_staging_path(), reference["staged_sha256"])
+
+    destination_dir = os.path.dirname(os.path.abspath(destination))
+    digest = hashlib.sha256()
+    size = 0
+
+    fd, tmp_path = tempfile.mkstemp(dir=destination_dir, suffix=".part")
+    try:
+        with open(staged_path, "rb") as src, os.fdopen(fd, "wb") as dst:
+            for chunk in iter(lambda: src.read(chunk_size), b""):
+                digest.update(chunk)
+                dst.write(chunk)
+                size += len(chunk)
+
+        if digest.hexdigest() != reference["staged_sha256"]:
+            raise ValueError(f"Checksum mismatch for {destination}: expected {reference['staged_sha256']}, got {digest.hexdigest()}")
+
+        # mkstemp creates the file with mode 0600; give it the mode a plain open() would
+        os.chmod(tmp_path, 0o666 & ~_current_umask())
+        os.replace(tmp_path, destination)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    return size
+
+
+def _cleanup_periodically():
+    """Runs `cleanup_staging` if this process has not done so for STAGING_CLEANUP_INTERVAL seconds."""
+    global _last_cleanup
+
+    now = time.time()
+    if now - _last_cleanup < config.STAGING_CLEANUP_INTERVAL:
+        return
+    _last_cleanup = now
+
+    try:
+        removed = cleanup_staging()
+        if removed:
+            print(f"Removed {removed} unused staged file(s)")
+    except Exception as e:
+        print(f"Could not clean up the staging area: {e}")
+
+
+def cleanup_staging(max_age=None):
+    """
+    Removes staged files that have not been used for a while.
+
+    Args:
+        max_age (float, optional): Age in seconds after which a staged file is removed. Defaults to STAGING_MAX_AGE.
+
+    Returns:
+        int: Number of removed files.
+    """
+    max_age = config.STAGING_MAX_AGE if max_age is None else max_age
+    staging_path = get_staging_path()
+    cutoff = time.time() - max_age
+    removed = 0
+
+    with os.scandir(staging_path) as entries:
+        for entry in entries:
+            try:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+                    removed += 1
+            except FileNotFoundError:
+                continue
+
+    return removed
@@ -1,27 +1,79 @@
 import os
+import threading
+import weakref
 from bfabric import Bfabric
 import bfabric_web_apps
 
+# Process-wide registry of power user clients: (config path, environment) -> list of
+# [config mtime, Bfabric, weak reference to the thread currently owning the client]
+_power_user_wrappers = {}
+_power_user_wrappers_lock = threading.Lock()
+
 def get_power_user_wrapper(token_data):
     """
     Initializes and returns a Bfabric power user instance configured for a specific environment.
 
-    This function retrieves the environment information from the provided `token_data` 
-    and uses it to initialize a Bfabric instance. The configuration file path is 
+    This function retrieves the environment information from the provided `token_data`
+    and uses it to initialize a Bfabric instance. The configuration file path is
     determined by the `CONFIG_FILE_PATH` from the application's configuration.
 
+    Clients are memoized per configuration file and environment, so the configuration
+    file is parsed and the client is built only once per process. The cached client is
+    rebuilt automatically when the modification time of the configuration file changes.
+
+    The SUDS client of a Bfabric instance is not thread-safe, so each thread gets its own
+    client. A client is only handed to another thread once its owning thread has ended,
+    so short-lived pool threads reuse the clients of earlier ones.
+
     Args:
         token_data (dict): A dictionary containing token information
-            The key "environment" is used to determine the environment 
+            The key "environment" is used to determine the environment
             (default is "None" if not specified).
 
     Returns:
-        Bfabric: A Bfabric instance initialized with the configuration 
+        Bfabric: A Bfabric instance initialized with the configuration
         corresponding to the specified environment.
     """
     environment = token_data.get("environment", "None")
 
-    return  Bfabric.from_config(
-            config_path = os.path.expanduser(bfabric_web_apps.CONFIG_FILE_PATH),
-            config_env = environment.upper()
-    )
\ No newline at end of file
+    config_path = os.path.expanduser(bfabric_web_apps.CONFIG_FILE_PATH)
+    config_env = environment.upper()
+
+    try:
+        mtime = os.path.getmtime(config_path)
+    except OSError:
+        mtime = None
+
+    key = (config_path, config_env)
+    current = threading.current_thread()
+
+    with _power_user_wrappers_lock:
+        # Clients built from an older version of the config file are dropped
+        entries = [entry for entry in _power_user_wrappers.get(key, []) if entry[0] == mtime]
+        _power_user_wrappers[key] = entries
+
+        for entry in entries:
+            if entry[2]() is current:
+                return entry[1]
+
+        for entry in entries:
+            owner = entry[2]()
+            if owner is None or not owner.is_alive():
+                entry[2] = weakref.ref(current)
+                return entry[1]
+
+        wrapper = Bfabric.from_config(
+                config_path = config_path,
+                config_env = config_env
+        )
+        entries.append([mtime, wrapper, weakref.ref(current)])
+
+    return wrapper
+
+
+def clear_power_user_wrappers():
+    """
+    Drops all cached power user clients, forcing them to be rebuilt on next use.
+    """
+    with _power_user_wrappers_lock:
+        _power_user_wrappers.clear()
@@ -0,0 +1,170 @@
+import json
+import time
+
+from .config import settings as config
+from bfabric_web_apps.objects.JobScheduler import SchedulerWorker
+
+# Seconds between refreshes of the Queue tab when job events cannot be streamed
+POLLING_INTERVAL = 5
+
+# Clientside callback opening one EventSource per browser tab. Events are debounced, so a
+# burst of job transitions triggers a single refresh of the Queue tab. If the server refuses
+# the stream (see `streaming_supported`), the Queue tab falls back to polling.
+EVENT_SOURCE_JS = """
+function(url) {
+    if (!url || window.bfabricJobEvents) {
+        return window.dash_clientside.no_update;
+    }
+    const source = new EventSource(url);
+    let timer = null;
+    window.bfabricJobEvents = source;
+    source.addEventListener("job", function(e) {
+        clearTimeout(timer);
+        timer = setTimeout(function() {
+            window.dash_clientside.set_props("queue-events", {data: JSON.parse(e.data)});
+        }, %d);
+    });
+    source.addEventListener("error", function() {
+        if (source.readyState === EventSource.CLOSED) {
+            window.dash_clientside.set_props("queue-interval", {interval: %d});
+        }
+    });
+    return window.dash_clientside.no_update;
+}
+"""
+
+
+def publish_job_event(connection, job, status):
+    """
+    Publishes a job state transition on the job events channel.
+
+    Publishing is best effort: a failure is printed and never affects the job.
+
+    Args:
+        connection (redis.Redis): Redis connection.
+        job (rq.job.Job): The job.
+        status (str): "started", "finished" or "failed".
+    """
+    event = {
+        "queue": job.origin,
+        "job_id": job.id,
+        "status": status,
+        "time": time.time(),
+    }
+    try:
+        connection.publish(config.JOB_EVENTS_CHANNEL, json.dumps(event))
+    except Exception as e:
+        print(f"Failed to publish job event {event}: {e}")
+
+
+def streaming_supported(environ):
+    """
+    Checks whether the server handling a request can hold an event stream open.
+
+    Each open stream occupies its worker for as long as the Queue tab is open, so a server
+    with synchronous workers (e.g. gunicorn's default "sync" worker class) would run out of
+    workers. Threaded servers (gunicorn "gthread", the Flask development server) and
+    gevent or eventlet workers are supported. JOB_EVENTS_STREAMING overrides the detection.
+
+    Args:
+        environ (dict): The WSGI environment of the request.
+
+    Returns:
+        bool: True if event streams can be served.
+    """
+    if config.JOB_EVENTS_STREAMING is not None:
+        return config.JOB_EVENTS_STREAMING
+
+    if environ.get("wsgi.multithread"):
+        return True
+
+    try:
+        from gevent import monkey
+        if monkey.is_module_patched("socket"):
+            return True
+    except ImportError:
+        pass
+
+    try:
+        from eventlet import patcher
+        if patcher.is_monkey_patched("socket"):
+            return True
+    except ImportError:
+        pass
+
+    return False
+
+
+class EventWorker(SchedulerWorker):
+    """
+    RQ worker that publishes job state transitions over Redis pub/sub.
+
+    Used by `run_worker` when JOB_EVENTS_ENABLED is set. The web process relays
+    the events to the browsers (see `register_job_events`).
+    """
+
+    def prepare_job_execution(self, job, *args, **kwargs):
+        super().prepare_job_execution(job, *args, **kwargs)
+        publish_job_event(self.connection, job, "started")
+
+    def handle_job_success(self, job, *args, **kwargs):
+        super().handle_job_success(job, *args, **kwargs)
+        publish_job_event(self.connection, job, "finished")
+
+    def handle_job_failure(self, job, *args, **kwargs):
+        super().handle_job_failure(job, *args, **kwargs)
+        publish_job_event(self.connection, job, "failed")
+
+
+def register_job_events(app, path=None):
+    """
+    Enables push updates of the Queue tab.
+
+    Adds a Server-Sent Events route relaying the job events of all workers, and a
+    clientside callback that writes every event into the "queue-events" store of
+    `get_queue_tab(push=True)`. A callback using that store as Input then refreshes
+    the Queue tab only when a job changed state.
+
+    Every open Queue tab holds one request open, so the app must be served by threaded or
+    gevent workers (e.g. `gunicorn --worker-class gthread --threads 50` or `--worker-class gevent`).
+    With synchronous workers the stream is refused and the Queue tab polls every 5 seconds instead:
+
+    Example:
+        app = create_app()
+        register_job_events(app)
+
+        @app.callback(
+            [Output("page-content-queue-children", "children"), Output("queue-cursor", "data")],
+            [Input("queue-events", "data"), Input("queue-interval", "n_intervals")],
+            [State("queue-cursor", "data")]
+        )
+        def update_queues(event, n_intervals, cursor):
+            return get_redis_queue_updates(cursor)
+
+    Args:
+        app (dash.Dash): The Dash app.
+        path (str, optional): URL path of the event stream. Defaults to JOB_EVENTS_PATH.
+    """
+    from flask import Response, request, stream_with_context
+    from dash import Input, Output
+    from bfabric_web_apps.objects.JobEventBroadcaster import job_event_broadcaster
+
+    path = path or config.JOB_EVENTS_PATH
+
+    def job_events():
+        if not streaming_supported(request.environ):
+            # 204 closes the EventSource for good, the browser then polls instead
+            return Response(status=204)
+        return Response(
+            stream_with_context(job_event_broadcaster.stream()),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    app.server.add_url_rule(path, "bfabric_job_events", job_events)
+
+    app.clientside_callback(
+        EVENT_SOURCE_JS % (int(config.JOB_EVENTS_DEBOUNCE * 1000), POLLING_INTERVAL * 1000),
+        Output("queue-events", "data"),
+        Input("queue-events-url", "data"),
+    )
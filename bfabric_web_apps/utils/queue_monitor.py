@@ -0,0 +1,196 @@
+import json
+import time
+import hashlib
+from datetime import datetime as dt
+
+from rq import Queue
+from rq.job import Job
+from rq.registry import StartedJobRegistry, FailedJobRegistry, FinishedJobRegistry
+
+from .redis_connection import get_redis_connection
+from .config import settings as config
+
+# Registries shown per queue, in display order: (name, registry class, status label)
+REGISTRIES = (
+    ("started", StartedJobRegistry, "Running"),
+    ("failed", FailedJobRegistry, "Failed"),
+    ("finished", FinishedJobRegistry, "Completed"),
+)
+
+# Job hash fields read for a card
+JOB_FIELDS = ("description", "ended_at")
+
+
+def _decode(value):
+    return value.decode("utf-8", errors="replace") if isinstance(value, bytes) else value
+
+
+def _format_rq_time(value):
+    """Formats an RQ timestamp (UTC, ISO format) for display."""
+    value = _decode(value)
+    if not value:
+        return "Unknown"
+    for fmt in ("%Y-%m-%dT%H:%M:%S.%fZ", "%Y-%m-%dT%H:%M:%SZ"):
+        try:
+            return dt.strptime(value, fmt).strftime("%Y-%m-%d %H:%M:%S")
+        except ValueError:
+            continue
+    return value
+
+
+def get_queue_names():
+    """
+    Returns the names of all RQ queues, sorted.
+
+    Returns:
+        list[str]: The queue names.
+    """
+    prefix = Queue.redis_queue_namespace_prefix
+    keys = get_redis_connection().smembers(Queue.redis_queues_keys)
+    return sorted(_decode(key)[len(prefix):] for key in keys)
+
+
+def fetch_jobs(job_ids):
+    """
+    Reads the card fields of many jobs in one pipelined round trip.
+
+    Args:
+        job_ids (list[str]): The job IDs.
+
+    Returns:
+        list[dict]: One dictionary per existing job with the keys id, func_name and ended_at.
+    """
+    pipe = get_redis_connection().pipeline(transaction=False)
+    for job_id in job_ids:
+        pipe.hmget(Job.key_for(job_id), *JOB_FIELDS)
+
+    jobs = []
+    for job_id, (description, ended_at) in zip(job_ids, pipe.execute()):
+        if description is None and ended_at is None:
+            continue  # Job expired between reading the registry and the job hash
+        description = _decode(description) or ""
+        jobs.append({
+            "id": job_id,
+            "func_name": description.split("(", 1)[0] or "Unknown",
+            "ended_at": _format_rq_time(ended_at),
+        })
+    return jobs
+
+
+def get_registry_page(queue_name, registry="finished", offset=0, limit=None):
+    """
+    Returns a page of a job registry, newest jobs first. Expired entries are skipped (see `get_queue_snapshot`).
+
+    Args:
+        queue_name (str): The queue name.
+        registry (str): "started", "failed" or "finished".
+        offset (int): Number of jobs to skip.
+        limit (int, optional): Page size. Defaults to QUEUE_MONITOR_MAX_CARDS.
+
+    Returns:
+        dict: {"total": registry size, "jobs": list of job dictionaries (see `fetch_jobs`)}.
+    """
+    limit = limit or config.QUEUE_MONITOR_MAX_CARDS
+    connection = get_redis_connection()
+    registry_class = {name: cls for name, cls, _ in REGISTRIES}[registry]
+    key = registry_class(queue_name, connection=connection).key
+
+    now = time.time()
+
+    pipe = connection.pipeline(transaction=False)
+    pipe.zcount(key, now, "+inf")
+    pipe.zrevrangebyscore(key, "+inf", now, start=offset, num=limit)
+    total, job_ids = pipe.execute()
+
+    return {"total": total, "jobs": fetch_jobs([_decode(job_id) for job_id in job_ids])}
+
+
+def get_queue_snapshot(queue_names=None, max_cards=None):
+    """
+    Collects counts and the newest jobs of every queue in two pipelined round trips.
+
+    The first round trip reads the queue length, the registry sizes and the newest
+    `max_cards` job IDs of every registry; the second reads the card fields of those jobs.
+
+    RQ scores registry entries with their expiry time and only removes expired ones when the
+    registries are cleaned. Entries whose score has passed, i.e. jobs of dead workers and
+    expired results, are therefore left out of the counts and the listed jobs.
+
+    Args:
+        queue_names (list[str], optional): Queues to include. Defaults to all queues.
+        max_cards (int, optional): Jobs listed per queue. Defaults to QUEUE_MONITOR_MAX_CARDS.
+
+    Returns:
+        dict: {queue_name: {"stats": {...}, "jobs": [{"id", "func_name", "status", "ended_at"}, ...]}}.
+    """
+    max_cards = config.QUEUE_MONITOR_MAX_CARDS if max_cards is None else max_cards
+    queue_names = get_queue_names() if queue_names is None else list(queue_names)
+    connection = get_redis_connection()
+    now = time.time()
+
+    pipe = connection.pipeline(transaction=False)
+    for queue_name in queue_names:
+        pipe.llen(Queue.redis_queue_namespace_prefix + queue_name)
+        for _, registry_class, _ in REGISTRIES:
+            key = registry_class(queue_name, connection=connection).key
+            pipe.zcount(key, now, "+inf")
+            pipe.zrevrangebyscore(key, "+inf", now, start=0, num=max_cards)
+    replies = iter(pipe.execute())
+
+    snapshot = {}
+    listed = []
+    for queue_name in queue_names:
+        stats = {"Jobs in queue": next(replies)}
+        for _, _, label in REGISTRIES:
+            count, job_ids = next(replies), next(replies)
+            stats[label] = count
+            listed.extend((queue_name, label, _decode(job_id)) for job_id in job_ids)
+        snapshot[queue_name] = {"stats": stats, "jobs": []}
+
+    jobs = {job["id"]: job for job in fetch_jobs([job_id for _, _, job_id in listed])}
+
+    for queue_name, label, job_id in listed:
+        job = jobs.get(job_id)
+        if job is None:
+            continue
+        jobs_of_queue = snapshot[queue_name]["jobs"]
+        if len(jobs_of_queue) < max_cards:
+            jobs_of_queue.append(dict(job, status=label))
+
+    return snapshot
+
+
+def queue_fingerprint(queue_snapshot):
+    """
+    Returns a short hash of a queue snapshot, used to detect changes between polls.
+
+    Args:
+        queue_snapshot (dict): One entry of `get_queue_snapshot`.
+
+    Returns:
+        str: The fingerprint.
+    """
+    return hashlib.sha1(json.dumps(queue_snapshot, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def get_queue_changes(cursor=None, max_cards=None):
+    """
+    Returns the queues that changed since the last poll.
+
+    Args:
+        cursor (dict, optional): The cursor returned by the previous call, None on the first poll.
+        max_cards (int, optional): Jobs listed per queue. Defaults to QUEUE_MONITOR_MAX_CARDS.
+
+    Returns:
+        tuple: A tuple containing:
+               - snapshot (dict): The full snapshot (see `get_queue_snapshot`).
+               - changed (list[str]): Names of the queues that changed, all queues on the first poll.
+               - cursor (dict): {"queues": ordered queue names, "fingerprints": {queue_name: fingerprint}}
+                 to pass to the next call.
+    """
+    snapshot = get_queue_snapshot(max_cards=max_cards)
+    fingerprints = {name: queue_fingerprint(queue) for name, queue in snapshot.items()}
+    previous = (cursor or {}).get("fingerprints", {})
+
+    changed = [name for name, fingerprint in fingerprints.items() if previous.get(name) != fingerprint]
+    return snapshot, changed, {"queues": list(snapshot), "fingerprints": fingerprints}
@@ -1,14 +1,99 @@
+import socket
+import threading
 
 from .config import settings as config
 
-from redis import Redis
-
-if config.REDIS_USERNAME and config.REDIS_PASSWORD:
-    redis_conn = Redis(
-        host=config.REDIS_HOST,
-        port=config.REDIS_PORT,
-        username=config.REDIS_USERNAME,
-        password=config.REDIS_PASSWORD
-    )
-else:
-    redis_conn = Redis(host=config.REDIS_HOST, port=config.REDIS_PORT)
+from redis import Redis, BlockingConnectionPool
+from redis.retry import Retry
+from redis.backoff import ExponentialBackoff
+from redis.exceptions import ConnectionError, TimeoutError
+
+_connections = {}  # (host, port, username) -> Redis
+_connections_lock = threading.Lock()
+
+
+def _keepalive_options():
+    """TCP keepalive probes after 60s idle, so load balancers (e.g. Azure) do not drop idle connections."""
+    options = {}
+    for name, value in (("TCP_KEEPIDLE", 60), ("TCP_KEEPINTVL", 10), ("TCP_KEEPCNT", 3)):
+        if hasattr(socket, name):
+            options[getattr(socket, name)] = value
+    return options
+
+
+def get_redis_connection(host=None, port=None, username=None, password=None):
+    """
+    Returns the shared Redis client for a server, creating it on first use.
+
+    The client is backed by a bounded BlockingConnectionPool (REDIS_MAX_CONNECTIONS) and uses
+    TCP keepalive, connection health checks (REDIS_HEALTH_CHECK_INTERVAL) and retries with
+    exponential backoff on connection errors (REDIS_RETRY_ATTEMPTS). No socket is opened
+    until the first command.
+
+    Args:
+        host (str, optional): Redis host. Defaults to REDIS_HOST.
+        port (int, optional): Redis port. Defaults to REDIS_PORT.
+        username (str, optional): Redis username. Defaults to REDIS_USERNAME.
+        password (str, optional): Redis password. Defaults to REDIS_PASSWORD.
+
+    Returns:
+        redis.Redis: The shared client.
+    """
+    if host is None:
+        host, port = config.REDIS_HOST, config.REDIS_PORT
+        username, password = config.REDIS_USERNAME, config.REDIS_PASSWORD
+
+    key = (host, int(port), username)
+    connection = _connections.get(key)
+    if connection is not None:
+        return connection
+
+    with _connections_lock:
+        connection = _connections.get(key)
+        if connection is None:
+            pool = BlockingConnectionPool(
+                host=host,
+                port=port,
+                username=username if username and password else None,
+                password=password if username and password else None,
+                max_connections=config.REDIS_MAX_CONNECTIONS,
+                timeout=config.REDIS_POOL_TIMEOUT,
+                socket_connect_timeout=config.REDIS_SOCKET_CONNECT_TIMEOUT,
+                socket_timeout=config.REDIS_SOCKET_TIMEOUT,  # None: RQ workers block on BLPOP for minutes
+                socket_keepalive=True,
+                socket_keepalive_options=_keepalive_options(),
+                health_check_interval=config.REDIS_HEALTH_CHECK_INTERVAL,
+                retry=Retry(ExponentialBackoff(cap=10, base=0.1), config.REDIS_RETRY_ATTEMPTS),
+                retry_on_error=[ConnectionError, TimeoutError],
+            )
+            connection = Redis(connection_pool=pool)
+            _connections[key] = connection
+    return connection
+
+
+def redis_pool_stats():
+    """
+    Returns the utilization of the connection pools created by `get_redis_connection`.
+
+    Returns:
+        dict: {"host:port": {"max_connections", "created", "in_use", "idle"}}.
+    """
+    stats = {}
+    for (host, port, _), connection in list(_connections.items()):
+        pool = connection.connection_pool
+        created = len(pool._connections)
+        idle = sum(1 for conn in list(pool.pool.queue) if conn is not None)
+        stats[f"{host}:{port}"] = {
+            "max_connections": pool.max_connections,
+            "created": created,
+            "in_use": created - idle,
+            "idle": idle,
+        }
+    return stats
+
+
+def __getattr__(name):
+    # Backwards compatibility: `from .redis_connection import redis_conn` returns the shared client
+    if name == "redis_conn":
+        return get_redis_connection()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,6 +1,24 @@
 from rq import Queue
-from .redis_connection import redis_conn as conn
+from .redis_connection import get_redis_connection
+from bfabric_web_apps.objects.JobScheduler import JobScheduler
 
 
 def q(queue_name):
-    return Queue(name=queue_name, connection=conn, default_timeout=10000000)
+    return Queue(name=queue_name, connection=get_redis_connection(), default_timeout=10000000)
+
+
+def scheduler(queue_name):
+    """
+    Returns the scheduler of a queue, to submit jobs with a priority, user and resource class.
+
+    Example:
+        scheduler("heavy").enqueue(run_main_job, user=token_data["user_data"], priority="normal",
+                                   resource_class="large", files_as_byte_strings=..., bash_commands=...)
+
+    Args:
+        queue_name (str): Name of the RQ queue.
+
+    Returns:
+        JobScheduler: The scheduler dispatching to the queue.
+    """
+    return JobScheduler(queue_name, connection=get_redis_connection())
@@ -1,7 +1,14 @@
-import redis
-from rq import Worker, Queue, Connection
+from rq import Queue, Connection
+import os
 import time
+import signal
 import threading
+import multiprocessing
+
+from .config import settings as config
+from .job_events import EventWorker
+from bfabric_web_apps.objects.JobScheduler import SchedulerWorker
+from .redis_connection import get_redis_connection
 
 def test_job():
     print("Hello, this is a test job!")
@@ -9,60 +16,179 @@ def test_job():
     print("Test job finished!")
     return
 
-def keepalive_ping(conn, interval=60):
-    """
-    Periodically ping Redis to keep the TCP connection alive on platforms like Azure.
-    """
-    while True:
-        try:
-            conn.ping()
-        except Exception as e:
-            print("Redis keepalive ping failed:", e)
-        time.sleep(interval)
-
-def run_worker(host, port, queue_names, username=None, password=None):
+def _start_worker(host, port, queue_names, username=None, password=None):
     """
-    Starts an RQ worker with a background Redis keepalive thread to prevent Azure from dropping idle connections.
+    Processes jobs until the worker is stopped.
+
+    The connection comes from the shared factory, whose TCP keepalive and health checks
+    keep idle connections from being dropped (e.g. on Azure).
     """
+    print(f"Connecting to Redis at {host}:{port}" + (f" as {username}." if username and password else " without authentication."))
+    conn = get_redis_connection(host, port, username, password)
 
-    def build_redis(protocol=2):
-        
-        if username and password:
-
-            print("Connecting to Redis with authentication.")
-            print(f"Host: {host}, Port: {port}, Username: {username}")
-
-            conn = redis.Redis(
-                host=host,
-                port=port,
-                username=username,
-                password=password,
-                socket_keepalive=True,
-                protocol=protocol
-            )
-
-        else:
-
-            print("Connecting to Redis without authentication.")
-            print(f"Host: {host}, Port: {port}")
-            
-            conn = redis.Redis(
-                host=host,
-                port=port,
-                socket_keepalive=True,
-                protocol=protocol
-            )
-        return conn
-    
-    try:
-        conn = build_redis(protocol=2)
-    except Exception as e: 
-        print("Failed to connect to Redis with protocol 2, trying protocol 3...")
-        conn = build_redis(protocol=3)
-
-    # Start Redis keepalive thread
-    threading.Thread(target=keepalive_ping, args=(conn,), daemon=True).start()
+    # Both release scheduler slots; EventWorker also publishes job state transitions for the push updates of the Queue tab
+    worker_class = EventWorker if config.JOB_EVENTS_ENABLED else SchedulerWorker
 
     with Connection(conn):
-        worker = Worker(map(Queue, queue_names))
+        worker = worker_class(map(Queue, queue_names))
         worker.work(logging_level="INFO")
+
+def _worker_process(host, port, queue_names, username=None, password=None):
+    # Own session: terminal signals (Ctrl-C) reach the supervisor only, which forwards a single SIGTERM
+    os.setsid()
+    _start_worker(host, port, queue_names, username, password)
+
+def plan_worker_processes(queue_names, processes, queue_concurrency=None):
+    """
+    Distributes worker processes over the queues.
+
+    A queue with a concurrency limit gets that many processes of its own, so at most
+    `limit` of its jobs run at once. The remaining processes share the queues without
+    a limit, in the given priority order.
+
+    Example:
+        plan_worker_processes(["light", "heavy"], 8, {"heavy": 2})
+        -> [["heavy"], ["heavy"], ["light"], ["light"], ["light"], ["light"], ["light"], ["light"]]
+
+    Args:
+        queue_names (list[str]): The queues, in priority order.
+        processes (int): Total number of worker processes.
+        queue_concurrency (dict, optional): {queue_name: maximum number of concurrent jobs}.
+
+    Returns:
+        list[list[str]]: The queues of each worker process.
+    """
+    queue_concurrency = queue_concurrency or {}
+    plan = []
+
+    for queue_name in queue_names:
+        limit = queue_concurrency.get(queue_name)
+        if limit:
+            plan.extend([queue_name] for _ in range(min(limit, processes - len(plan))))
+
+    shared = [queue_name for queue_name in queue_names if not queue_concurrency.get(queue_name)]
+    if shared:
+        plan.extend(list(shared) for _ in range(processes - len(plan)))
+
+    if sum(queue_concurrency.get(queue_name) or 0 for queue_name in queue_names) > processes:
+        print(f"Warning: queue concurrency limits {queue_concurrency} exceed {processes} processes, limits were capped.")
+
+    return plan
+
+def run_worker_pool(host, port, queue_names, processes, queue_concurrency=None, username=None, password=None, drain_timeout=None):
+    """
+    Runs a supervised pool of RQ worker processes.
+
+    Crashed workers are restarted with exponential backoff. On SIGTERM or SIGINT every worker
+    receives one SIGTERM, finishes its current job (RQ warm shutdown) and exits; workers still
+    busy after `drain_timeout` seconds are stopped with a second SIGTERM and finally killed.
+
+    Workers are started with the "spawn" method, which imports the calling script again in
+    every worker, so the script must start the pool under an `if __name__ == "__main__":` guard.
+
+    Args:
+        host (str): Redis host.
+        port (int): Redis port.
+        queue_names (list[str]): The queues, in priority order.
+        processes (int): Number of worker processes.
+        queue_concurrency (dict, optional): {queue_name: maximum number of concurrent jobs}, see `plan_worker_processes`.
+        username (str, optional): Redis username.
+        password (str, optional): Redis password.
+        drain_timeout (float, optional): Seconds to wait for running jobs on shutdown. Defaults to WORKER_DRAIN_TIMEOUT (wait indefinitely).
+    """
+    drain_timeout = config.WORKER_DRAIN_TIMEOUT if drain_timeout is None else drain_timeout
+    plan = plan_worker_processes(queue_names, processes, queue_concurrency)
+    context = multiprocessing.get_context("spawn")  # Fresh interpreter: no inherited sockets or threads
+
+    stopping = threading.Event()
+    workers = [None] * len(plan)
+    started_at = [0.0] * len(plan)
+    restart_at = [None] * len(plan)
+    failures = [0] * len(plan)
+
+    def start(slot):
+        process = context.Process(
+            target=_worker_process,
+            args=(host, port, plan[slot], username, password),
+            name=f"rq-worker-{slot}",
+        )
+        process.start()
+        workers[slot] = process
+        started_at[slot] = time.monotonic()
+        restart_at[slot] = None
+        print(f"Started worker {slot} (pid {process.pid}) on queues {plan[slot]}")
+
+    def request_stop(signum, frame):
+        if not stopping.is_set():
+            print(f"Received signal {signum}, draining {len(plan)} worker(s)...")
+            stopping.set()
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+
+    for slot in range(len(plan)):
+        start(slot)
+
+    while not stopping.is_set():
+        now = time.monotonic()
+        for slot, process in enumerate(workers):
+            if restart_at[slot] is not None:
+                if now >= restart_at[slot]:
+                    start(slot)
+            elif not process.is_alive():
+                # Back off on workers that keep crashing, reset after a stable run
+                stable = now - started_at[slot] > config.WORKER_RESTART_MAX_DELAY
+                failures[slot] = 0 if stable else failures[slot] + 1
+                delay = min(2 ** failures[slot], config.WORKER_RESTART_MAX_DELAY)
+                print(f"Worker {slot} (pid {process.pid}) exited with code {process.exitcode}, restarting in {delay}s")
+                restart_at[slot] = now + delay
+        stopping.wait(1)
+
+    _drain_workers([process for process in workers if process.is_alive()], drain_timeout)
+
+def _drain_workers(processes, drain_timeout):
+    """Stops the workers gracefully, escalating to a cold shutdown and a kill after `drain_timeout`."""
+    for process in processes:
+        if process.is_alive():
+            os.kill(process.pid, signal.SIGTERM)
+
+    deadline = None if drain_timeout is None else time.monotonic() + drain_timeout
+    for process in processes:
+        process.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+
+    busy = [process for process in processes if process.is_alive()]
+    for process in busy:
+        print(f"Worker {process.name} (pid {process.pid}) still busy after {drain_timeout}s, stopping its job")
+        os.kill(process.pid, signal.SIGTERM)  # Second SIGTERM: RQ cold shutdown
+    for process in busy:
+        process.join(10)
+        if process.is_alive():
+            process.kill()
+            process.join()
+
+    print("All workers stopped.")
+
+def run_worker(host, port, queue_names, username=None, password=None, processes=1, queue_concurrency=None):
+    """
+    Starts an RQ worker on the shared Redis connection (see `get_redis_connection`).
+
+    With `processes` > 1 or `queue_concurrency`, a supervised pool of worker processes is started
+    instead (see `run_worker_pool`), so one machine can run several jobs at once. The pool
+    requires the calling script to use an `if __name__ == "__main__":` guard.
+
+    Args:
+        host (str): Redis host.
+        port (int): Redis port.
+        queue_names (list[str]): The queues, in priority order.
+        username (str, optional): Redis username.
+        password (str, optional): Redis password.
+        processes (int): Number of worker processes. Defaults to 1.
+        queue_concurrency (dict, optional): {queue_name: maximum number of concurrent jobs}.
+    """
+    if processes > 1 or queue_concurrency:
+        if processes <= 1:
+            # Only limits given: one process per allowed job, plus one for the queues without a limit
+            processes = sum(queue_concurrency.values()) + int(any(name not in queue_concurrency for name in queue_names))
+        run_worker_pool(host, port, queue_names, processes, queue_concurrency, username, password)
+    else:
+        _start_worker(host, port, queue_names, username, password)
@@ -1,8 +1,171 @@
 from bfabric_web_apps.utils.get_logger import get_logger
 from bfabric_web_apps.objects.BfabricInterface import bfabric_interface
 from bfabric_web_apps.utils.get_power_user_wrapper import get_power_user_wrapper
+from bfabric_web_apps.utils.config import settings
+from bfabric.errors import BfabricRequestError
+
+try:
+    from bfabric.errors import BfabricUnavailableError
+except ImportError:  # bfabric < 1.24 raises transport errors unwrapped
+    BfabricUnavailableError = ()
 
 from pathlib import Path
+from itertools import islice
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+import time
+from datetime import datetime, timedelta
+
+
+def is_rejection(error):
+    """
+    Whether an exception of a save call means B-Fabric answered with an error, so nothing was stored.
+
+    Other exceptions (timeouts, dropped connections, ...) leave the outcome unknown: the
+    objects may have been stored before the answer was lost.
+
+    Args:
+        error (Exception): The exception raised by the save call.
+
+    Returns:
+        bool: True if B-Fabric rejected the save.
+    """
+    return isinstance(error, BfabricRequestError) and not isinstance(error, BfabricUnavailableError)
+
+
+def save_in_chunks(wrapper, endpoint, objs, chunk_size=None, lookup=None):
+    """
+    Save many objects of one endpoint using multi-object save calls.
+
+    Objects are sent in chunks of at most `chunk_size` objects per API call. If B-Fabric
+    rejects a chunk (see `is_rejection`), its objects are saved one by one, so a single
+    invalid object does not fail the whole chunk. If the outcome of a chunk is unknown,
+    e.g. after a timeout, `lookup` finds the objects B-Fabric stored anyway, and only the
+    others are saved again, so no object is stored twice. Without a lookup, the objects
+    of such a chunk are reported as failed.
+
+    Args:
+        wrapper (Bfabric): The B-Fabric wrapper to save with.
+        endpoint (str): The B-Fabric endpoint (e.g. "workunit", "resource").
+        objs (list[dict]): The objects to save.
+        chunk_size (int, optional): Maximum objects per API call. Defaults to BFABRIC_SAVE_CHUNK_SIZE.
+        lookup (callable, optional): Called as lookup(wrapper, chunk), returns the stored object or None
+            for each object of the chunk (e.g. `find_saved_resources`).
+
+    Returns:
+        list[tuple]: One (saved object or None, error message or None) tuple per input object, in input order.
+    """
+    chunk_size = chunk_size or settings.BFABRIC_SAVE_CHUNK_SIZE
+    results = []
+
+    for start in range(0, len(objs), chunk_size):
+        chunk = objs[start:start + chunk_size]
+
+        try:
+            saved = list(wrapper.save(endpoint, chunk if len(chunk) > 1 else chunk[0]))
+        except Exception as e:
+            saved, error = None, e
+
+        if saved is not None and len(saved) == len(chunk):
+            results.extend((obj, None) for obj in saved)
+            continue
+
+        if saved is not None:
+            # B-Fabric stored the chunk but the response cannot be matched to the input objects
+            error = f"Unexpected response: expected {len(chunk)} {endpoint}(s), got {len(saved)}"
+            results.extend((None, error) for _ in chunk)
+            continue
+
+        if is_rejection(error):
+            print(f"Multi-object save of {len(chunk)} {endpoint}(s) was rejected, saving one by one: {error}")
+            stored = [None] * len(chunk)
+        elif lookup is None:
+            print(f"Multi-object save of {len(chunk)} {endpoint}(s) failed with an unknown outcome, not saved again: {error}")
+            results.extend((None, f"Save failed, {endpoint} may have been stored: {error}") for _ in chunk)
+            continue
+        else:
+            print(f"Multi-object save of {len(chunk)} {endpoint}(s) failed, looking up the stored ones before saving again: {error}")
+            try:
+                stored = lookup(wrapper, chunk)
+            except Exception as e:
+                results.extend((None, f"Save failed and the stored {endpoint}(s) could not be looked up: {error}; {e}") for _ in chunk)
+                continue
+
+        for obj, existing in zip(chunk, stored):
+            if existing is not None:
+                results.append((existing, None))
+                continue
+            try:
+                result = wrapper.save(endpoint, obj)
+                if result:
+                    results.append((result[0], None))
+                else:
+                    results.append((None, f"Empty response while saving {endpoint}"))
+            except Exception as e:
+                results.append((None, str(e)))
+
+    return results
+
+
+def find_saved_resources(wrapper, objs):
+    """
+    Looks up which resources of a save with an unknown outcome B-Fabric stored, by workunit and relative path.
+
+    Args:
+        wrapper (Bfabric): The B-Fabric wrapper to read with.
+        objs (list[dict]): The resource objects that were saved.
+
+    Returns:
+        list: The stored resource, or None, for each object.
+    """
+    stored = wrapper.read(
+        "resource",
+        {"workunitid": sorted({str(obj["workunitid"]) for obj in objs}), "relativepath": [str(obj["relativepath"]) for obj in objs]},
+        max_results=None,
+    )
+    by_key = {(str((resource.get("workunit") or {}).get("id")), resource.get("relativepath")): resource for resource in stored}
+    return [by_key.get((str(obj["workunitid"]), str(obj["relativepath"]))) for obj in objs]
+
+
+def find_saved_workunits(created_after):
+    """
+    Returns a lookup for `save_in_chunks` finding the workunits B-Fabric stored in a save with an unknown outcome.
+
+    Workunits are matched on container, application and name, among the workunits created
+    since `created_after`. A workunit is only reported as stored if exactly one matches,
+    otherwise it cannot be told apart from the workunit of another job.
+
+    Args:
+        created_after (datetime): A time before the save started.
+
+    Returns:
+        callable: The lookup(wrapper, objs).
+    """
+    def lookup(wrapper, objs):
+        stored = wrapper.read(
+            "workunit",
+            {
+                "containerid": sorted({obj["containerid"] for obj in objs}),
+                "applicationid": sorted({obj["applicationid"] for obj in objs}),
+                "createdafter": created_after.strftime("%Y-%m-%dT%H:%M:%S"),
+            },
+            max_results=None,
+        )
+        matches = defaultdict(list)
+        for workunit in stored:
+            key = (str((workunit.get("container") or {}).get("id")), str((workunit.get("application") or {}).get("id")), workunit.get("name"))
+            matches[key].append(workunit)
+
+        found = []
+        for obj in objs:
+            candidates = matches[(str(obj["containerid"]), str(obj["applicationid"]), obj["name"])]
+            if len(candidates) > 1:
+                raise ValueError(f"{len(candidates)} workunits named '{obj['name']}' were created in container {obj['containerid']}")
+            found.append(candidates[0] if candidates else None)
+        return found
+
+    return lookup
+
 
 def create_workunit(token_data, application_name, application_description, application_id, container_id):
     """
@@ -19,7 +182,7 @@ def create_workunit(token_data, application_name, application_description, appli
         obj: Created workunit object or None if creation fails.
     """
     L = get_logger(token_data)
-    wrapper = bfabric_interface.get_wrapper()
+    wrapper = bfabric_interface.get_wrapper(token_data)
 
     workunit_data = {
         "name": f"Workunit - {application_name} - Container {container_id}",
@@ -63,7 +226,7 @@ def create_workunit(token_data, application_name, application_description, appli
         return None
 
 
-def create_workunits(token_data, application_name, application_description, application_id, container_ids):
+def create_workunits(token_data, application_name, application_description, application_id, container_ids, batch=False):
     """
     Create multiple workunits in B-Fabric.
 
@@ -73,6 +236,8 @@ def create_workunits(token_data, application_name, application_description, appl
         application_description (str): Description of the application.
         application_id (int): Application ID.
         container_ids (list): List of container IDs.
+        batch (bool, optional): Save all workunits with multi-object calls and update the
+            job's workunit list once (see `create_workunits_batch`). Defaults to False.
     
     Returns:
         list[obj]: List of created workunit objects.
@@ -80,6 +245,12 @@ def create_workunits(token_data, application_name, application_description, appl
     if not isinstance(container_ids, list):
         container_ids = [container_ids]  # Ensure it's a list
 
+    if batch:
+        report = create_workunits_batch(token_data, application_name, application_description, application_id, container_ids)
+        if report["link_error"]:
+            return []  # Like create_workunit, workunits that could not be linked to the job are not returned
+        return list(report["created"].values())
+
     workunits = [
         create_workunit(token_data, application_name, application_description, application_id, container_id)
         for container_id in container_ids
@@ -88,6 +259,88 @@ def create_workunits(token_data, application_name, application_description, appl
     return [wu for wu in workunits if wu is not None]  # Filter out None values
 
 
+def create_workunits_batch(token_data, application_name, application_description, application_id, container_ids):
+    """
+    Create one workunit per container with as few API calls as possible.
+
+    All workunits are saved with multi-object save calls, then the job's workunit list
+    is read and updated once for all of them, instead of three calls per container.
+
+    Args:
+        token_data (dict): Authentication token data.
+        application_name (str): Name of the application.
+        application_description (str): Description of the application.
+        application_id (int): Application ID.
+        container_ids (list): List of container IDs.
+
+    Returns:
+        dict: {
+            "created": {container_id: workunit},
+            "failed": {container_id: error message},
+            "link_error": error message if the created workunits could not be linked to the job, else None
+        }
+    """
+    L = get_logger(token_data)
+    wrapper = bfabric_interface.get_wrapper(token_data)
+
+    if not isinstance(container_ids, list):
+        container_ids = [container_ids]  # Ensure it's a list
+
+    workunits_data = [
+        {
+            "name": f"Workunit - {application_name} - Container {container_id}",
+            "description": f"{application_description} for Container {container_id}",
+            "applicationid": int(application_id),
+            "containerid": container_id,
+        }
+        for container_id in container_ids
+    ]
+
+    # Clocks of the worker and B-Fabric may differ, a lookup after a lost answer searches a little further back
+    lookup = find_saved_workunits(datetime.now() - timedelta(minutes=5))
+
+    created, failed, link_error = {}, {}, None
+    for container_id, (workunit, error) in zip(container_ids, save_in_chunks(wrapper, "workunit", workunits_data, lookup=lookup)):
+        if workunit is not None:
+            created[container_id] = workunit
+            print(f"Created Workunit ID: {workunit.get('id')} for Order ID: {container_id}")
+        else:
+            failed[container_id] = error
+            L.log_operation(
+                "Error | ORIGIN: run_main_job function",
+                f"Failed to create workunit for Order {container_id}: {error}",
+                params=None,
+                flush_logs=False,
+            )
+            print(f"Failed to create workunit for Order {container_id}: {error}")
+
+    if created:
+        workunit_ids = [wu.get("id") for wu in created.values()]
+        try:
+            # Associate the job object with all new workunits in a single update
+            pre_existing_workunit_ids = [elt.get("id") for elt in wrapper.read("job", {"id": token_data.get("jobId")})[0].get("workunit", [])]
+            L.power_user_wrapper.save("job", {"id": token_data.get("jobId"), "workunitid": workunit_ids + pre_existing_workunit_ids})
+            L.log_operation(
+                "Success | ORIGIN: run_main_job function",
+                f"Created {len(workunit_ids)} workunit(s) {workunit_ids} and linked them to job {token_data.get('jobId')}",
+                params=None,
+                flush_logs=False,
+            )
+        except Exception as e:
+            link_error = f"Failed to link workunits {workunit_ids} to job {token_data.get('jobId')}: {e}"
+            L.log_operation(
+                "Error | ORIGIN: run_main_job function",
+                link_error,
+                params=None,
+                flush_logs=False,
+            )
+            print(link_error)
+
+    L.flush_logs()
+
+    return {"created": created, "failed": failed, "link_error": link_error}
+
+
 from pathlib import Path
 
 def create_resource(token_data, workunit_id, file_path, storage_id="20"): # GWC Server is storage id 20. 
@@ -140,14 +393,17 @@ def create_resource(token_data, workunit_id, file_path, storage_id="20"): # GWC
         return None
 
 
-def create_resources(token_data, workunit_id, file_paths):
+def create_resources(token_data, workunit_id, file_paths, storage_id="20"):
     """
     Attach multiple files as resources to an existing B-Fabric workunit.
 
+    Uses `register_resources`, i.e. multi-object saves running on a bounded thread pool.
+
     Args:
         token_data (dict): Authentication token data.
         workunit_id (int): ID of the workunit to associate the resources with.
         file_paths (list): List of full paths to files to attach.
+        storage_id (str, optional): ID of the storage holding the files. Defaults to "20" (GWC Server).
     
     Returns:
         list[obj]: List of successfully attached resource objects.
@@ -155,9 +411,133 @@ def create_resources(token_data, workunit_id, file_paths):
     if not isinstance(file_paths, list):
         file_paths = [file_paths]  # Ensure it's a list
 
-    resources = [
-        create_resource(token_data, workunit_id, file_path)
-        for file_path in file_paths
-    ]
+    report = register_resources(token_data, {file_path: workunit_id for file_path in file_paths}, storage_id=storage_id)
 
-    return [res_id for res_id in resources if res_id is not None]  # Filter out None values
+    return [report["created"][file_path] for file_path in file_paths if file_path in report["created"]]
+
+
+def register_resources(token_data, workunit_map, storage_id="20", chunk_size=None, max_workers=None, checkpoint=None, step="resources"):
+    """
+    Register many files as resources of their workunits in bulk.
+
+    The resources are sent as multi-object saves of at most `chunk_size` objects, and the
+    chunks are saved concurrently on a thread pool of at most `max_workers` threads. The
+    files are read chunk by chunk, so an iterator (e.g. `FileManifest.join`) is never
+    expanded into one list of all resources. Each pool thread saves with its own power
+    user client (see `get_power_user_wrapper`).
+
+    With a checkpoint, the resource ID of every registered file is recorded after each
+    chunk, and files recorded by a previous attempt of the job are not registered again.
+
+    Args:
+        token_data (dict): Authentication token data.
+        workunit_map (dict | iterable): {file_path: workunit_id}, or an iterable of (file_path, workunit_id) pairs.
+        storage_id (str, optional): ID of the storage holding the files. Defaults to "20" (GWC Server).
+        chunk_size (int, optional): Maximum resources per API call. Defaults to BFABRIC_SAVE_CHUNK_SIZE.
+        max_workers (int, optional): Maximum concurrent API calls. Defaults to RESOURCE_REGISTRATION_WORKERS.
+        checkpoint (JobCheckpoint, optional): Checkpoint of the running job.
+        step (str, optional): Name under which the registered files are recorded in the checkpoint. Defaults to "resources".
+
+    Returns:
+        dict: {
+            "created": {file_path: resource},
+            "failed": {file_path: error message},
+            "per_workunit": {workunit_id: number of created resources},
+            "resumed": number of files registered by a previous attempt (only {"id": ...} in "created"),
+            "total": number of files,
+            "elapsed": seconds spent,
+            "files_per_second": registration throughput
+        }
+    """
+    chunk_size = chunk_size or settings.BFABRIC_SAVE_CHUNK_SIZE
+    max_workers = max_workers or settings.RESOURCE_REGISTRATION_WORKERS
+
+    pairs = iter(workunit_map.items() if isinstance(workunit_map, dict) else workunit_map)
+
+    def save_chunk(objs):
+        # Runs on a pool thread, which must not share its client with the other threads
+        return save_in_chunks(get_power_user_wrapper(token_data), "resource", objs, chunk_size, lookup=find_saved_resources)
+
+    created, failed, per_workunit = {}, {}, defaultdict(int)
+    total = resumed = 0
+
+    def next_chunk():
+        # Files registered by a previous attempt are counted and skipped until a chunk has new files
+        nonlocal total, resumed
+        while True:
+            chunk = [
+                (file_path, {
+                    "workunitid": str(workunit_id),
+                    "name": Path(file_path).name,
+                    "description": f"Resource attached to workunit {workunit_id}",
+                    "relativepath": str(file_path),
+                    "storageid": str(storage_id),
+                })
+                for file_path, workunit_id in islice(pairs, chunk_size)
+            ]
+            if checkpoint is None or not chunk:
+                return chunk
+
+            pending = []
+            for (file_path, data), resource_id in zip(chunk, checkpoint.recorded(step, [str(file_path) for file_path, _ in chunk])):
+                if resource_id is None:
+                    pending.append((file_path, data))
+                    continue
+                total += 1
+                resumed += 1
+                created[file_path] = {"id": resource_id}
+                per_workunit[data["workunitid"]] += 1
+            if pending:
+                return pending
+
+    start_time = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        running = {}
+
+        def submit_chunks():
+            # Keep every thread busy with one chunk queued behind it, without reading further ahead
+            while len(running) < 2 * max_workers:
+                chunk = next_chunk()
+                if not chunk:
+                    return
+                running[executor.submit(save_chunk, [data for _, data in chunk])] = chunk
+
+        submit_chunks()
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                chunk = running.pop(future)
+                try:
+                    results = future.result()
+                except Exception as e:
+                    results = [(None, str(e))] * len(chunk)
+
+                registered = {}
+                for (file_path, data), (resource, error) in zip(chunk, results):
+                    total += 1
+                    if resource is not None:
+                        created[file_path] = resource
+                        registered[str(file_path)] = resource.get("id")
+                        per_workunit[data["workunitid"]] += 1
+                    else:
+                        failed[file_path] = error
+                if checkpoint is not None:
+                    checkpoint.record(step, registered)
+            submit_chunks()
+
+    elapsed = time.perf_counter() - start_time
+    files_per_second = total / elapsed if elapsed > 0 else 0.0
+
+    print(f"Registered {len(created)} of {total} resource(s) in {elapsed:.2f}s ({files_per_second:.1f} files/s)"
+          + (f", {resumed} by a previous attempt" if resumed else ""))
+
+    return {
+        "created": created,
+        "failed": failed,
+        "per_workunit": dict(per_workunit),
+        "resumed": resumed,
+        "total": total,
+        "elapsed": elapsed,
+        "files_per_second": files_per_second,
+    }
@@ -3,9 +3,11 @@ from rq import Queue
 import os
 import shutil
 import subprocess
+import shlex
+import tempfile
 from pathlib import Path
 import time
-from collections import defaultdict
+from itertools import chain
 
 from .get_logger import get_logger
 from .get_power_user_wrapper import get_power_user_wrapper
@@ -15,14 +17,23 @@ from .resource_utilities import (
     create_workunit, 
     create_resource, 
     create_workunits, 
-    create_resources
+    create_workunits_batch,
+    create_resources,
+    register_resources
 )
 from .dataset_utils import (
     dataset_to_dictionary,
-    dictionary_to_dataset
+    dictionary_to_dataset,
+    diff_dataset,
+    dataset_patch
 )
 
 from .charging import create_charge
+from .bash_executor import run_bash_commands, format_bash_results
+from .file_staging import is_staged_reference, write_staged_file
+from bfabric_web_apps.objects.JobCheckpoint import JobCheckpoint, run_step
+from bfabric_web_apps.objects.StepGraph import StepGraph, run_concurrently
+from bfabric_web_apps.objects.FileManifest import FileManifest
 
 from .config import settings as config
 from datetime import datetime as dt
@@ -42,7 +53,9 @@ def run_main_job(
     token: str,
     service_id: int = 0,
     charge: list[int] = [],
-    dataset_dict: dict = {}
+    dataset_dict: dict = {},
+    dataset_mode: str = None,
+    previous_datasets: dict = {}
 ):
 
 
@@ -56,8 +69,13 @@ def run_main_job(
       6) Attach additional gstore files (logs/reports/etc.) to entities in B-Fabric
       7) Automatically charge the relevant container for the service
 
-    :param files_as_byte_strings: {destination_path: file as byte strings}
-    :param bash_commands: List of bash commands to execute
+    Steps run as a dependency graph: attachments and charges start as soon as the bash commands
+    are done, and datasets and resources both start once the workunits exist. Datasets and charges
+    are created concurrently per container. The critical-path timing is logged at the end.
+
+    :param files_as_byte_strings: {destination_path: file as byte strings, or a reference returned by stage_file / stage_bytes}
+    :param bash_commands: List of bash commands to execute. A nested list is a group of commands run in parallel,
+                          and a command can be a dict {"cmd": ..., "timeout": seconds}
     :param resource_paths: dict, {resource_path: container_id}
     :param attachment_paths: Dictionary mapping source file paths to their corresponding file names ({"path/test.txt": "name.txt"})
                              for attachment to a B-Fabric entity (e.g., logs, final reports, etc.)
@@ -65,6 +83,10 @@ def run_main_job(
     :param service_id: ID of the service to charge
     :param charge: A list of container IDs to be charged.
     :param dataset_dict: A dictionary to create a dataset in B-Fabric. keys are container IDs and values are dictionaries whose keys are field names and values are lists of values.
+    :param dataset_mode: "create" saves a new dataset per container, "sync" updates the container's previous dataset,
+                         and only if its content changed (see `sync_dataset`). Defaults to DATASET_MODE.
+    :param previous_datasets: {container_id: dataset_id} of the datasets saved by a previous run, updated in "sync" mode.
+                              Without an entry, only a dataset saved by an earlier attempt of the same job is found.
 
 
     
@@ -87,106 +109,176 @@ def run_main_job(
     
     
     L = get_logger(token_data)
+
+    # Steps completed by a previous attempt of this RQ job (e.g. before a worker crash) are skipped
+    checkpoint = JobCheckpoint.for_current_job()
+    if checkpoint.resumed:
+        L.log_operation("Info | ORIGIN: run_main_job function", f"Resuming job {checkpoint.job_id}, completed steps are skipped.", params=None, flush_logs=True)
+        print(f"Resuming job {checkpoint.job_id}")
+
     print("Token Data:", token_data)
     print("Entity Data:", entity_data)
     print("App Data:", app_data)
      
 
-    # Step 1: Save files to the server
-    try:
-        summary = save_files_from_bytes(files_as_byte_strings, L)
-        L.log_operation("Success | ORIGIN: run_main_job function", f"File copy summary: {summary}", params=None, flush_logs=True)
-        print("Summary:", summary)
-        
-    except Exception as e:
-        # If something unexpected blows up the entire process
-        L.log_operation("Error | ORIGIN: run_main_job function", f"Failed to copy files: {e}", params=None, flush_logs=True)
-        print("Error copying files:", e)
-
-    
-    # STEP 2: Execute bash commands
-    try:
-        bash_log = execute_and_log_bash_commands(bash_commands)
-        L.log_operation("Success | ORIGIN: run_main_job function", f"Bash commands executed success | origin: run_main_job functionfully:\n{bash_log}", 
-                        params=None, flush_logs=True)
-    except Exception as e:
-        L.log_operation("Error | ORIGIN: run_main_job function", f"Failed to execute bash commands: {e}", 
-                        params=None, flush_logs=True)
-        print("Error executing bash commands:", e)
-
+    # Each step logs its own outcome and never raises, so the steps depending on it still run.
+    # A step that failed, even for a single file, is not checkpointed and runs again on a retry.
+    # Dependencies: bash needs the saved files; workunits, datasets and resources need the bash
+    # output; attachments and charges only need bash to be done.
+    # Steps and their sub-tasks run on separate threads, so each gets its B-Fabric clients in its
+    # own thread (get_power_user_wrapper returns a client per thread) and never shares them.
 
-    # STEP 3: Create Workunits
-    try:
-        workunit_map, workunit_container_map = create_workunits_step(token_data, app_data, resource_paths, L)
-    except Exception as e:
-        L.log_operation("Error | ORIGIN: run_main_job function", f"Failed to create workunits in B-Fabric: {e}", 
-                        params=None, flush_logs=True)
-        print("Error creating workunits:", e)
-        workunit_map = []
-
-
-    # STEP 4: Create Dataset
-    if dataset_dict:
-        for container_id, dataset_data in dataset_dict.items():
+    def save_files_step(results):
+        # Step 1: Save files to the server
+        try:
+            summary = run_step(checkpoint, "save_files", L, save_files_from_bytes, files_as_byte_strings, L)
+            L.log_operation("Success | ORIGIN: run_main_job function", f"File copy summary: {summary}", params=None, flush_logs=True)
+            print("Summary:", summary)
+        
+        except Exception as e:
+            # If something unexpected blows up the entire process
+            L.log_operation("Error | ORIGIN: run_main_job function", f"Failed to copy files: {e}", params=None, flush_logs=True)
+            print("Error copying files:", e)
 
+    def bash_step(results):
+        # STEP 2: Execute bash commands
+        try:
+            bash_log = run_step(checkpoint, "bash", L, execute_and_log_bash_commands, bash_commands, L)
+            L.log_operation("Success | ORIGIN: run_main_job function", f"Bash commands executed success | origin: run_main_job functionfully:\n{bash_log}", 
+                            params=None, flush_logs=True)
+        except Exception as e:
+            L.log_operation("Error | ORIGIN: run_main_job function", f"Failed to execute bash commands: {e}", 
+                            params=None, flush_logs=True)
+            print("Error executing bash commands:", e)
+
+    def workunits_step(results):
+        # STEP 3: Create Workunits. The file manifest is scanned on every attempt and only
+        # the {container_id: workunit_id} map is checkpointed.
+        manifest = None
+        try:
+            manifest = scan_resource_paths(resource_paths, L)
+            workunit_container_map = run_step(checkpoint, "workunits", L, create_workunits_step, token_data, app_data, manifest, L)
+        except Exception as e:
+            L.log_operation("Error | ORIGIN: run_main_job function", f"Failed to create workunits in B-Fabric: {e}", 
+                            params=None, flush_logs=True)
+            print("Error creating workunits:", e)
+            workunit_container_map = {}
+        return manifest, workunit_container_map
+
+    def datasets_step(results):
+        # STEP 4: Create Dataset (one concurrent sub-task per container)
+        if not dataset_dict:
+            L.log_operation("Info | ORIGIN: run_main_job function", "No dataset creation requested.", params=None, flush_logs=True)
+            print("No dataset creation requested.")
+            return
+
+        workunit_container_map = results["workunits"][1]
+        mode = dataset_mode or config.DATASET_MODE
+
+        def create_container_dataset(item):
+            container_id, dataset_data = item
             dataset_name = f'Dataset - {str(app_data.get("name", "Unknown App"))} - Container {container_id}'
             linked_workunit_id = workunit_container_map.get(str(container_id), None)
+            previous_dataset_id = previous_datasets.get(str(container_id), previous_datasets.get(container_id)) if previous_datasets else None
 
             try:
-                dataset = dictionary_to_dataset(dataset_data, dataset_name, container_id, DATASET_TEMPLATE_ID, linked_workunit_id)
-                dataset = create_dataset(token_data, dataset)
-                L.log_operation("Success | ORIGIN: run_main_job function", f'Dataset {dataset.get("id", "Null")} created successfully for container {container_id}', params=None, flush_logs=True)
+                if mode == "sync":
+                    dataset_id = run_step(
+                        checkpoint, f"dataset:{container_id}", L,
+                        sync_dataset, token_data, dataset_data, dataset_name, container_id, DATASET_TEMPLATE_ID, linked_workunit_id, L,
+                        previous_dataset_id=previous_dataset_id
+                    )
+                    print(f"Dataset {dataset_id} synchronized for container {container_id}")
+                    return
+
+                dataset_id = run_step(
+                    checkpoint, f"dataset:{container_id}", L,
+                    lambda: create_dataset(token_data, dictionary_to_dataset(dataset_data, dataset_name, container_id, DATASET_TEMPLATE_ID, linked_workunit_id)).get("id", "Null")
+                )
+                L.log_operation("Success | ORIGIN: run_main_job function", f'Dataset {dataset_id} created successfully for container {container_id}', params=None, flush_logs=True)
                 print(f"Dataset created successfully for container {container_id}")
             except Exception as e:
                 L.log_operation("Error | ORIGIN: run_main_job function", f"Failed to create dataset for container {container_id}: {e}", params=None, flush_logs=True)
                 print(f"Error creating dataset for container {container_id}:", e)
-    else:
-        L.log_operation("Info | ORIGIN: run_main_job function", "No dataset creation requested.", params=None, flush_logs=True)
-        print("No dataset creation requested.")
 
+        run_concurrently(create_container_dataset, dataset_dict.items())
 
-    # STEP 5: Register Resources (Refactored)
-    try:
-        attach_resources_to_workunits(token_data, L, workunit_map)
-    except Exception as e:
-        L.log_operation("Error | ORIGIN: run_main_job function", f"Failed to register resources: {e}", params=None, flush_logs=True)
-        print("Error registering resources:", e)
+    def resources_step(results):
+        # STEP 5: Register Resources (Refactored)
+        try:
+            manifest, workunit_container_map = results["workunits"]
+            workunit_files = manifest.join({int(container_id): workunit_id for container_id, workunit_id in workunit_container_map.items()}) if manifest else []
+            # Registered files are recorded per chunk, so a resumed attempt only registers the rest
+            run_step(checkpoint, "resources", L, attach_resources_to_workunits, token_data, L, workunit_files, checkpoint=checkpoint)
+        except Exception as e:
+            L.log_operation("Error | ORIGIN: run_main_job function", f"Failed to register resources: {e}", params=None, flush_logs=True)
+            print("Error registering resources:", e)
 
-    # STEP 6: Attach gstore files (logs, reports, etc.) to B-Fabric entity as a Link
-    try:
-        attach_gstore_files_to_entities_as_link(token_data, L, attachment_paths)
-        print("Attachment Paths:", attachment_paths)
-    except Exception as e:
-        L.log_operation("Error | ORIGIN: run_main_job function", f"Failed to attach extra files: {e}", params=None, flush_logs=True)
-        print("Error attaching extra files:", e)
+    def attachments_step(results):
+        # STEP 6: Attach gstore files (logs, reports, etc.) to B-Fabric entity as a Link
+        try:
+            run_step(checkpoint, "attachments", L, attach_gstore_files_to_entities_as_link, token_data, L, attachment_paths)
+            print("Attachment Paths:", attachment_paths)
+        except Exception as e:
+            L.log_operation("Error | ORIGIN: run_main_job function", f"Failed to attach extra files: {e}", params=None, flush_logs=True)
+            print("Error attaching extra files:", e)
 
+    def charges_step(results):
+        # STEP 7: Charge the container for the service (one concurrent sub-task per container)
+        if not charge:
+            L.log_operation("Info | ORIGIN: run_main_job function", "Charge creation skipped.", params=None, flush_logs=True)
+            print("Charge creation skipped.")
+            return
 
-    # STEP 7: Charge the container for the service
-    if charge: 
-        
         if service_id == 0:
             print("Service ID not provided. Skipping charge creation.")
             L.log_operation("Info | ORIGIN: run_main_job function", "Service ID not provided. Skipping charge creation.", params=None, flush_logs=True)
-        else:
-            container_ids = charge
-            print("Container IDs to charge:", container_ids)
-            if not container_ids:
-                L.log_operation("Error | ORIGIN: run_main_job function", "No container IDs found for charging.", params=None, flush_logs=True)
-                print("Error: No container IDs found for charging.")
-                return
-            for container_id in container_ids:
-                charges = create_charge(token_data, container_id, service_id)
-                charge_id = charges[0].get("id")
+            return
+
+        container_ids = charge
+        print("Container IDs to charge:", container_ids)
+
+        def charge_container(container_id):
+            try:
+                charge_id = run_step(
+                    checkpoint, f"charge:{container_id}", L,
+                    lambda: create_charge(token_data, container_id, service_id)[0].get("id")
+                )
                 L.log_operation("Success | ORIGIN: run_main_job function", f"Charge created for container {container_id} with service ID {service_id} and charge id {charge_id}", params=None, flush_logs=False)
                 print(f"Charge created with id {charge_id} for container {container_id} with service ID {service_id}")
-            L.flush_logs()
-    else:
-        L.log_operation("Info | ORIGIN: run_main_job function", "Charge creation skipped.", params=None, flush_logs=True)
-        print("Charge creation skipped.")
-    
-    # Final log message
-    L.log_operation("Success | ORIGIN: run_main_job function", "All steps completed successfully.", params=None, flush_logs=True)
-    print("All steps completed successfully.")
+            except Exception as e:
+                L.log_operation("Error | ORIGIN: run_main_job function", f"Failed to create charge for container {container_id}: {e}", params=None, flush_logs=False)
+                print(f"Error creating charge for container {container_id}:", e)
+
+        run_concurrently(charge_container, container_ids)
+        L.flush_logs()
+
+    graph = StepGraph()
+    graph.add("save_files", save_files_step)
+    graph.add("bash", bash_step, deps=["save_files"])
+    graph.add("workunits", workunits_step, deps=["bash"])
+    graph.add("datasets", datasets_step, deps=["workunits"])
+    graph.add("resources", resources_step, deps=["workunits"])
+    graph.add("attachments", attachments_step, deps=["bash"])
+    graph.add("charges", charges_step, deps=["bash"])
+
+    try:
+        graph.run()
+
+        timing_report = graph.timing_report()
+        L.log_operation("Info | ORIGIN: run_main_job function", f"Step timings: {timing_report}", params=None, flush_logs=False)
+        print("Step timings:", timing_report)
+
+        # Final log message
+        L.log_operation("Success | ORIGIN: run_main_job function", "All steps completed successfully.", params=None, flush_logs=True)
+        print("All steps completed successfully.")
+
+        # The job is done, a later run must not skip any step
+        checkpoint.clear()
+
+    finally:
+        # Make sure every queued log line reaches the job object before the worker moves on
+        L.flush_logs(wait=True)
 
 #---------------------------------------------------------------------------------------------------------------------
 #---------------------------------------------------------------------------------------------------------------------
@@ -200,12 +292,16 @@ def save_files_from_bytes(files_as_byte_strings: dict, logger):
     """
     Saves byte string files to their respective paths.
 
-    :param files_as_byte_strings: Dictionary where keys are destination paths and values are byte strings
+    Values can also be staging references created with `stage_file` / `stage_bytes`. Those files
+    are streamed from the staging area to their destination and verified against their checksum.
+
+    :param files_as_byte_strings: Dictionary where keys are destination paths and values are byte strings or staging references
     :param logger: Logging instance
-    :return: Summary indicating how many files succeeded vs. failed
+    :return: Summary of the saved files
+    :raises RuntimeError: If any file could not be saved (each failure is logged)
     """
 
-    message = "All files saved successfully."
+    failed = []
 
     # First pass: attempt to write all files
     for destination, file_bytes in files_as_byte_strings.items():
@@ -213,6 +309,11 @@ def save_files_from_bytes(files_as_byte_strings: dict, logger):
             # Write file from byte string
             if destination.startswith("~"): 
                 destination = os.path.expanduser(destination)
+            if is_staged_reference(file_bytes):
+                # Stream the staged file to its destination
+                write_staged_file(file_bytes, destination)
+                logger.log_operation("File saved | ORIGIN: run_main_job function", f"File {destination} saved successfully ({file_bytes['size']} bytes, sha256 {file_bytes['staged_sha256']}).", params=None, flush_logs=True)
+                continue
             with open(destination, "+wb") as f:
                 f.write(file_bytes)
             logger.log_operation("File saved | ORIGIN: run_main_job function", f"File {destination} saved successfully.", params=None, flush_logs=True)
@@ -221,48 +322,48 @@ def save_files_from_bytes(files_as_byte_strings: dict, logger):
             error_msg = f"Error saving file: {destination}, Error: {str(e)}"
             logger.log_operation("Error | ORIGIN: run_main_job function", error_msg, params=None, flush_logs=True)
             print(error_msg)
-            message = f"Error saving some files." 
+            failed.append(destination)
+
+    if failed:
+        raise RuntimeError(f"Error saving {len(failed)} of {len(files_as_byte_strings)} files: {failed}")
 
-    return message
+    return f"All {len(files_as_byte_strings)} files saved successfully."
 
 
 # -----------------------------------------------------------------------------
 # Step 2: Execute Bash Commands
 # -----------------------------------------------------------------------------
 
-def execute_and_log_bash_commands(bash_commands: list[str]):
+def execute_and_log_bash_commands(bash_commands: list[str], logger=None):
     """
     Executes a list of bash commands locally, logs and returns the output.
 
+    Commands run through `run_bash_commands`: output is streamed line by line into bounded
+    buffers and a log file, and progress is reported through the logger while a command runs.
+    A nested list of commands forms a group that runs in parallel, and a command can be given
+    as {"cmd": ..., "timeout": seconds} to limit its runtime.
+
     :param bash_commands: List of commands to execute
+    :param logger: Logger instance used for progress messages (optional)
     :return: A single string containing logs for all commands
+    :raises RuntimeError: If a command failed, timed out or could not be started; the message contains the logs
     """
-    logstring = ""
-
-    for cmd in bash_commands:
-        logstring += "---------------------------------------------------------\n"
-        logstring += f"Executing Command\n"
+    results, log_path = run_bash_commands(bash_commands, logger=logger)
+    logstring = format_bash_results(results, log_path)
+    print(logstring)
 
+    # The log file is only needed when the formatted output was truncated and refers to it;
+    # kept files are rotated by run_bash_commands (BASH_LOG_KEEP)
+    if not any(result["truncated"] for result in results):
         try:
-            # Execute the command and capture both stdout and stderr
-            result = subprocess.run(cmd, shell=True, text=True, capture_output=True)
-            output = result.stdout.strip()
-            error_output = result.stderr.strip()
-
-            # Check if command executed successfully
-            if result.returncode == 0:
-                status = "SUCCESS"
-                log_entry = f"Command: {cmd}\nStatus: {status}\nOutput:\n{output}\n"
-            else:
-                status = "FAILURE"
-                log_entry = f"Command: {cmd}\nStatus: {status}\nError Output:\n{error_output}\n"
-
-            logstring += log_entry
-            print(log_entry)
+            os.remove(log_path)
+        except OSError:
+            pass
+
+    unsuccessful = [result["cmd"] for result in results if result["status"] != "SUCCESS"]
+    if unsuccessful:
+        raise RuntimeError(f"{len(unsuccessful)} of {len(results)} bash command(s) did not succeed: {unsuccessful}\n{logstring}")
 
-        except Exception as e:
-            logstring += f"Command: {cmd}\nStatus: ERROR\nException: {str(e)}\n"
-    
     return logstring
 
 
@@ -270,59 +371,71 @@ def execute_and_log_bash_commands(bash_commands: list[str]):
 # Step 3: Create Workunits in B-Fabric
 # -----------------------------------------------------------------------------
 
-def create_workunits_step(token_data, app_data, resource_paths, logger):
+def scan_resource_paths(resource_paths, logger):
     """
-    Creates multiple workunits in B-Fabric based on unique order IDs found in resource_paths.
+    Lists the files of resource_paths, expanding directories into their files.
+
+    Roots that do not exist and directories or files that could not be read are logged.
+
+    :param resource_paths: Dictionary {file_path or dir_path: container_id}
+    :param logger: a logger instance
+    :return: FileManifest of the files, tagged with their container ID
+    """
+    manifest = FileManifest.scan(
+        {path_str: int(container_id) for path_str, container_id in resource_paths.items()},
+        include=config.RESOURCE_INCLUDE_GLOBS,
+        exclude=config.RESOURCE_EXCLUDE_GLOBS,
+    )
+
+    for path_str in manifest.missing:
+        logger.log_operation("Warning | ORIGIN: run_main_job function", f"Path {path_str} does not exist.", flush_logs=True)
+        print(f"Warning: Path {path_str} does not exist or is not accessible.")
+
+    for path_str, error in manifest.errors:
+        logger.log_operation("Error | ORIGIN: run_main_job function", f"Could not scan {path_str}, its files are not registered: {error}", flush_logs=False)
+        print(f"Error: Could not scan {path_str}: {error}")
+    if manifest.errors:
+        logger.flush_logs()
+
+    return manifest
+
+
+def create_workunits_step(token_data, app_data, manifest, logger):
+    """
+    Creates one workunit in B-Fabric per container that has files in the manifest.
 
     :param token_data: dict with token/auth info
     :param app_data: dict with fields like {"id": <app_id>} or other app info
-    :param resource_paths: Dictionary {file_path or dir_path: container_id}
+    :param manifest: FileManifest of the resource files, tagged with their container ID (see `scan_resource_paths`)
     :param logger: a logger instance
-    :return: A tuple containing: 
-        A dictionary mapping file_paths to workunit objects {file_path: workunit_id}
-        A dictionary mapping container_ids to workunit objects {container_id: workunit_id}
+    :return: A dictionary mapping container_ids to workunit IDs {container_id: workunit_id}
+    :raises RuntimeError: If the workunits could not be linked to the job
     """
     app_id = app_data["id"]  # Extract the application ID
 
-    # Expand any directories into individual files
-    expanded_paths = {}
-
-    for path_str, container_id in resource_paths.items():
-        path = Path(path_str)
-        if path.is_file():
-            expanded_paths[str(path)] = int(container_id)
-        elif path.is_dir():
-            for file in path.rglob("*"): #is a method that returns all files and folders in the directory and its subdirectories
-                if file.is_file():
-                    expanded_paths[str(file)] = int(container_id)
-        else:
-            logger.log_operation("Warning | ORIGIN: run_main_job function", f"Path {path_str} does not exist.", flush_logs=True)
-            print(f"Warning: Path {path_str} does not exist or is not accessible.")
-
-    if not expanded_paths:
+    if not len(manifest):
         raise ValueError("No valid file paths found in resource_paths.")
 
-    container_ids = list(set(expanded_paths.values()))
+    file_counts = manifest.counts()
+    container_ids = [container_id for container_id, count in file_counts.items() if count]
 
-    # Create all workunits in one API call
-    created_workunits = create_workunits(
+    # Create all workunits with multi-object saves and a single job update
+    report = create_workunits_batch(
         token_data=token_data,
         application_name="Test Workunit",
         application_description="Workunits for batch processing",
         application_id=app_id,
-        container_ids=container_ids
+        container_ids=container_ids,
     )
 
+    # Workunits that are not linked to the job must not be checkpointed as created
+    if report["link_error"]:
+        raise RuntimeError(report["link_error"])
+
+    created_workunits = list(report["created"].values())
     if not created_workunits or len(created_workunits) != len(container_ids):
         raise ValueError(f"Mismatch in workunit creation: Expected {len(container_ids)} workunits, got {len(created_workunits)}.")
 
-    workunit_map = {
-        file_path: wu["id"]
-        for wu in created_workunits
-        for file_path, container_id in expanded_paths.items()
-        if container_id == wu["container"]["id"]
-    }
-
     workunit_container_map = {
         str(wu["container"]["id"]): wu["id"]
         for wu in created_workunits
@@ -331,9 +444,9 @@ def create_workunits_step(token_data, app_data, resource_paths, logger):
     workunit_ids = [wu.get("id") for wu in created_workunits]
     logger.log_operation("Success | ORIGIN: run_main_job function", f"Total created Workunits: {workunit_ids}", params=None, flush_logs=True)
     print(f"Total created Workunits: {workunit_ids}")
-    print(workunit_map)
+    print(f"Files per container: {file_counts}")
 
-    return workunit_map, workunit_container_map  # Returning {file_path: workunit}
+    return workunit_container_map
 
 
 
@@ -355,57 +468,149 @@ def create_dataset(token_data, dataset_data):
     return dataset[0]
 
 
+def find_dataset(token_data, container_id, linked_workunit_id, dataset_id=None):
+    """
+    Finds the dataset of a container to synchronize.
+
+    A dataset_id targets the dataset of a previous run. Without one, the lookup is scoped to
+    the workunit, i.e. it only finds the dataset an earlier attempt of the same job saved, and
+    never matches datasets of other workunits or users in the container.
+
+    :param token_data: B-Fabric token data
+    :param container_id: ID of the container
+    :param linked_workunit_id: ID of the workunit the dataset is linked to
+    :param dataset_id: ID of the dataset saved by a previous run (optional)
+    :return: The dataset object, or None if there is none
+    :raises ValueError: If the dataset with dataset_id belongs to another container
+    """
+    wrapper = get_power_user_wrapper(token_data)
+
+    if dataset_id:
+        datasets = list(wrapper.read("dataset", {"id": int(dataset_id)}))
+        if not datasets:
+            return None
+        dataset = datasets[0]
+        dataset_container_id = (dataset.get("container") or {}).get("id", dataset.get("containerid"))
+        if str(dataset_container_id) != str(container_id):
+            raise ValueError(f"Dataset {dataset_id} belongs to container {dataset_container_id}, not to container {container_id}")
+        return dataset
+
+    if not linked_workunit_id:
+        return None
+
+    datasets = list(wrapper.read("dataset", {"workunitid": linked_workunit_id, "containerid": container_id}, max_results=None))
+    if not datasets:
+        return None
+    return max(datasets, key=lambda dataset: int(dataset.get("id", 0)))
+
+
+def sync_dataset(token_data, dataset_data, dataset_name, container_id, dataset_template_id, linked_workunit_id, logger, key_column=None,
+                 previous_dataset_id=None):
+    """
+    Updates the previous dataset of a container, if its content changed, and links it to the workunit.
+
+    The new content is compared with the dataset found by `find_dataset`, matching rows on
+    `key_column`. If anything changed, the complete attribute and item lists are saved (see
+    `dataset_patch`); an unchanged dataset is not saved. Without an existing dataset, a new
+    one is created.
+
+    :param token_data: B-Fabric token data
+    :param dataset_data: {field name: list of values}
+    :param dataset_name: Name of the dataset
+    :param container_id: ID of the container
+    :param dataset_template_id: Dataset template ID used when a new dataset is created
+    :param linked_workunit_id: ID of the workunit to link the dataset to
+    :param logger: Logger instance
+    :param key_column: Field identifying a row. Defaults to DATASET_SYNC_KEY_COLUMN, or the first field.
+    :param previous_dataset_id: ID of the dataset saved by a previous run (see `find_dataset`)
+    :return: The dataset ID
+    """
+    existing = find_dataset(token_data, container_id, linked_workunit_id, previous_dataset_id)
+
+    if existing is None:
+        dataset_id = create_dataset(token_data, dictionary_to_dataset(dataset_data, dataset_name, container_id, dataset_template_id, linked_workunit_id)).get("id", "Null")
+        logger.log_operation("Success | ORIGIN: run_main_job function", f"No existing dataset for container {container_id}, created dataset {dataset_id}",
+                             params=None, flush_logs=True)
+        return dataset_id
+
+    diff = diff_dataset(existing, dataset_data, key_column or config.DATASET_SYNC_KEY_COLUMN or None)
+    patch = dataset_patch(existing, dataset_data, diff, linked_workunit_id)
+    dataset_id = existing.get("id")
+
+    if not diff["changed"]:
+        summary = "no changes" if not patch else "no changes, relinked to the workunit"
+    else:
+        summary = (f"rows matched on '{diff['key_column']}': {len(diff['changed_rows'])} changed ({diff['changed_cells']} values), "
+                   f"{diff['added_rows']} added, {diff['removed_rows']} removed"
+                   + (", reordered" if diff["reordered"] else "")
+                   + (f", columns added {diff['added_columns']}, removed {diff['removed_columns']}" if diff["added_columns"] or diff["removed_columns"] else "")
+                   + f"; {len(patch['item'])} items saved")
+
+    if patch:
+        get_power_user_wrapper(token_data).save("dataset", patch)
+
+    logger.log_operation("Success | ORIGIN: run_main_job function", f"Dataset {dataset_id} synchronized for container {container_id}: {summary}",
+                         params=None, flush_logs=True)
+    return dataset_id
+
+
 
 # -----------------------------------------------------------------------------
 # Step 5: Attach Resources in B-Fabric
 # -----------------------------------------------------------------------------
 
-def attach_resources_to_workunits(token_data, logger, workunit_map):
+def attach_resources_to_workunits(token_data, logger, workunit_files, checkpoint=None):
     """
     Attaches each file to its corresponding workunit.
 
-    Uses `create_resource` to upload files one by one.
+    Uses `register_resources` to register the files with chunked multi-object saves
+    on a bounded thread pool.
 
     :param token_data: B-Fabric token data
     :param logger: Logger instance
-    :param workunit_map: Dictionary mapping file_path to workunit_id {file_path: workunit_id}
+    :param workunit_files: Iterable of (file_path, workunit_id) pairs, e.g. `FileManifest.join`, or a dict {file_path: workunit_id}
+    :param checkpoint: JobCheckpoint recording the registered files, which a resumed attempt skips (optional)
+    :raises RuntimeError: If any resource could not be registered (each failure is logged)
     """
-    if not workunit_map:
+    workunit_files = iter(workunit_files.items() if isinstance(workunit_files, dict) else workunit_files)
+    first = next(workunit_files, None)
+    if first is None:
         logger.log_operation("Info | ORIGIN: run_main_job function", "No workunits found, skipping resource registration.",
                              params=None, flush_logs=True)
         print("No workunits found, skipping resource registration.")
         return
 
-    print("Workunit Map:", workunit_map)
-
-    # Dictionary to count successfully created resources per workunit
-    # defaultdict(int) automatically starts each new key with a value of 0
-    workunit_resource_count = defaultdict(int)
-
-    for file_path, workunit_id in workunit_map.items():
-        print(f"Processing file: {file_path}, Workunit ID: {workunit_id}")
-        # Upload the file as a resource
-        resource = create_resource(token_data, workunit_id, file_path)
-        resource_id = resource.get("id")
-        print("Resource ID:", resource_id)
-        if resource_id:
-            workunit_resource_count[workunit_id] += 1
-            print(f"Resource {resource_id} attached to Workunit {workunit_id}")
-        else:
-            logger.log_operation("Error | ORIGIN: run_main_job function", f"Failed to attach resource {file_path} for Workunit {workunit_id}",
-                                 params=None, flush_logs=True)
-            print(f"Failed to attach resource {file_path} for Workunit {workunit_id}")
+    report = register_resources(token_data, chain([first], workunit_files), checkpoint=checkpoint)
+    if report["resumed"]:
+        logger.log_operation("Info | ORIGIN: run_main_job function", f"{report['resumed']} resource(s) were registered by a previous attempt, skipped.",
+                             params=None, flush_logs=False)
+
+    for file_path, error in report["failed"].items():
+        logger.log_operation("Error | ORIGIN: run_main_job function", f"Failed to attach resource {file_path}: {error}",
+                             params=None, flush_logs=False)
+        print(f"Failed to attach resource {file_path}: {error}")
 
     # Log a summary per workunit
-    for workunit_id, count in workunit_resource_count.items():
+    for workunit_id, count in report["per_workunit"].items():
         logger.log_operation(
             "Success | ORIGIN: run_main_job function",
             f"Created {count} resource(s) for Workunit ID {workunit_id}",
             params=None,
-            flush_logs=True
+            flush_logs=False
         )
         print(f"Created {count} resource(s) for Workunit ID {workunit_id}")
 
+    logger.log_operation(
+        "Info | ORIGIN: run_main_job function",
+        f"Registered {len(report['created'])} of {report['total']} resource(s) in {report['elapsed']:.2f}s "
+        f"({report['files_per_second']:.1f} files/s)",
+        params=None,
+        flush_logs=True
+    )
+
+    if report["failed"]:
+        raise RuntimeError(f"Failed to register {len(report['failed'])} of {report['total']} resource(s): {list(report['failed'])}")
+
 
 
 # -----------------------------------------------------------------------------
@@ -418,6 +623,10 @@ def attach_gstore_files_to_entities_as_link(token_data, logger, attachment_paths
     """
     Attaches files to a B-Fabric entity by copying them to the FGCZ storage and creating an API link.
 
+    Without local gstore access and with GSTORE_BATCH_TRANSFER enabled, all attachments are
+    copied in a single SCP session and moved with a single remote g-req call (see
+    `transfer_attachments_batch`). Otherwise each attachment is transferred on its own.
+
     Args:
         token_data (dict): Authentication token data.
         logger: Logger instance for logging operations.
@@ -425,27 +634,61 @@ def attach_gstore_files_to_entities_as_link(token_data, logger, attachment_paths
     
     Returns:
         None
+
+    Raises:
+        RuntimeError: If any attachment was skipped or could not be transferred or linked (each failure is logged).
     """
 
     # Extract entity details from token data
     entity_class = token_data.get("entityClass_data", None)
     entity_id = token_data.get("entity_id_data", None)
 
+    # Define entity folder
+    entity_folder = f"{entity_class}_{entity_id}" if entity_class and entity_id else "unknown_entity"
+    final_remote_path = f"{GSTORE_REMOTE_PATH}/{entity_folder}/"
+
     # Check if we have access to the FGCZ server
     local = local_access(GSTORE_REMOTE_PATH)
 
-    # Process each attachment
+    valid_attachments = {}
+    failed = []
     for source_path, file_name in attachment_paths.items():
         if not source_path or not file_name:
             logger.log_operation("Error | ORIGIN: run_main_job function", f"Missing required attachment details: {source_path} -> {file_name}", params=None, flush_logs=True)
             print(f"Error: Missing required attachment details: {source_path} -> {file_name}")
+            failed.append(source_path)
+            continue
+        if file_name in valid_attachments.values():
+            # Both files would end up at the same gstore path
+            logger.log_operation("Error | ORIGIN: run_main_job function", f"Duplicate attachment name '{file_name}', skipped {source_path}", params=None, flush_logs=True)
+            print(f"Error: Duplicate attachment name '{file_name}', skipped {source_path}")
+            failed.append(source_path)
             continue
+        valid_attachments[source_path] = file_name
+
+    if not local and config.GSTORE_BATCH_TRANSFER and valid_attachments:
+        errors = transfer_attachments_batch(valid_attachments, TRX_LOGIN, TRX_SSH_KEY, SCRATCH_PATH, final_remote_path)
+
+        for source_path, file_name in valid_attachments.items():
+            error = errors.get(source_path)
+            if error:
+                error_msg = f"Exception while processing '{file_name}': {error}"
+                logger.log_operation("Error | ORIGIN: run_main_job function", error_msg, params=None, flush_logs=True)
+                print(error_msg)
+                failed.append(source_path)
+                continue
+
+            print(f"Successfully attached '{file_name}' to {entity_class} (ID={entity_id})")
+            if not create_attachment_link(token_data, logger, entity_class, entity_id, file_name, entity_folder):
+                failed.append(source_path)
+
+        if failed:
+            raise RuntimeError(f"Failed to attach {len(failed)} of {len(attachment_paths)} file(s): {failed}")
+        return
 
+    # Process each attachment
+    for source_path, file_name in valid_attachments.items():
         try:
-            # Define entity folder
-            entity_folder = f"{entity_class}_{entity_id}" if entity_class and entity_id else "unknown_entity"
-            final_remote_path = f"{GSTORE_REMOTE_PATH}/{entity_folder}/"
-
             print("local access:", local)
             print("source path:", source_path)
             print("file name:", file_name)
@@ -468,12 +711,17 @@ def attach_gstore_files_to_entities_as_link(token_data, logger, attachment_paths
             print(success_msg)
 
             # Step 3: Create API link
-            create_attachment_link(token_data, logger, entity_class, entity_id, file_name, entity_folder)
+            if not create_attachment_link(token_data, logger, entity_class, entity_id, file_name, entity_folder):
+                failed.append(source_path)
 
         except Exception as e:
             error_msg = f"Exception while processing '{file_name}': {e}"
             logger.log_operation("Error | ORIGIN: run_main_job function", error_msg, params=None, flush_logs=True)
             print(error_msg)
+            failed.append(source_path)
+
+    if failed:
+        raise RuntimeError(f"Failed to attach {len(failed)} of {len(attachment_paths)} file(s): {failed}")
 
 def local_access(remote_path):
     """Checks if the remote gstore path (i.e. /srv/gstore/projects/) exists locally""" 
@@ -485,7 +733,7 @@ def local_access(remote_path):
 def scp_copy(source_path, ssh_user, ssh_key, remote_path):
     """Copies a file to a remote location using SCP with the correct FGCZ server address."""
     print("SCP Copying...")
-    cmd = ["scp", "-i", ssh_key, source_path, f"{ssh_user}:{remote_path}"]
+    cmd = [config.SCP_COMMAND, "-i", ssh_key, source_path, f"{ssh_user}:{remote_path}"]
     print("SCP Command:")
     subprocess.run(cmd, check=True)
     print("SCP Command Executed:", cmd)
@@ -494,24 +742,213 @@ def scp_copy(source_path, ssh_user, ssh_key, remote_path):
 
 def ssh_move(ssh_user, ssh_key, remote_tmp_path, final_remote_path):
     """Moves a file on the remote server to its final location using SSH."""
-    cmd = ["ssh", "-i", ssh_key, ssh_user, f"/usr/local/ngseq/bin/g-req copynow -f {remote_tmp_path} {final_remote_path}"]
+    remote_cmd = f"{config.G_REQ_COMMAND} copynow -f {shlex.quote(remote_tmp_path)} {shlex.quote(final_remote_path)}"
+    cmd = [config.SSH_COMMAND, "-i", ssh_key, ssh_user, remote_cmd]
 
     subprocess.run(cmd, check=True)
     print(f"Moved {remote_tmp_path} to {final_remote_path}")
-    
-    # Wait 10 second before next move
-    time.sleep(10)
+
+    # Wait until the file has arrived before the next move
+    await_remote_files(ssh_user, ssh_key, [f"{final_remote_path.rstrip('/')}/{os.path.basename(remote_tmp_path)}"])
+
+
+def transfer_attachments_batch(attachments: dict, ssh_user, ssh_key, scratch_path, final_remote_path):
+    """
+    Transfers several attachments of one entity to gstore in a single batch.
+
+    The files are copied to the scratch folder with one SCP session (renamed to their
+    attachment names), moved to the final location with one SSH call running g-req for
+    every file, and then polled until they have all arrived (see `await_remote_files`). The
+    outcome is reported per file, so one failing g-req call does not fail the other attachments.
+
+    Args:
+        attachments (dict): Dictionary mapping source file paths to their file names on gstore.
+            The file names must be unique.
+        ssh_user (str): SSH login of the transfer server.
+        ssh_key (str): Path to the SSH key.
+        scratch_path (str): Remote scratch folder used as intermediate location.
+        final_remote_path (str): Remote gstore folder of the entity.
+
+    Returns:
+        dict: {source path: error message} for the attachments that failed; empty if all arrived.
+
+    Raises:
+        ValueError: If two attachments have the same file name.
+    """
+    if len(set(attachments.values())) != len(attachments):
+        raise ValueError(f"Attachment file names must be unique: {list(attachments.values())}")
+
+    sources = list(attachments)
+    remote_tmp_paths = [f"{scratch_path}/{attachments[source]}" for source in sources]
+    final_paths = [f"{final_remote_path.rstrip('/')}/{attachments[source]}" for source in sources]
+
+    # Stage the files under their attachment names so a single scp call can copy them all
+    try:
+        with tempfile.TemporaryDirectory() as staging_dir:
+            staged_paths = []
+            for source_path in sources:
+                staged_path = os.path.join(staging_dir, attachments[source_path])
+                os.symlink(os.path.abspath(os.path.expanduser(source_path)), staged_path)
+                staged_paths.append(staged_path)
+
+            cmd = [config.SCP_COMMAND, "-i", ssh_key, *staged_paths, f"{ssh_user}:{scratch_path}/"]
+            subprocess.run(cmd, check=True)
+            print(f"Copied {len(staged_paths)} file(s) to {scratch_path}")
+    except Exception as e:
+        return {source: f"Copy to {scratch_path} failed: {e}" for source in sources}
+
+    # Move every file with g-req in one remote session, echoing the index of each file that failed
+    remote_cmd = " ".join(
+        f"{config.G_REQ_COMMAND} copynow -f {shlex.quote(path)} {shlex.quote(final_remote_path)} || echo FAILED {i};"
+        for i, path in enumerate(remote_tmp_paths)
+    )
+    try:
+        result = subprocess.run([config.SSH_COMMAND, "-i", ssh_key, ssh_user, remote_cmd], capture_output=True, text=True)
+    except Exception as e:
+        return {source: f"Move to {final_remote_path} failed: {e}" for source in sources}
+
+    if result.returncode != 0:
+        # The session itself failed, so the per-file report is incomplete
+        message = (result.stderr or "").strip() or f"exit code {result.returncode}"
+        return {source: f"Move to {final_remote_path} failed: {message}" for source in sources}
+
+    failed = {int(line.split()[1]) for line in result.stdout.splitlines() if line.startswith("FAILED ")}
+    errors = {sources[i]: f"g-req copy to {final_remote_path} failed" for i in failed}
+    print(f"Moved {len(sources) - len(failed)} of {len(sources)} file(s) to {final_remote_path}")
+
+    moved = [i for i in range(len(sources)) if i not in failed]
+    if moved:
+        try:
+            await_remote_files(ssh_user, ssh_key, [final_paths[i] for i in moved])
+        except Exception as e:
+            missing = set(missing_remote_files(ssh_user, ssh_key, [final_paths[i] for i in moved]))
+            for i in moved:
+                if final_paths[i] in missing:
+                    errors[sources[i]] = f"File did not arrive on gstore: {e}"
+
+    return errors
+
+
+def remote_arrival_checkable(ssh_user, ssh_key):
+    """
+    Checks whether files arriving on gstore can be seen from the remote server, according to GSTORE_ARRIVAL_CHECK.
+
+    With "auto", the check is only possible if GSTORE_REMOTE_PATH is mounted on the remote
+    server, which is tested with one SSH call.
+
+    Args:
+        ssh_user (str): SSH login of the remote server.
+        ssh_key (str): Path to the SSH key.
+
+    Returns:
+        bool: True if `wait_for_remote_files` can be used.
+    """
+    mode = config.GSTORE_ARRIVAL_CHECK
+    if mode == "off":
+        return False
+    if mode == "ssh":
+        return True
+
+    try:
+        result = subprocess.run([config.SSH_COMMAND, "-i", ssh_key, ssh_user, f"test -d {shlex.quote(GSTORE_REMOTE_PATH)}"], capture_output=True, text=True)
+    except Exception as e:
+        print(f"Could not check whether {GSTORE_REMOTE_PATH} is visible on {ssh_user}: {e}")
+        return False
+    return result.returncode == 0
+
+
+def await_remote_files(ssh_user, ssh_key, remote_paths):
+    """
+    Waits for transferred files to arrive on gstore.
+
+    The files are polled with `wait_for_remote_files` if their arrival can be checked (see
+    `remote_arrival_checkable`). Otherwise the function waits GSTORE_TRANSFER_DELAY seconds
+    and returns, so the attachment links are still created.
+
+    Args:
+        ssh_user (str): SSH login of the remote server.
+        ssh_key (str): Path to the SSH key.
+        remote_paths (list[str]): Remote file paths to wait for.
+
+    Raises:
+        TimeoutError: If the files were polled and did not all appear within GSTORE_TRANSFER_TIMEOUT.
+    """
+    if remote_arrival_checkable(ssh_user, ssh_key):
+        wait_for_remote_files(ssh_user, ssh_key, remote_paths)
+        return
+
+    print(f"Arrival of {len(remote_paths)} file(s) on gstore cannot be checked from {ssh_user}, waiting {config.GSTORE_TRANSFER_DELAY}s")
+    time.sleep(config.GSTORE_TRANSFER_DELAY)
+
+
+def missing_remote_files(ssh_user, ssh_key, remote_paths):
+    """
+    Checks which of the given files do not exist on the remote server, in one SSH call.
+
+    Args:
+        ssh_user (str): SSH login of the remote server.
+        ssh_key (str): Path to the SSH key.
+        remote_paths (list[str]): Remote file paths to check.
+
+    Returns:
+        list[str]: The paths that do not exist (all of them if the check itself failed).
+    """
+    check_cmd = " ".join(f"test -e {shlex.quote(path)} || echo {i};" for i, path in enumerate(remote_paths))
+    result = subprocess.run([config.SSH_COMMAND, "-i", ssh_key, ssh_user, check_cmd], capture_output=True, text=True)
+    if result.returncode != 0:
+        return list(remote_paths)
+
+    missing = {int(line) for line in result.stdout.split() if line.isdigit()}
+    return [path for i, path in enumerate(remote_paths) if i in missing]
+
+
+def wait_for_remote_files(ssh_user, ssh_key, remote_paths, timeout=None, interval=None, backoff=None):
+    """
+    Polls the remote server until all given files exist.
+
+    The first check runs immediately; later checks wait `interval` seconds, growing by
+    the factor `backoff` after every attempt.
+
+    Args:
+        ssh_user (str): SSH login of the remote server.
+        ssh_key (str): Path to the SSH key.
+        remote_paths (list[str]): Remote file paths to wait for.
+        timeout (float, optional): Maximum seconds to wait. Defaults to GSTORE_TRANSFER_TIMEOUT.
+        interval (float, optional): Initial seconds between checks. Defaults to GSTORE_TRANSFER_POLL_INTERVAL.
+        backoff (float, optional): Growth factor of the interval. Defaults to GSTORE_TRANSFER_POLL_BACKOFF.
+
+    Raises:
+        TimeoutError: If the files did not all appear within the timeout.
+    """
+    timeout = config.GSTORE_TRANSFER_TIMEOUT if timeout is None else timeout
+    interval = config.GSTORE_TRANSFER_POLL_INTERVAL if interval is None else interval
+    backoff = config.GSTORE_TRANSFER_POLL_BACKOFF if backoff is None else backoff
+
+    deadline = time.monotonic() + timeout
+    remaining_paths = list(remote_paths)
+
+    while True:
+        remaining_paths = missing_remote_files(ssh_user, ssh_key, remaining_paths)
+        if not remaining_paths:
+            return
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError(f"Files did not arrive on the remote server within {timeout}s: {remaining_paths}")
+
+        time.sleep(min(interval, remaining))
+        interval *= backoff
 
 
 def g_req_copy(source_path, destination_path):
     """Copies a file using g-req command when direct access is available."""
-    cmd = ["/usr/local/ngseq/bin/g-req", "copynow", "-f", source_path, destination_path]
+    cmd = [config.G_REQ_COMMAND, "copynow", "-f", source_path, destination_path]
     subprocess.run(cmd, check=True)
     print(f"Copied {source_path} using g-req")
 
 
 def create_attachment_link(token_data, logger, entity_class, entity_id, file_name, folder_name):
-    """Creates an attachment link in B-Fabric for the attached file."""
+    """Creates an attachment link in B-Fabric for the attached file. Returns True on success."""
     wrapper = get_power_user_wrapper(token_data)
     url = f"{URL}/{folder_name}/{file_name}"
     timestamped_filename = f"{dt.now().strftime('%Y-%m-%d_%H:%M:%S')}_{file_name}"
@@ -529,16 +966,23 @@ def create_attachment_link(token_data, logger, entity_class, entity_id, file_nam
             success_msg = f"Attachment link created for '{file_name}': {url}"
             logger.log_operation("Success | ORIGIN: run_main_job function", success_msg, params=None, flush_logs=True)
             print(success_msg)
+            return True
         else:
             raise ValueError("Attachment link creation failed")
     except Exception as e:
         error_msg = f"Failed to create attachment link for '{file_name}': {e}"
         logger.log_operation("Error | ORIGIN: run_main_job function", error_msg, params=None, flush_logs=True)
         print(error_msg)
+        return False
 
 
 def read_file_as_bytes(file_path, max_size_mb=400):
-    """Reads any file type and stores it as a byte string in a dictionary."""
+    """
+    Reads any file type and stores it as a byte string in a dictionary.
+
+    For large files prefer `stage_file`, which streams the file to the staging area and
+    returns a small reference instead of the whole content.
+    """
     file_size_mb = os.path.getsize(file_path) / (1024 * 1024)  # Convert bytes to MB
     if file_size_mb > max_size_mb:
         raise ValueError(f"File {file_path} exceeds {max_size_mb}MB limit ({file_size_mb:.2f}MB).")
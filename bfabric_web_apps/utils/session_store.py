@@ -0,0 +1,148 @@
+import json
+import secrets
+import datetime
+
+from .redis_connection import get_redis_connection
+from .config import settings as config
+
+SESSION_KEY_PREFIX = "bfabric_web_apps:session:"
+
+
+def _session_key(session_id):
+    return f"{SESSION_KEY_PREFIX}{session_id}"
+
+
+def _session_ttl(token_data):
+    """Seconds until the session token expires, but at least SESSION_MIN_TTL."""
+    try:
+        expires = datetime.datetime.strptime(token_data.get("token_expires"), "%Y-%m-%d %H:%M:%S")
+        seconds_left = int((expires - datetime.datetime.now()).total_seconds())
+    except (TypeError, ValueError, AttributeError):
+        seconds_left = 0
+    return max(seconds_left, config.SESSION_MIN_TTL)
+
+
+def create_session(token, token_data, entity_data, app_data, job_link=None):
+    """
+    Stores the objects of a session in Redis and returns the session ID to keep in the browser.
+
+    The session expires together with the token (but lives at least SESSION_MIN_TTL seconds).
+
+    Args:
+        token (str): Authentication token.
+        token_data (dict): Token metadata.
+        entity_data (dict): Retrieved entity information.
+        app_data (dict): Retrieved application information.
+        job_link (str, optional): Link to the job page.
+
+    Returns:
+        str: The session ID.
+    """
+    session_id = secrets.token_urlsafe(24)
+    key = _session_key(session_id)
+
+    values = {
+        "token": token,
+        "token_data": token_data,
+        "entity_data": entity_data,
+        "app_data": app_data,
+        "job_link": job_link,
+    }
+
+    pipe = get_redis_connection().pipeline()
+    pipe.hset(key, mapping={name: json.dumps(value) for name, value in values.items()})
+    pipe.expire(key, _session_ttl(token_data or {}))
+    pipe.execute()
+
+    return session_id
+
+
+class ServerSession:
+    """
+    Lazy view on a session stored with `create_session`.
+
+    Each object is fetched from Redis the first time it is accessed, so a callback only
+    pays for the objects it actually uses.
+    """
+
+    def __init__(self, session_id):
+        """
+        Initializes the view for a session ID.
+
+        Args:
+            session_id (str): The session ID kept in the browser.
+        """
+        self.session_id = session_id
+        self._loaded = {}
+
+    def get(self, name, default=None):
+        """
+        Returns a session object, loading it from Redis on first access.
+
+        Args:
+            name (str): One of "token", "token_data", "entity_data", "app_data", "job_link".
+            default: Returned if the session or object does not exist.
+
+        Returns:
+            any: The session object.
+        """
+        if name not in self._loaded:
+            raw = get_redis_connection().hget(_session_key(self.session_id), name) if self.session_id else None
+            self._loaded[name] = json.loads(raw) if raw is not None else None
+
+        value = self._loaded[name]
+        return default if value is None else value
+
+    def exists(self):
+        """Returns True if the session is stored and not expired."""
+        return bool(self.session_id) and bool(get_redis_connection().exists(_session_key(self.session_id)))
+
+    @property
+    def token(self):
+        return self.get("token")
+
+    @property
+    def token_data(self):
+        return self.get("token_data")
+
+    @property
+    def entity_data(self):
+        return self.get("entity_data")
+
+    @property
+    def app_data(self):
+        return self.get("app_data")
+
+    @property
+    def job_link(self):
+        return self.get("job_link")
+
+
+def load_session(session_id):
+    """
+    Returns a lazy view on a stored session, to be used inside callbacks.
+
+    Example:
+        @app.callback(Output("result", "children"), Input("run", "n_clicks"), State("session_id", "data"))
+        def run(n_clicks, session_id):
+            session = load_session(session_id)
+            token_data = session.token_data
+
+    Args:
+        session_id (str): The session ID from the "session_id" store.
+
+    Returns:
+        ServerSession: The session view (objects are loaded on access).
+    """
+    return ServerSession(session_id)
+
+
+def delete_session(session_id):
+    """
+    Removes a session from Redis.
+
+    Args:
+        session_id (str): The session ID.
+    """
+    if session_id:
+        get_redis_connection().delete(_session_key(session_id))
@@ -0,0 +1,81 @@
+import importlib
+import json
+
+import pytest
+
+from bfabric_web_apps.objects.BfabricInterface import BfabricInterface
+
+interface_module = importlib.import_module("bfabric_web_apps.objects.BfabricInterface")
+
+
+class FakeWrapper:
+    def __init__(self, applications):
+        self.applications = applications
+        self.calls = []
+
+    def read(self, endpoint, obj, max_results=None):
+        self.calls.append(obj)
+        ids = obj["id"] if isinstance(obj["id"], list) else [obj["id"]]
+        return [self.applications[app_id] for app_id in ids if app_id in self.applications]
+
+
+class FakeLogger:
+    def logthis(self, api_call, endpoint, obj, max_results=None, params=None, flush_logs=True):
+        return api_call(endpoint, obj, max_results=max_results)
+
+    def log_operation(self, operation, message, params=None, flush_logs=True):
+        pass
+
+
+APPLICATIONS = {7: {"id": 7, "name": "App", "description": "An app"}}
+
+
+@pytest.fixture
+def wrapper(monkeypatch):
+    wrapper = FakeWrapper(dict(APPLICATIONS))
+    monkeypatch.setattr(interface_module, "get_logger", lambda token_data: FakeLogger())
+    monkeypatch.setattr(interface_module, "get_power_user_wrapper", lambda token_data: wrapper)
+    monkeypatch.setattr(BfabricInterface, "get_wrapper", lambda self, token_data: wrapper)
+    BfabricInterface._app_data_cache.clear()
+    yield wrapper
+    BfabricInterface._app_data_cache.clear()
+
+
+def token_data(app_id=7, environment="Test"):
+    return {"application_data": str(app_id), "environment": environment}
+
+
+def test_application_is_read_once_per_environment(wrapper):
+    interface = BfabricInterface()
+
+    first = json.loads(interface.app_data(token_data()))
+    assert first == {"id": 7, "name": "App", "description": "An app"}
+    assert interface.app_data(token_data(environment=" test ")) == json.dumps(first)
+    assert len(wrapper.calls) == 1
+
+    interface.app_data(token_data(environment="Production"))
+    assert len(wrapper.calls) == 2
+
+
+def test_failed_lookups_are_not_cached(wrapper):
+    interface = BfabricInterface()
+
+    assert interface.app_data(token_data(app_id=8)) == json.dumps({})
+    wrapper.applications[8] = {"id": 8, "name": "New app"}
+
+    assert json.loads(interface.app_data(token_data(app_id=8)))["name"] == "New app"
+
+
+def test_warm_up_and_invalidation(wrapper):
+    interface = BfabricInterface()
+    wrapper.applications[8] = {"id": 8, "name": "Other app"}
+
+    assert interface.warm_app_data([7, 8], environment="Test") == 2
+    wrapper.calls.clear()
+    assert json.loads(interface.app_data(token_data(app_id=8)))["name"] == "Other app"
+    assert wrapper.calls == []
+
+    interface.invalidate_app_data("Test", 8)
+    interface.app_data(token_data(app_id=8))
+    interface.app_data(token_data(app_id=7))
+    assert wrapper.calls == [{"id": 8}]
@@ -0,0 +1,156 @@
+import os
+import stat
+
+import pytest
+
+from bfabric_web_apps.utils import run_main_pipeline
+from bfabric_web_apps.utils.config import settings
+
+
+# Local stand-ins for the transfer commands: the "remote" server is the local file system
+STAND_INS = {
+    "scp": """#!/bin/sh
+# scp -i KEY SOURCE... USER:DESTINATION/
+shift 2
+for last; do :; done
+destination="${last#*:}"
+while [ $# -gt 1 ]; do cp -L "$1" "$destination" || exit 1; shift; done
+""",
+    "ssh": """#!/bin/sh
+# ssh -i KEY USER COMMAND
+shift 3
+exec sh -c "$1"
+""",
+    "g-req": """#!/bin/sh
+# g-req copynow -f SOURCE DESTINATION, fails for files named *fail*, never delivers files named *lost*
+case "$(basename "$3")" in *fail*) exit 1;; *lost*) exit 0;; esac
+mkdir -p "$4" && mv "$3" "$4"
+""",
+}
+
+
+@pytest.fixture
+def remote(tmp_path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    for name, script in STAND_INS.items():
+        path = bin_dir / name
+        path.write_text(script)
+        path.chmod(path.stat().st_mode | stat.S_IEXEC)
+
+    monkeypatch.setattr(settings, "SCP_COMMAND", str(bin_dir / "scp"))
+    monkeypatch.setattr(settings, "SSH_COMMAND", str(bin_dir / "ssh"))
+    monkeypatch.setattr(settings, "G_REQ_COMMAND", str(bin_dir / "g-req"))
+    monkeypatch.setattr(settings, "GSTORE_TRANSFER_TIMEOUT", 0.5)
+    monkeypatch.setattr(settings, "GSTORE_TRANSFER_POLL_INTERVAL", 0.1)
+    monkeypatch.setattr(settings, "GSTORE_ARRIVAL_CHECK", "ssh")
+    monkeypatch.setattr(settings, "GSTORE_TRANSFER_DELAY", 0)
+
+    scratch = tmp_path / "scratch"
+    scratch.mkdir()
+    sources = tmp_path / "sources"
+    sources.mkdir()
+    return {"scratch": str(scratch), "gstore": str(tmp_path / "gstore"), "sources": sources}
+
+
+def make_source(remote, name):
+    path = remote["sources"] / name
+    path.write_text(name)
+    return str(path)
+
+
+def test_batch_transfer_moves_all_files(remote):
+    attachments = {make_source(remote, "a.txt"): "report.txt", make_source(remote, "b.log"): "run.log"}
+    final = remote["gstore"] + "/Container_1/"
+
+    errors = run_main_pipeline.transfer_attachments_batch(attachments, "user@host", "key", remote["scratch"], final)
+
+    assert errors == {}
+    assert sorted(os.listdir(final)) == ["report.txt", "run.log"]
+
+
+def test_batch_transfer_reports_failures_per_file(remote):
+    good = make_source(remote, "a.txt")
+    bad = make_source(remote, "b.txt")
+    final = remote["gstore"] + "/Container_1/"
+
+    errors = run_main_pipeline.transfer_attachments_batch({good: "report.txt", bad: "fail.txt"}, "user@host", "key", remote["scratch"], final)
+
+    assert list(errors) == [bad]
+    assert os.listdir(final) == ["report.txt"]
+
+
+def test_lost_files_are_reported_when_gstore_is_visible(remote, monkeypatch):
+    os.makedirs(remote["gstore"])
+    monkeypatch.setattr(settings, "GSTORE_ARRIVAL_CHECK", "auto")
+    monkeypatch.setattr(run_main_pipeline, "GSTORE_REMOTE_PATH", remote["gstore"])
+    lost = make_source(remote, "b.txt")
+
+    errors = run_main_pipeline.transfer_attachments_batch({make_source(remote, "a.txt"): "report.txt", lost: "lost.txt"},
+                                                          "user@host", "key", remote["scratch"], remote["gstore"] + "/Container_1/")
+
+    assert list(errors) == [lost]
+    assert "did not arrive" in errors[lost]
+
+
+def test_arrival_is_not_polled_when_gstore_is_not_visible(remote, monkeypatch):
+    monkeypatch.setattr(settings, "GSTORE_ARRIVAL_CHECK", "auto")
+    monkeypatch.setattr(settings, "GSTORE_TRANSFER_TIMEOUT", 30)
+    monkeypatch.setattr(run_main_pipeline, "GSTORE_REMOTE_PATH", remote["gstore"] + "/not-mounted")
+
+    # g-req reports success, but the file lands where the transfer host cannot see it
+    errors = run_main_pipeline.transfer_attachments_batch({make_source(remote, "a.txt"): "lost.txt"},
+                                                          "user@host", "key", remote["scratch"], remote["gstore"] + "/Container_1/")
+
+    assert errors == {}
+
+
+def test_batch_transfer_rejects_duplicate_names(remote):
+    attachments = {make_source(remote, "a.txt"): "same.txt", make_source(remote, "b.txt"): "same.txt"}
+
+    with pytest.raises(ValueError):
+        run_main_pipeline.transfer_attachments_batch(attachments, "user@host", "key", remote["scratch"], remote["gstore"])
+
+
+def test_ssh_move_quotes_paths(remote):
+    source = make_source(remote, "with space.txt")
+    tmp_path = os.path.join(remote["scratch"], "with space.txt")
+    os.rename(source, tmp_path)
+    final = remote["gstore"] + "/Container 1/"
+
+    run_main_pipeline.ssh_move("user@host", "key", tmp_path, final)
+
+    assert os.listdir(final) == ["with space.txt"]
+
+
+class RecordingLogger:
+    def __init__(self):
+        self.messages = []
+
+    def log_operation(self, operation, message, params=None, flush_logs=True):
+        self.messages.append((operation, message))
+
+
+def test_attach_links_only_the_files_that_arrived(remote, monkeypatch):
+    linked = []
+    monkeypatch.setattr(run_main_pipeline, "GSTORE_REMOTE_PATH", remote["gstore"] + "/missing")
+    monkeypatch.setattr(run_main_pipeline, "SCRATCH_PATH", remote["scratch"])
+    monkeypatch.setattr(settings, "GSTORE_BATCH_TRANSFER", True)
+    monkeypatch.setattr(run_main_pipeline, "create_attachment_link",
+                        lambda token_data, logger, entity_class, entity_id, file_name, folder: linked.append(file_name) or True)
+
+    logger = RecordingLogger()
+    attachments = {
+        make_source(remote, "a.txt"): "report.txt",
+        make_source(remote, "b.txt"): "fail.txt",
+        make_source(remote, "c.txt"): "report.txt",
+    }
+    token_data = {"entityClass_data": "Container", "entity_id_data": 1}
+
+    with pytest.raises(RuntimeError, match="2 of 3"):
+        run_main_pipeline.attach_gstore_files_to_entities_as_link(token_data, logger, attachments)
+
+    assert linked == ["report.txt"]
+    errors = [message for operation, message in logger.messages if operation.startswith("Error")]
+    assert any("Duplicate attachment name 'report.txt'" in message for message in errors)
+    assert any("'fail.txt'" in message for message in errors)
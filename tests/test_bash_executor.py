@@ -0,0 +1,78 @@
+import os
+import tempfile
+
+from bfabric_web_apps.utils import run_main_pipeline
+from bfabric_web_apps.utils.bash_executor import normalize_command_groups, run_bash_commands, prune_bash_logs
+from bfabric_web_apps.utils.config import settings
+
+
+def test_normalize_command_groups():
+    groups = normalize_command_groups([
+        "prepare.sh",
+        ["align A", {"cmd": "align B", "timeout": 10}],
+        [],
+        {"cmd": "merge.sh"},
+    ])
+
+    assert groups == [
+        [{"cmd": "prepare.sh", "timeout": None}],
+        [{"cmd": "align A", "timeout": None}, {"cmd": "align B", "timeout": 10}],
+        [{"cmd": "merge.sh", "timeout": None}],
+    ]
+
+
+def test_run_bash_commands_statuses_and_order(tmp_path):
+    results, log_path = run_bash_commands(
+        ["echo first", ["exit 3", {"cmd": "sleep 5", "timeout": 0.2}]],
+        log_path=str(tmp_path / "bash.log"),
+    )
+
+    assert [result["status"] for result in results] == ["SUCCESS", "FAILURE", "TIMEOUT"]
+    assert results[0]["stdout"] == "first"
+    assert results[1]["returncode"] == 3
+    assert "first" in open(log_path).read()
+
+
+def test_output_is_truncated_to_the_buffer(tmp_path):
+    results, _ = run_bash_commands(["seq 1 10"], log_path=str(tmp_path / "bash.log"), buffer_lines=3)
+
+    assert results[0]["stdout"] == "8\n9\n10"
+    assert results[0]["truncated"] is True
+
+
+def test_log_is_deleted_unless_output_was_truncated(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "BASH_LOG_DIR", str(tmp_path))
+
+    run_main_pipeline.execute_and_log_bash_commands(["echo done"])
+    assert os.listdir(tmp_path) == []
+
+    monkeypatch.setattr(settings, "BASH_OUTPUT_BUFFER_LINES", 2)
+    run_main_pipeline.execute_and_log_bash_commands(["seq 1 10"])
+    assert len(os.listdir(tmp_path)) == 1
+
+
+def test_prune_bash_logs_keeps_the_newest(tmp_path):
+    for i in range(5):
+        path = tmp_path / f"bash_{i}_20240101_00000{i}.log"
+        path.write_text("")
+        os.utime(path, (i, i))
+    (tmp_path / "other.log").write_text("")
+    (tmp_path / "bash_completion.log").write_text("")
+    os.utime(tmp_path / "bash_completion.log", (0, 0))
+
+    prune_bash_logs(str(tmp_path), keep=2)
+
+    assert sorted(os.listdir(tmp_path)) == ["bash_3_20240101_000003.log", "bash_4_20240101_000004.log",
+                                            "bash_completion.log", "other.log"]
+
+
+def test_logs_default_to_a_dedicated_directory(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "BASH_LOG_DIR", None)
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    (tmp_path / "bash_1_20240101_000000.log").write_text("")
+    monkeypatch.setattr(settings, "BASH_LOG_KEEP", 1)
+
+    _, log_path = run_bash_commands(["echo done"])
+
+    assert os.path.dirname(log_path) == str(tmp_path / "bfabric_web_apps_bash")
+    assert (tmp_path / "bash_1_20240101_000000.log").exists()
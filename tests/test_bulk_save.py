@@ -0,0 +1,129 @@
+from datetime import datetime
+
+import pytest
+from bfabric.errors import BfabricRequestError
+
+from bfabric_web_apps.utils import resource_utilities, run_main_pipeline
+from bfabric_web_apps.utils.resource_utilities import save_in_chunks, find_saved_resources, find_saved_workunits
+
+
+class Store:
+    """Stands in for a B-Fabric endpoint, failing the first multi-object save with `error`."""
+
+    def __init__(self, error=None, store_before_error=False, stored=()):
+        self.error = error
+        self.store_before_error = store_before_error
+        self.objects = list(stored)
+        self.saves = []
+
+    def save(self, endpoint, obj):
+        objs = obj if isinstance(obj, list) else [obj]
+        self.saves.append(len(objs))
+        if any(o.get("name") == "invalid" for o in objs):
+            raise BfabricRequestError("invalid name")
+        error, self.error = self.error, None
+        if error is not None and not self.store_before_error:
+            raise error
+        saved = [dict(o, id=len(self.objects) + i + 1) for i, o in enumerate(objs)]
+        self.objects.extend(saved)
+        if error is not None:
+            raise error
+        return saved
+
+    def read(self, endpoint, query, max_results=None):
+        return [
+            {"id": o["id"], "workunit": {"id": o["workunitid"]}, "relativepath": o["relativepath"]}
+            for o in self.objects
+            if o["workunitid"] in query["workunitid"] and o["relativepath"] in query["relativepath"]
+        ]
+
+
+def resources(*names):
+    return [{"workunitid": "7", "name": name, "relativepath": f"/data/{name}"} for name in names]
+
+
+def test_rejected_chunk_is_saved_one_by_one():
+    store = Store()
+
+    results = save_in_chunks(store, "resource", resources("a", "invalid", "b"), chunk_size=3)
+
+    assert [error is None for _, error in results] == [True, False, True]
+    assert store.saves == [3, 1, 1, 1]
+
+
+def test_unknown_outcome_is_looked_up_instead_of_saved_twice():
+    store = Store(error=TimeoutError("read timed out"), store_before_error=True)
+
+    results = save_in_chunks(store, "resource", resources("a", "b"), lookup=find_saved_resources)
+
+    assert [resource["relativepath"] for resource, _ in results] == ["/data/a", "/data/b"]
+    assert len(store.objects) == 2
+    assert store.saves == [2]
+
+
+def test_unknown_outcome_saves_the_objects_that_were_not_stored():
+    store = Store(error=ConnectionError("connection reset"))
+
+    results = save_in_chunks(store, "resource", resources("a", "b"), lookup=find_saved_resources)
+
+    assert all(error is None for _, error in results)
+    assert len(store.objects) == 2
+    assert store.saves == [2, 1, 1]
+
+
+def test_unknown_outcome_without_lookup_is_not_saved_again():
+    store = Store(error=TimeoutError("read timed out"), store_before_error=True)
+
+    results = save_in_chunks(store, "resource", resources("a", "b"))
+
+    assert all(resource is None and "may have been stored" in error for resource, error in results)
+    assert store.saves == [2]
+
+
+def test_workunit_lookup_refuses_ambiguous_matches():
+    class Workunits:
+        def read(self, endpoint, query, max_results=None):
+            assert "createdafter" in query
+            workunit = {"container": {"id": 1}, "application": {"id": 3}, "name": "Workunit 1"}
+            return [dict(workunit, id=10), dict(workunit, id=11)] if query["containerid"] == [1] else [dict(workunit, id=10, container={"id": 2})]
+
+    lookup = find_saved_workunits(datetime.now())
+    workunit = {"containerid": 2, "applicationid": 3, "name": "Workunit 1"}
+
+    assert lookup(Workunits(), [workunit]) == [{"container": {"id": 2}, "application": {"id": 3}, "name": "Workunit 1", "id": 10}]
+    with pytest.raises(ValueError):
+        lookup(Workunits(), [dict(workunit, containerid=1)])
+
+
+def test_workunits_that_cannot_be_linked_fail_the_step(monkeypatch, tmp_path):
+    class Wrapper:
+        def save(self, endpoint, obj):
+            if endpoint == "job":
+                raise ConnectionError("job update lost")
+            return [dict(o, id=i, container={"id": o["containerid"]}) for i, o in enumerate(obj if isinstance(obj, list) else [obj])]
+
+        def read(self, endpoint, query, max_results=None):
+            return [{"workunit": []}]
+
+    class Logger:
+        power_user_wrapper = Wrapper()
+
+        def log_operation(self, operation, message, params=None, flush_logs=True):
+            pass
+
+        def flush_logs(self, wait=False):
+            pass
+
+    monkeypatch.setattr(resource_utilities, "get_logger", lambda token_data: Logger())
+    monkeypatch.setattr(resource_utilities.bfabric_interface, "get_wrapper", lambda token_data: Wrapper())
+
+    report = resource_utilities.create_workunits_batch({"jobId": 1}, "App", "Description", 3, [1, 2])
+
+    assert len(report["created"]) == 2
+    assert "job update lost" in report["link_error"]
+    assert resource_utilities.create_workunits({"jobId": 1}, "App", "Description", 3, [1, 2], batch=True) == []
+
+    (tmp_path / "a.txt").write_text("a")
+    manifest = run_main_pipeline.scan_resource_paths({str(tmp_path / "a.txt"): "1"}, Logger())
+    with pytest.raises(RuntimeError, match="job update lost"):
+        run_main_pipeline.create_workunits_step({"jobId": 1}, {"id": 3}, manifest, Logger())
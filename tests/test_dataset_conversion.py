@@ -0,0 +1,85 @@
+import pytest
+
+from bfabric_web_apps.utils.dataset_utils import (
+    dataset_to_dataframe,
+    dataset_to_arrow,
+    dataframe_to_dataset,
+    dataset_to_dictionary,
+)
+
+pl = pytest.importorskip("polars")
+
+
+def make_dataset(rows, names=("Sample", "Lane")):
+    """B-Fabric dataset response with the given rows; a None value leaves its field out."""
+    return {
+        "attribute": [{"name": name, "position": str(i + 1)} for i, name in enumerate(names)],
+        "item": [
+            {
+                "field": [{"attributeposition": str(j + 1), "value": value} for j, value in enumerate(row) if value is not None],
+                "position": str(position),
+            }
+            for position, row in rows
+        ],
+    }
+
+
+def test_round_trip_keeps_columns_and_rows():
+    dataset = make_dataset([(1, ("a", "1")), (2, ("b", "2"))])
+
+    df = dataset_to_dataframe(dataset)
+    assert df.columns == ["Sample", "Lane"]
+    assert df.to_dict(as_series=False) == {"Sample": ["a", "b"], "Lane": ["1", "2"]}
+
+    result = dataframe_to_dataset(df, "samples", 1, linked_workunit_id=7)
+    assert dataset_to_dictionary(result) == dataset_to_dictionary(dataset)
+    assert result["name"] == "samples"
+    assert result["workunitid"] == 7
+
+
+def test_rows_are_ordered_by_item_position():
+    dataset = make_dataset([(3, ("c", "3")), (1, ("a", "1")), (2, ("b", "2"))])
+
+    assert dataset_to_dataframe(dataset)["Sample"].to_list() == ["a", "b", "c"]
+
+
+def test_attributes_are_ordered_by_position():
+    dataset = make_dataset([(1, ("a", "1"))])
+    dataset["attribute"].reverse()
+
+    assert dataset_to_dataframe(dataset).columns == ["Sample", "Lane"]
+
+
+def test_missing_fields_become_null():
+    dataset = make_dataset([(1, ("a", None)), (2, (None, "2"))])
+
+    df = dataset_to_dataframe(dataset)
+    assert df.to_dict(as_series=False) == {"Sample": ["a", None], "Lane": [None, "2"]}
+
+    fields = [item["field"] for item in dataframe_to_dataset(df, "samples", 1)["item"]]
+    assert [[field["value"] for field in row] for row in fields] == [["a", None], [None, "2"]]
+
+
+def test_values_are_sent_as_strings():
+    result = dataframe_to_dataset({"Sample": ["a", "b"], "Lane": [1, 2]}, "samples", 1)
+
+    assert dataset_to_dictionary(result) == {"Sample": ["a", "b"], "Lane": ["1", "2"]}
+
+
+def test_columns_of_unequal_length_are_rejected():
+    with pytest.raises(ValueError, match="same length"):
+        dataframe_to_dataset({"Sample": ["a", "b"], "Lane": ["1"]}, "samples", 1)
+
+
+def test_empty_inputs():
+    assert dataset_to_dataframe({}).width == 0
+    assert dataframe_to_dataset(pl.DataFrame(), "samples", 1) == {}
+
+
+def test_arrow_round_trip():
+    pytest.importorskip("pyarrow")
+    dataset = make_dataset([(2, ("b", "2")), (1, ("a", None))])
+
+    table = dataset_to_arrow(dataset)
+    assert table.to_pydict() == {"Sample": ["a", "b"], "Lane": [None, "2"]}
+    assert dataset_to_dictionary(dataframe_to_dataset(table, "samples", 1)) == {"Sample": ["a", "b"], "Lane": [None, "2"]}
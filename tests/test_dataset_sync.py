@@ -0,0 +1,142 @@
+import pytest
+
+from bfabric_web_apps.utils import run_main_pipeline
+from bfabric_web_apps.utils.dataset_utils import dictionary_to_dataset, diff_dataset, dataset_patch
+
+
+def existing_dataset(dictionary, workunit_id=5):
+    dataset = dictionary_to_dataset(dictionary, "Dataset", 1)
+    dataset.update(id=42, workunit={"id": workunit_id})
+    return dataset
+
+
+BASE = {"Sample": ["A", "B", "C"], "Read 1": ["a.fq", "b.fq", "c.fq"]}
+
+
+def test_unchanged_dataset_needs_no_update():
+    diff = diff_dataset(existing_dataset(BASE), {"Sample": ["A", "B", "C"], "Read 1": ["a.fq", "b.fq", "c.fq"]})
+
+    assert not diff["changed"]
+    assert dataset_patch(existing_dataset(BASE), BASE, diff, linked_workunit_id=5) == {}
+
+
+def test_rows_are_matched_on_the_key_column():
+    new = {"Sample": ["A", "X", "B", "C"], "Read 1": ["a.fq", "x.fq", "b2.fq", "c.fq"]}
+
+    diff = diff_dataset(existing_dataset(BASE), new)
+
+    # Inserting X does not mark B and C as changed, only B's new value does
+    assert diff["key_column"] == "Sample"
+    assert diff["added_rows"] == 1
+    assert diff["removed_rows"] == 0
+    assert diff["changed_rows"] == [3]
+    assert diff["changed_cells"] == 1
+    assert not diff["reordered"]
+
+
+def test_removed_reordered_and_duplicate_keys():
+    dataset = existing_dataset({"Sample": ["A", "A", "B"], "Read 1": ["1", "2", "3"]})
+
+    diff = diff_dataset(dataset, {"Sample": ["B", "A"], "Read 1": ["3", "1"]})
+
+    assert diff["removed_rows"] == 1
+    assert diff["changed_rows"] == []
+    assert diff["reordered"]
+    assert diff["changed"]
+
+
+def test_explicit_key_column_and_unknown_key():
+    diff = diff_dataset(existing_dataset(BASE), {"Sample": ["A", "B", "C"], "Read 1": ["c.fq", "b.fq", "a.fq"]}, key_column="Read 1")
+
+    assert diff["changed_rows"] == [1, 3]
+    with pytest.raises(ValueError):
+        diff_dataset(existing_dataset(BASE), BASE, key_column="Missing")
+
+
+def test_patch_sends_the_complete_items_when_changed():
+    new = {"Sample": ["A", "B", "C"], "Read 1": ["a.fq", "b2.fq", "c.fq"]}
+
+    patch = dataset_patch(existing_dataset(BASE), new, linked_workunit_id=5)
+
+    assert patch["id"] == 42
+    assert [item["position"] for item in patch["item"]] == ["1", "2", "3"]
+    assert patch["item"][1]["field"] == [{"attributeposition": "1", "value": "B"}, {"attributeposition": "2", "value": "b2.fq"}]
+    assert patch["attribute"] == [{"name": "Sample", "position": "1"}, {"name": "Read 1", "position": "2"}]
+    assert "workunitid" not in patch
+
+
+def test_unchanged_dataset_is_only_relinked():
+    assert dataset_patch(existing_dataset(BASE), BASE, linked_workunit_id=6) == {"id": 42, "workunitid": 6}
+
+
+def test_find_dataset_is_scoped_to_the_workunit(monkeypatch):
+    queries = []
+
+    class Wrapper:
+        def read(self, endpoint, query, max_results=None):
+            queries.append(query)
+            return [{"id": 3}, {"id": 9}]
+
+    monkeypatch.setattr(run_main_pipeline, "get_power_user_wrapper", lambda token_data: Wrapper())
+
+    assert run_main_pipeline.find_dataset({}, 1, None) is None
+    assert run_main_pipeline.find_dataset({}, 1, 5) == {"id": 9}
+    assert queries == [{"workunitid": 5, "containerid": 1}]
+
+
+class DatasetStore:
+    """Stands in for the B-Fabric dataset endpoint."""
+
+    def __init__(self):
+        self.datasets = {}
+        self.saves = []
+
+    def read(self, endpoint, query, max_results=None):
+        if "id" in query:
+            return [self.datasets[query["id"]]] if query["id"] in self.datasets else []
+        return [dataset for dataset in self.datasets.values()
+                if dataset["workunit"]["id"] == query["workunitid"] and dataset["container"]["id"] == query["containerid"]]
+
+    def save(self, endpoint, obj):
+        self.saves.append(obj)
+        dataset_id = obj.get("id") or len(self.datasets) + 1
+        dataset = self.datasets.setdefault(dataset_id, {"id": dataset_id, "container": {"id": obj.get("containerid")}})
+        dataset.update({key: value for key, value in obj.items() if key in ("attribute", "item", "name")})
+        if "workunitid" in obj:
+            dataset["workunit"] = {"id": obj["workunitid"]}
+        return [dataset]
+
+
+class RecordingLogger:
+    def log_operation(self, operation, message, params=None, flush_logs=True):
+        pass
+
+
+def test_second_run_updates_the_previous_dataset(monkeypatch):
+    store = DatasetStore()
+    monkeypatch.setattr(run_main_pipeline, "get_power_user_wrapper", lambda token_data: store)
+
+    def run(dictionary, workunit_id, previous_dataset_id=None):
+        return run_main_pipeline.sync_dataset({}, dictionary, "Dataset", 1, 0, workunit_id, RecordingLogger(),
+                                              previous_dataset_id=previous_dataset_id)
+
+    first = run(BASE, 5)
+    # A new run has a new workunit, only the previous dataset ID leads back to the dataset
+    unchanged = run(BASE, 6, previous_dataset_id=first)
+    changed = run({"Sample": ["A", "B", "C"], "Read 1": ["a.fq", "b2.fq", "c.fq"]}, 7, previous_dataset_id=first)
+
+    assert first == unchanged == changed
+    assert len(store.datasets) == 1
+    assert store.saves[1] == {"id": first, "workunitid": 6}
+    assert store.saves[2]["workunitid"] == 7
+    assert store.datasets[first]["item"][1]["field"][1]["value"] == "b2.fq"
+
+
+def test_previous_dataset_of_another_container_is_rejected(monkeypatch):
+    store = DatasetStore()
+    monkeypatch.setattr(run_main_pipeline, "get_power_user_wrapper", lambda token_data: store)
+    store.save("dataset", dictionary_to_dataset(BASE, "Dataset", 2))
+
+    with pytest.raises(ValueError):
+        run_main_pipeline.sync_dataset({}, BASE, "Dataset", 1, 0, 5, RecordingLogger(), previous_dataset_id=1)
+    assert len(store.saves) == 1
@@ -0,0 +1,95 @@
+import pytest
+
+from bfabric_web_apps.objects.BfabricInterface import BfabricInterface
+from bfabric_web_apps.utils.config import settings
+
+
+class FakeWrapper:
+    def __init__(self, entity, changed=(), error=None):
+        self.entity = entity
+        self.changed = list(changed)
+        self.error = error
+        self.calls = []
+
+    def read(self, endpoint, obj, max_results=None):
+        self.calls.append(obj)
+        if "modifiedafter" in obj:
+            if self.error:
+                raise self.error
+            return self.changed
+        return [self.entity]
+
+
+class FakeLogger:
+    def logthis(self, api_call, endpoint, obj, max_results=None, params=None, flush_logs=True):
+        return api_call(endpoint, obj, max_results=max_results)
+
+
+HANDLE = {"environment": "test", "endpoint": "container", "id": 1}
+
+
+@pytest.fixture
+def interface(monkeypatch):
+    interface = BfabricInterface()
+    interface._entity_cache.clear()
+    monkeypatch.setattr(settings, "ENTITY_CACHE_REVALIDATE_AFTER", 0)
+    yield interface
+    interface._entity_cache.clear()
+
+
+def test_unchanged_entity_is_revalidated_with_one_read(interface):
+    wrapper = FakeWrapper({"id": 1, "modified": "2024-01-01"})
+    interface._read_entity(wrapper, FakeLogger(), HANDLE)
+    wrapper.calls.clear()
+
+    assert interface._read_entity(wrapper, FakeLogger(), HANDLE)["modified"] == "2024-01-01"
+    assert wrapper.calls == [{"id": 1, "modifiedafter": "2024-01-01"}]
+
+
+def test_changed_entity_is_read_again(interface):
+    wrapper = FakeWrapper({"id": 1, "modified": "2024-01-01"})
+    interface._read_entity(wrapper, FakeLogger(), HANDLE)
+    wrapper.entity = {"id": 1, "modified": "2024-02-01"}
+    wrapper.changed = [wrapper.entity]
+
+    assert interface._read_entity(wrapper, FakeLogger(), HANDLE)["modified"] == "2024-02-01"
+
+
+def test_revalidation_errors_propagate(interface):
+    wrapper = FakeWrapper({"id": 1, "modified": "2024-01-01"})
+    interface._read_entity(wrapper, FakeLogger(), HANDLE)
+    wrapper.error = RuntimeError("B-Fabric unavailable")
+    wrapper.calls.clear()
+
+    with pytest.raises(RuntimeError):
+        interface._read_entity(wrapper, FakeLogger(), HANDLE)
+    assert len(wrapper.calls) == 1
+
+
+def test_entity_is_not_revalidated_within_the_window(interface, monkeypatch):
+    monkeypatch.setattr(settings, "ENTITY_CACHE_REVALIDATE_AFTER", 60)
+    wrapper = FakeWrapper({"id": 1, "modified": "2024-01-01"})
+    interface._read_entity(wrapper, FakeLogger(), HANDLE)
+    wrapper.calls.clear()
+
+    interface._read_entity(wrapper, FakeLogger(), HANDLE)
+    assert wrapper.calls == []
+
+
+def test_entity_without_modification_date_is_read_again(interface):
+    wrapper = FakeWrapper({"id": 1})
+    interface._read_entity(wrapper, FakeLogger(), HANDLE)
+    wrapper.calls.clear()
+
+    interface._read_entity(wrapper, FakeLogger(), HANDLE)
+    assert wrapper.calls == [{"id": 1}]
+
+
+def test_full_response_comes_from_the_cache(interface):
+    wrapper = FakeWrapper({"id": 1, "modified": "2024-01-01", "name": "Order 1"})
+    interface._read_entity(wrapper, FakeLogger(), HANDLE)
+
+    assert interface.entity_full_response({"entity_handle": HANDLE})["name"] == "Order 1"
+
+    interface.invalidate_entity("Test", "container", 1)
+    assert interface.entity_full_response({"entity_handle": HANDLE}) == {}
@@ -0,0 +1,140 @@
+import os
+
+import pytest
+
+from bfabric_web_apps.objects.FileManifest import FileManifest
+from bfabric_web_apps.utils import resource_utilities, run_main_pipeline
+
+
+@pytest.fixture
+def tree(tmp_path):
+    (tmp_path / "run" / "fastq").mkdir(parents=True)
+    (tmp_path / "run" / "work").mkdir()
+    (tmp_path / "run" / "fastq" / "a.fastq.gz").write_text("a")
+    (tmp_path / "run" / "fastq" / "b.fastq.gz").write_text("b")
+    (tmp_path / "run" / "work" / "tmp.txt").write_text("t")
+    (tmp_path / "run" / "report.html").write_text("r")
+    (tmp_path / "other").mkdir()
+    (tmp_path / "other" / "linked.txt").write_text("l")
+    (tmp_path / "run" / "link.txt").symlink_to(tmp_path / "other" / "linked.txt")
+    (tmp_path / "run" / "linkdir").symlink_to(tmp_path / "other")
+    (tmp_path / "single.txt").write_text("s")
+    return tmp_path
+
+
+def relative(manifest, root):
+    return sorted(os.path.relpath(path, root) for path, _ in manifest)
+
+
+def deny_scandir(monkeypatch, denied):
+    real_scandir = os.scandir
+
+    def scandir(path):
+        if str(path) == str(denied):
+            raise PermissionError(13, "Permission denied", str(path))
+        return real_scandir(path)
+
+    monkeypatch.setattr(os, "scandir", scandir)
+
+
+def test_scan_lists_files_with_their_tags(tree):
+    manifest = FileManifest.scan({str(tree / "run"): 1, str(tree / "single.txt"): 2, str(tree / "gone"): 3})
+
+    assert relative(manifest, tree) == [
+        "run/fastq/a.fastq.gz", "run/fastq/b.fastq.gz", "run/link.txt", "run/report.html", "run/work/tmp.txt", "single.txt",
+    ]
+    assert manifest.counts() == {1: 5, 2: 1, 3: 0}
+    assert manifest.missing == [str(tree / "gone")]
+    assert manifest.errors == []
+
+
+def test_include_and_exclude_globs(tree):
+    manifest = FileManifest.scan({str(tree / "run"): 1}, include=["*.gz", "report.*"], exclude=["work", "fastq/b*"])
+
+    assert relative(manifest, tree) == ["run/fastq/a.fastq.gz", "run/report.html"]
+
+
+@pytest.mark.parametrize("policy, expected", [
+    ("skip", []),
+    ("files", ["run/link.txt"]),
+    ("follow", ["run/link.txt", "run/linkdir/linked.txt"]),
+])
+def test_symlink_policies(tree, policy, expected):
+    manifest = FileManifest.scan({str(tree / "run"): 1}, include=["*link*"], symlinks=policy)
+
+    assert relative(manifest, tree) == expected
+
+
+def test_unknown_symlink_policy(tree):
+    with pytest.raises(ValueError):
+        FileManifest.scan({str(tree): 1}, symlinks="sometimes")
+
+
+@pytest.mark.skipif(os.geteuid() == 0, reason="root can read any directory")
+def test_unreadable_directories_are_recorded(tree):
+    locked = tree / "run" / "work"
+    locked.chmod(0)
+    try:
+        manifest = FileManifest.scan({str(tree / "run"): 1})
+    finally:
+        locked.chmod(0o755)
+
+    assert [path for path, _ in manifest.errors] == [str(locked)]
+    assert "run/work/tmp.txt" not in relative(manifest, tree)
+
+
+def test_scan_errors_are_recorded(tree, monkeypatch):
+    deny_scandir(monkeypatch, tree / "run" / "work")
+    manifest = FileManifest.scan({str(tree / "run"): 1})
+
+    assert [path for path, _ in manifest.errors] == [str(tree / "run" / "work")]
+    assert "run/work/tmp.txt" not in relative(manifest, tree)
+
+
+def test_join_yields_the_files_of_tags_with_a_value(tree):
+    manifest = FileManifest.scan({str(tree / "run" / "fastq"): 1, str(tree / "single.txt"): 2})
+
+    pairs = manifest.join({1: 101})
+
+    assert not isinstance(pairs, dict)
+    assert sorted((os.path.basename(path), value) for path, value in pairs) == [("a.fastq.gz", 101), ("b.fastq.gz", 101)]
+
+
+def test_register_resources_consumes_an_iterator_in_chunks(monkeypatch):
+    saved_chunks = []
+
+    def save_in_chunks(wrapper, endpoint, objs, chunk_size=None, lookup=None):
+        saved_chunks.append(len(objs))
+        return [(None, "invalid") if obj["name"] == "bad.txt" else ({"id": i}, None) for i, obj in enumerate(objs)]
+
+    monkeypatch.setattr(resource_utilities, "get_power_user_wrapper", lambda token_data: object())
+    monkeypatch.setattr(resource_utilities, "save_in_chunks", save_in_chunks)
+
+    files = ((f"/data/{name}", 7) for name in ["a.txt", "b.txt", "bad.txt", "c.txt", "d.txt"])
+    report = resource_utilities.register_resources({}, files, chunk_size=2, max_workers=1)
+
+    assert sorted(saved_chunks) == [1, 2, 2]
+    assert report["total"] == 5
+    assert report["per_workunit"] == {"7": 4}
+    assert report["failed"] == {"/data/bad.txt": "invalid"}
+
+
+def test_scan_resource_paths_logs_missing_paths_and_errors(tree, monkeypatch):
+    class RecordingLogger:
+        def __init__(self):
+            self.messages = []
+
+        def log_operation(self, operation, message, params=None, flush_logs=True):
+            self.messages.append((operation.split(" ")[0], message))
+
+        def flush_logs(self, wait=False):
+            pass
+
+    deny_scandir(monkeypatch, tree / "run" / "work")
+    logger = RecordingLogger()
+
+    manifest = run_main_pipeline.scan_resource_paths({str(tree / "run"): "1", str(tree / "gone"): "2"}, logger)
+
+    assert len(manifest) == 4
+    assert [level for level, _ in logger.messages] == ["Warning", "Error"]
+    assert str(tree / "run" / "work") in logger.messages[1][1]
@@ -0,0 +1,74 @@
+import os
+import stat
+
+import pytest
+
+from bfabric_web_apps.utils import file_staging
+from bfabric_web_apps.utils.config import settings
+
+
+@pytest.fixture(autouse=True)
+def staging_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "STAGING_PATH", str(tmp_path / "staging"))
+
+
+@pytest.fixture
+def umask():
+    previous = os.umask(0o022)
+    yield
+    os.umask(previous)
+
+
+def test_staged_file_round_trip(tmp_path):
+    reference = file_staging.stage_bytes(b"content")
+    assert file_staging.is_staged_reference(reference)
+
+    destination = tmp_path / "out.txt"
+    assert file_staging.write_staged_file(reference, str(destination)) == len(b"content")
+    assert destination.read_bytes() == b"content"
+
+
+@pytest.mark.parametrize("mask, expected", [(0o022, 0o644), (0o077, 0o600), (0o002, 0o664)])
+def test_written_file_gets_the_umask_default_mode(tmp_path, umask, mask, expected):
+    reference = file_staging.stage_bytes(b"content")
+    os.umask(mask)
+
+    destination = tmp_path / "out.txt"
+    file_staging.write_staged_file(reference, str(destination))
+
+    assert stat.S_IMODE(destination.stat().st_mode) == expected
+
+
+def test_checksum_mismatch_leaves_no_file(tmp_path):
+    reference = file_staging.stage_bytes(b"content")
+    staged = os.path.join(file_staging.get_staging_path(), reference["staged_sha256"])
+    with open(staged, "wb") as f:
+        f.write(b"tampered")
+
+    with pytest.raises(ValueError):
+        file_staging.write_staged_file(reference, str(tmp_path / "out.txt"))
+    assert os.listdir(tmp_path) == ["staging"]
+
+
+def test_staging_requires_a_configured_path(monkeypatch):
+    monkeypatch.setattr(settings, "STAGING_PATH", None)
+
+    with pytest.raises(RuntimeError, match="STAGING_PATH"):
+        file_staging.stage_bytes(b"content")
+
+
+def test_staging_periodically_removes_unused_files(monkeypatch):
+    monkeypatch.setattr(file_staging, "_last_cleanup", 0.0)
+    old = file_staging.stage_bytes(b"old")
+    old_path = os.path.join(file_staging.get_staging_path(), old["staged_sha256"])
+    os.utime(old_path, (0, 0))
+
+    # Within the interval of the last cleanup nothing is removed
+    file_staging.stage_bytes(b"new")
+    assert os.path.exists(old_path)
+
+    monkeypatch.setattr(settings, "STAGING_CLEANUP_INTERVAL", 0)
+    new = file_staging.stage_bytes(b"new")
+
+    assert not os.path.exists(old_path)
+    assert os.path.exists(os.path.join(file_staging.get_staging_path(), new["staged_sha256"]))
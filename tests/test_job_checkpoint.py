@@ -0,0 +1,101 @@
+import fakeredis
+import pytest
+
+from bfabric_web_apps.objects.JobCheckpoint import JobCheckpoint, run_step
+from bfabric_web_apps.utils import resource_utilities, run_main_pipeline
+from bfabric_web_apps.utils.config import settings
+
+
+class RecordingLogger:
+    def __init__(self):
+        self.messages = []
+
+    def log_operation(self, operation, message, params=None, flush_logs=True):
+        self.messages.append((operation, message))
+
+
+@pytest.fixture
+def connection():
+    return fakeredis.FakeRedis()
+
+
+def test_completed_steps_are_skipped_on_resume(connection):
+    calls = []
+    first = JobCheckpoint("job-1", connection=connection)
+    assert not first.resumed
+
+    assert run_step(first, "workunits", RecordingLogger(), lambda: calls.append(1) or {"a": 1}) == {"a": 1}
+
+    second = JobCheckpoint("job-1", connection=connection)
+    assert second.resumed
+    assert run_step(second, "workunits", RecordingLogger(), lambda: calls.append(2)) == {"a": 1}
+    assert calls == [1]
+
+
+def test_failed_steps_are_not_recorded(connection):
+    checkpoint = JobCheckpoint("job-1", connection=connection)
+
+    def partial_failure():
+        raise RuntimeError("1 of 2 files failed")
+
+    with pytest.raises(RuntimeError):
+        run_step(checkpoint, "save_files", RecordingLogger(), partial_failure)
+
+    assert not JobCheckpoint("job-1", connection=connection).done("save_files")
+
+
+def test_clear_removes_the_checkpoint(connection):
+    checkpoint = JobCheckpoint("job-1", connection=connection)
+    checkpoint.save("bash", "log")
+
+    checkpoint.clear()
+
+    assert not JobCheckpoint("job-1", connection=connection).resumed
+
+
+def test_save_files_raises_on_partial_failure(tmp_path):
+    good = tmp_path / "good.txt"
+    bad = tmp_path / "missing" / "bad.txt"
+    logger = RecordingLogger()
+
+    with pytest.raises(RuntimeError, match="1 of 2"):
+        run_main_pipeline.save_files_from_bytes({str(good): b"ok", str(bad): b"no"}, logger)
+
+    assert good.read_bytes() == b"ok"
+    assert any(str(bad) in message for operation, message in logger.messages if operation.startswith("Error"))
+
+
+def test_bash_raises_when_a_command_fails(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "BASH_LOG_DIR", str(tmp_path))
+
+    with pytest.raises(RuntimeError, match="1 of 2") as error:
+        run_main_pipeline.execute_and_log_bash_commands(["echo first", "exit 3"])
+
+    assert "first" in str(error.value)
+
+
+def test_resumed_registration_skips_recorded_files(connection, monkeypatch):
+    saved, failing = [], {"c.txt"}
+
+    def save_in_chunks(wrapper, endpoint, objs, chunk_size=None, lookup=None):
+        saved.extend(obj["name"] for obj in objs)
+        return [(None, "timeout") if obj["name"] in failing else ({"id": obj["name"]}, None) for obj in objs]
+
+    monkeypatch.setattr(resource_utilities, "get_power_user_wrapper", lambda token_data: object())
+    monkeypatch.setattr(resource_utilities, "save_in_chunks", save_in_chunks)
+    files = {f"/data/{name}": 7 for name in ["a.txt", "b.txt", "c.txt", "d.txt"]}
+
+    first = resource_utilities.register_resources({}, files, chunk_size=2, max_workers=1, checkpoint=JobCheckpoint("job-1", connection=connection))
+    assert first["failed"] == {"/data/c.txt": "timeout"}
+
+    failing.clear()
+    checkpoint = JobCheckpoint("job-1", connection=connection)
+    second = resource_utilities.register_resources({}, files, chunk_size=2, max_workers=1, checkpoint=checkpoint)
+
+    assert saved[4:] == ["c.txt"]
+    assert second["resumed"] == 3
+    assert second["failed"] == {}
+    assert second["per_workunit"] == {"7": 4}
+
+    checkpoint.clear()
+    assert checkpoint.recorded("resources", ["/data/a.txt"]) == [None]
@@ -0,0 +1,119 @@
+import json
+import time
+
+import fakeredis
+import pytest
+from redis.exceptions import ConnectionError
+from rq import Queue
+from rq.worker import SimpleWorker
+
+from bfabric_web_apps.objects.JobEventBroadcaster import JobEventBroadcaster
+from bfabric_web_apps.utils import redis_connection
+from bfabric_web_apps.utils.config import settings
+from bfabric_web_apps.utils.job_events import EventWorker, streaming_supported
+
+
+def succeed():
+    return 1
+
+
+def fail():
+    raise ValueError("broken")
+
+
+class InlineEventWorker(EventWorker):
+    """EventWorker running jobs in the test process, so fakeredis sees their state."""
+
+    execute_job = SimpleWorker.execute_job
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+def test_worker_publishes_job_transitions(server, monkeypatch):
+    monkeypatch.setattr(settings, "SCHEDULER_RECONCILE_INTERVAL", 0)
+    connection = fakeredis.FakeRedis(server=server)
+    pubsub = connection.pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe(settings.JOB_EVENTS_CHANNEL)
+    queue = Queue("events", connection=connection)
+    ok = queue.enqueue(succeed)
+    broken = queue.enqueue(fail)
+
+    InlineEventWorker([queue], connection=connection).work(burst=True)
+
+    events = []
+    deadline = time.monotonic() + 5
+    while len(events) < 4 and time.monotonic() < deadline:
+        message = pubsub.get_message(timeout=0.1)
+        if message is not None:
+            events.append(json.loads(message["data"]))
+    assert [(event["job_id"], event["status"]) for event in events] == [
+        (ok.id, "started"), (ok.id, "finished"), (broken.id, "started"), (broken.id, "failed"),
+    ]
+    assert {event["queue"] for event in events} == {"events"}
+
+
+def test_slow_clients_lose_the_oldest_events(monkeypatch):
+    broadcaster = JobEventBroadcaster(client_queue_size=2)
+    monkeypatch.setattr(broadcaster, "_ensure_started", lambda: None)
+    client = broadcaster.subscribe()
+
+    for i in range(3):
+        broadcaster.publish_local(str(i))
+
+    assert [client.get_nowait() for _ in range(2)] == ["1", "2"]
+    assert broadcaster.stats() == {"clients": 1, "events": 3, "dropped": 1}
+
+
+def test_stream_sends_events_and_keepalives(monkeypatch):
+    broadcaster = JobEventBroadcaster()
+    monkeypatch.setattr(broadcaster, "_ensure_started", lambda: None)
+    stream = broadcaster.stream(heartbeat=0.01)
+
+    assert next(stream) == "retry: 5000\n\n"
+    assert next(stream) == ": keepalive\n\n"
+    broadcaster.publish_local('{"status": "finished"}')
+    assert next(stream) == 'event: job\ndata: {"status": "finished"}\n\n'
+
+    stream.close()
+    assert broadcaster.stats()["clients"] == 0
+
+
+class BrokenRedis:
+    def pubsub(self, **kwargs):
+        raise ConnectionError("redis is gone")
+
+
+def test_subscription_reconnects_and_asks_clients_to_resync(server, monkeypatch):
+    connections = [BrokenRedis(), fakeredis.FakeRedis(server=server)]
+    monkeypatch.setattr(redis_connection, "get_redis_connection", lambda: connections.pop(0) if len(connections) > 1 else connections[0])
+    broadcaster = JobEventBroadcaster(channel="events")
+    client = broadcaster.subscribe()
+
+    assert json.loads(client.get(timeout=5))["status"] == "resync"
+
+    publisher = fakeredis.FakeRedis(server=server)
+    wait_for(lambda: publisher.pubsub_numsub("events")[0][1] == 1)
+    publisher.publish("events", '{"status": "started"}')
+    assert client.get(timeout=5) == '{"status": "started"}'
+
+
+@pytest.mark.parametrize("environ, override, expected", [
+    ({"wsgi.multithread": True}, None, True),
+    ({"wsgi.multithread": False}, None, False),
+    ({"wsgi.multithread": False}, True, True),
+    ({"wsgi.multithread": True}, False, False),
+])
+def test_streaming_is_refused_by_synchronous_servers(environ, override, expected, monkeypatch):
+    monkeypatch.setattr(settings, "JOB_EVENTS_STREAMING", override)
+
+    assert streaming_supported(environ) is expected
@@ -0,0 +1,116 @@
+import threading
+import time
+
+import fakeredis
+import pytest
+from rq.job import Job
+
+from bfabric_web_apps.objects import JobScheduler as job_scheduler_module
+from bfabric_web_apps.objects.JobScheduler import JobScheduler, SchedulerWorker
+
+CLASSES = {"small": {"cpu": 1, "timeout": 60}, "large": {"cpu": 2, "timeout": 60}}
+
+
+def noop():
+    pass
+
+
+@pytest.fixture
+def scheduler():
+    return JobScheduler("test", connection=fakeredis.FakeRedis(), capacity={"cpu": 2}, resource_classes=CLASSES)
+
+
+def queued_users(scheduler):
+    return [Job.fetch(job_id, connection=scheduler.connection).meta["scheduler"]["user"] for job_id in scheduler.queue.job_ids]
+
+
+def finish(scheduler, job):
+    job.set_status("finished")
+    scheduler.release(job.id)
+    scheduler.dispatch()
+
+
+def test_jobs_are_dispatched_round_robin_across_users(scheduler):
+    blocker = scheduler.enqueue(noop, user="carol", resource_class="large")
+    alice = [scheduler.enqueue(noop, user="alice") for _ in range(3)]
+    scheduler.enqueue(noop, user="bob")
+
+    # Two slots free up: alice's first job and bob's job run, not two of alice's
+    finish(scheduler, blocker)
+    assert queued_users(scheduler)[1:] == ["alice", "bob"]
+    assert scheduler.stats()["pending"]["normal"] == {"alice": 2}
+
+    finish(scheduler, alice[0])
+    assert queued_users(scheduler)[1:] == ["alice", "bob", "alice"]
+
+
+def test_higher_priority_is_dispatched_first(scheduler):
+    blocker = scheduler.enqueue(noop, user="alice", resource_class="large")
+    low = scheduler.enqueue(noop, user="alice", priority="low", resource_class="large")
+    high = scheduler.enqueue(noop, user="bob", priority="high", resource_class="large")
+
+    finish(scheduler, blocker)
+
+    assert high.id in scheduler.queue.job_ids
+    assert low.id not in scheduler.queue.job_ids
+    assert scheduler.stats()["pending"]["low"] == {"alice": 1}
+
+
+def test_release_frees_slots_once(scheduler):
+    job = scheduler.enqueue(noop, user="alice", resource_class="large")
+    assert scheduler.stats()["used"] == {"cpu": 2}
+
+    assert scheduler.release(job.id)
+    assert not scheduler.release(job.id)
+    assert scheduler.stats()["used"] == {"cpu": 0}
+
+
+def test_reconcile_releases_ended_jobs(scheduler):
+    job = scheduler.enqueue(noop, user="alice", resource_class="large")
+    job.delete()
+
+    assert scheduler.reconcile() == [job.id]
+    assert scheduler.stats()["used"] == {"cpu": 0}
+
+
+def test_stale_pending_job_is_dropped(scheduler):
+    running = scheduler.enqueue(noop, user="alice", resource_class="large")
+    stale = scheduler.enqueue(noop, user="alice")
+    waiting = scheduler.enqueue(noop, user="alice")
+    stale.delete()
+
+    finish(scheduler, running)
+
+    assert scheduler.queue.job_ids == [running.id, waiting.id]
+    assert scheduler.decisions()[1]["action"] == "dropped"
+
+
+def test_release_error_does_not_fail_the_job(scheduler, monkeypatch):
+    def broken(job, connection):
+        raise ConnectionError("redis is gone")
+
+    monkeypatch.setattr(job_scheduler_module, "release_scheduled_job", broken)
+    worker = SchedulerWorker([scheduler.queue], connection=scheduler.connection)
+    job = scheduler.enqueue(noop, user="alice")
+
+    worker._release(job)
+
+
+def test_worker_reconciles_periodically(scheduler):
+    job = scheduler.enqueue(noop, user="alice", resource_class="large")
+    job.delete()
+    worker = SchedulerWorker([scheduler.queue], connection=scheduler.connection)
+    stop = threading.Event()
+
+    thread = threading.Thread(target=worker._reconcile_periodically, args=(stop, 0.01))
+    thread.start()
+    try:
+        for _ in range(100):
+            if scheduler.stats()["used"] == {"cpu": 0}:
+                break
+            time.sleep(0.01)
+    finally:
+        stop.set()
+        thread.join()
+
+    assert scheduler.stats()["used"] == {"cpu": 0}
@@ -0,0 +1,71 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+import bfabric_web_apps
+
+
+def run_python(code):
+    """Runs code in a fresh interpreter, so imports done by other tests do not interfere."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, "-c", textwrap.dedent(code)], capture_output=True, text=True, cwd=root)
+    assert result.returncode == 0, result.stderr
+    return result.stdout.strip()
+
+
+def test_import_does_not_load_heavy_dependencies():
+    loaded = run_python("""
+        import sys
+        import bfabric_web_apps
+        bfabric_web_apps.CONFIG_FILE_PATH
+        print(sorted(name for name in ("dash", "rq", "redis", "bfabric", "polars") if name in sys.modules))
+    """)
+
+    assert loaded == "[]"
+
+
+def test_exports_are_imported_on_first_access():
+    output = run_python("""
+        import sys
+        import bfabric_web_apps
+        assert "bfabric_web_apps.utils.dataset_utils" not in sys.modules
+        function = bfabric_web_apps.dataset_to_dictionary
+        assert "bfabric_web_apps.utils.dataset_utils" in sys.modules
+        assert vars(bfabric_web_apps)["dataset_to_dictionary"] is function
+        print(function.__module__)
+    """)
+
+    assert output == "bfabric_web_apps.utils.dataset_utils"
+
+
+def test_assigned_config_file_path_is_used_by_the_power_user_client():
+    config_path = run_python("""
+        import bfabric_web_apps
+        from bfabric_web_apps.utils import get_power_user_wrapper as module
+
+        class FakeBfabric:
+            @classmethod
+            def from_config(cls, config_path, config_env):
+                return config_path
+
+        module.Bfabric = FakeBfabric
+        bfabric_web_apps.CONFIG_FILE_PATH = "/etc/bfabric/app.yml"
+        print(bfabric_web_apps.get_power_user_wrapper({"environment": "Test"}))
+    """)
+
+    assert config_path == "/etc/bfabric/app.yml"
+
+
+def test_settings_are_read_from_the_config():
+    assert bfabric_web_apps.REDIS_PORT == bfabric_web_apps.config.REDIS_PORT
+
+
+def test_unknown_names_raise_attribute_error():
+    with pytest.raises(AttributeError):
+        bfabric_web_apps.not_exported
+
+    assert "run_main_job" in dir(bfabric_web_apps)
+    assert "not_exported" not in dir(bfabric_web_apps)
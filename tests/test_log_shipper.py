@@ -0,0 +1,128 @@
+import time
+
+import pytest
+
+from bfabric_web_apps.objects import LogShipper as log_shipper_module
+from bfabric_web_apps.objects.LogShipper import LogShipper
+
+
+class StubWrapper:
+    """Records `job` saves; the first `failures` saves of each job raise."""
+
+    def __init__(self, failures=0, always_fail=()):
+        self.failures = failures
+        self.always_fail = set(always_fail)
+        self.attempts = {}
+        self.saved = []
+
+    def save(self, endpoint, obj):
+        attempt = self.attempts.get(obj["id"], 0)
+        self.attempts[obj["id"]] = attempt + 1
+        if obj["id"] in self.always_fail or attempt < self.failures:
+            raise ConnectionError("B-Fabric is unavailable")
+        self.saved.append((endpoint, obj["id"], obj["logthis"]))
+
+
+@pytest.fixture
+def wrapper(monkeypatch):
+    stub = StubWrapper()
+    monkeypatch.setattr(log_shipper_module, "get_power_user_wrapper", lambda token_data: stub)
+    return stub
+
+
+def make_shipper(**kwargs):
+    shipper = LogShipper(**{"batch_size": 1000, "flush_interval": 60, "max_retries": 3, **kwargs})
+    shipper._retry_delay = lambda attempt: 0.01
+    return shipper
+
+
+def test_lines_are_saved_once_the_batch_is_full(wrapper):
+    shipper = make_shipper(batch_size=3)
+
+    shipper.submit(1, "TEST", ["a", "b"])
+    time.sleep(0.1)
+    assert wrapper.saved == []
+
+    shipper.submit(1, "TEST", ["c"])
+    assert shipper.flush(timeout=5)
+    assert wrapper.saved == [("job", 1, "a\nb\nc")]
+
+
+def test_submissions_are_coalesced_per_job(wrapper):
+    shipper = make_shipper()
+
+    shipper.submit(1, "TEST", ["a"])
+    shipper.submit(2, "TEST", ["x"])
+    shipper.submit(1, "TEST", ["b"])
+    assert shipper.flush(timeout=5)
+
+    assert sorted(wrapper.saved) == [("job", 1, "a\nb"), ("job", 2, "x")]
+    assert shipper.stats()["saves"] == 2
+    assert shipper.stats()["shipped"] == 3
+
+
+def test_failed_saves_are_retried(wrapper):
+    wrapper.failures = 2
+    shipper = make_shipper()
+
+    shipper.submit(1, "TEST", ["a"])
+    assert shipper.flush(timeout=5)
+    shipper.submit(1, "TEST", ["b"])
+    assert shipper.flush(timeout=5)
+
+    assert wrapper.saved == [("job", 1, "a"), ("job", 1, "b")]
+    assert shipper.stats()["retries"] == 2
+    assert shipper.stats()["dropped"] == 0
+
+
+def test_lines_are_dropped_after_the_last_retry(wrapper):
+    wrapper.always_fail = {1}
+    shipper = make_shipper(max_retries=2)
+
+    shipper.submit(1, "TEST", ["a", "b"])
+    assert shipper.flush(timeout=5)
+
+    assert wrapper.saved == []
+    assert wrapper.attempts[1] == 3
+    assert shipper.stats()["retries"] == 2
+    assert shipper.stats()["dropped"] == 2
+
+
+def test_backoff_does_not_block_other_jobs(wrapper):
+    wrapper.always_fail = {1}
+    shipper = make_shipper(batch_size=1)
+    shipper._retry_delay = lambda attempt: 30
+
+    shipper.submit(1, "TEST", ["a"])
+    shipper.submit(2, "TEST", ["x"])
+
+    deadline = time.monotonic() + 5
+    while not wrapper.saved and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert wrapper.saved == [("job", 2, "x")]
+    assert wrapper.attempts[1] == 1
+
+
+def test_lines_submitted_during_backoff_follow_the_failed_ones(wrapper):
+    wrapper.failures = 1
+    shipper = make_shipper(batch_size=1)
+    shipper._retry_delay = lambda attempt: 0.2
+
+    shipper.submit(1, "TEST", ["a"])
+    time.sleep(0.05)
+    shipper.submit(1, "TEST", ["b"])
+    assert shipper.flush(timeout=5)
+
+    assert wrapper.saved == [("job", 1, "a\nb")]
+
+
+def test_pending_lines_are_flushed_on_exit(wrapper, monkeypatch):
+    registered = []
+    monkeypatch.setattr(log_shipper_module.atexit, "register", registered.append)
+    shipper = make_shipper()
+
+    shipper.submit(1, "TEST", ["a"])
+    assert registered == [shipper.close]
+
+    registered[0]()
+    assert wrapper.saved == [("job", 1, "a")]
@@ -0,0 +1,78 @@
+import pickle
+import threading
+
+import pytest
+
+from bfabric_web_apps.objects import Logger as logger_module
+from bfabric_web_apps.objects.Logger import Logger
+from bfabric_web_apps.utils.config import settings
+
+
+class StubWrapper:
+    """Stand-in for a live Bfabric client, which cannot be pickled."""
+
+    def __init__(self):
+        self.saved = []
+
+    def save(self, endpoint, obj):
+        self.saved.append((endpoint, obj))
+
+    def __reduce__(self):
+        raise TypeError("cannot pickle a live client")
+
+
+@pytest.fixture
+def wrappers(monkeypatch):
+    monkeypatch.setattr(settings, "LOG_SHIPPER_ENABLED", False)
+    wrappers = {}
+    monkeypatch.setattr(logger_module, "get_power_user_wrapper",
+                        lambda token_data: wrappers.setdefault((token_data["environment"], threading.get_ident()), StubWrapper()))
+    return wrappers
+
+
+def test_pickle_leaves_out_the_client(wrappers):
+    logger = Logger(1, "alice", "Test")
+    logger.power_user_wrapper = StubWrapper()
+    logger.log_operation("Login", "first", flush_logs=False)
+
+    restored = Logger.from_pickle(logger.to_pickle())
+
+    assert (restored.jobid, restored.username, restored.environment, restored.logs) == (1, "alice", "Test", logger.logs)
+    assert restored.power_user_wrapper is wrappers[("Test", threading.get_ident())]
+
+
+def test_pickles_of_the_eager_logger_are_restored():
+    logger = Logger.__new__(Logger)
+    state = {"jobid": 1, "username": "alice", "logs": [], "power_user_wrapper": None}
+
+    logger.__setstate__(state)
+
+    assert logger.environment is None
+    assert logger._power_user_wrapper is None
+    assert "power_user_wrapper" not in logger.__dict__
+
+
+def test_dict_round_trip(wrappers):
+    logger = Logger(1, "alice", "Test")
+    logger.log_operation("Login", "first", flush_logs=False)
+
+    restored = Logger.from_dict(logger.to_dict())
+
+    assert restored.to_dict() == logger.to_dict()
+    assert pickle.loads(pickle.dumps(logger.to_dict())) == logger.to_dict()
+
+    restored.flush_logs()
+    assert wrappers[("Test", threading.get_ident())].saved == [("job", {"id": 1, "logthis": logger.logs[0]})]
+    assert restored.logs == []
+
+
+def test_each_thread_flushes_with_its_own_client(wrappers):
+    logger = Logger(1, "alice", "Test")
+    thread = threading.Thread(target=lambda: logger.log_operation("Step", "in a thread"))
+    thread.start()
+    thread.join()
+
+    logger.log_operation("Step", "in the main thread")
+
+    assert len(wrappers) == 2
+    assert all(len(wrapper.saved) == 1 for wrapper in wrappers.values())
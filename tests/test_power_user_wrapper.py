@@ -0,0 +1,112 @@
+import os
+import threading
+
+import pytest
+
+import bfabric_web_apps
+from bfabric_web_apps.utils import get_power_user_wrapper as power_user_module
+from bfabric_web_apps.utils import resource_utilities
+from bfabric_web_apps.utils.get_power_user_wrapper import get_power_user_wrapper, clear_power_user_wrappers
+
+
+@pytest.fixture
+def built(monkeypatch, tmp_path):
+    config = tmp_path / ".bfabricpy.yml"
+    config.write_text("config")
+    monkeypatch.setattr(bfabric_web_apps, "CONFIG_FILE_PATH", str(config))
+
+    built = []
+
+    class FakeBfabric:
+        @classmethod
+        def from_config(cls, config_path, config_env):
+            built.append(config_env)
+            return object()
+
+    monkeypatch.setattr(power_user_module, "Bfabric", FakeBfabric)
+    clear_power_user_wrappers()
+    yield built
+    clear_power_user_wrappers()
+
+
+def in_thread(func):
+    result = []
+    thread = threading.Thread(target=lambda: result.append(func()))
+    thread.start()
+    thread.join()
+    return result[0]
+
+
+def test_client_is_cached_per_environment(built):
+    test = get_power_user_wrapper({"environment": "Test"})
+
+    assert get_power_user_wrapper({"environment": "test"}) is test
+    assert get_power_user_wrapper({"environment": "Production"}) is not test
+    assert built == ["TEST", "PRODUCTION"]
+
+
+def test_client_is_rebuilt_when_the_config_file_changes(built):
+    token_data = {"environment": "Test"}
+    first = get_power_user_wrapper(token_data)
+    os.utime(bfabric_web_apps.CONFIG_FILE_PATH, (0, 0))
+
+    second = get_power_user_wrapper(token_data)
+
+    assert second is not first
+    assert get_power_user_wrapper(token_data) is second
+    assert built == ["TEST", "TEST"]
+
+
+def test_clients_are_rebuilt_after_clearing(built):
+    first = get_power_user_wrapper({"environment": "Test"})
+    clear_power_user_wrappers()
+
+    assert get_power_user_wrapper({"environment": "Test"}) is not first
+    assert built == ["TEST", "TEST"]
+
+
+def test_each_thread_gets_its_own_client(built):
+    token_data = {"environment": "Test"}
+    main = get_power_user_wrapper(token_data)
+    barrier = threading.Barrier(2, timeout=2)
+
+    def hold_client(results):
+        results.append(get_power_user_wrapper(token_data))
+        barrier.wait()
+
+    results = []
+    threads = [threading.Thread(target=hold_client, args=(results,)) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert get_power_user_wrapper(token_data) is main
+    assert len({id(main), *map(id, results)}) == 3
+    assert built == ["TEST"] * 3
+
+
+def test_clients_of_ended_threads_are_reused(built):
+    first = in_thread(lambda: get_power_user_wrapper({"environment": "Test"}))
+
+    assert in_thread(lambda: get_power_user_wrapper({"environment": "Test"})) is first
+    assert len(built) == 1
+
+
+def test_register_resources_saves_with_a_client_per_thread(monkeypatch):
+    clients = {}
+
+    def client_of_thread(token_data):
+        return clients.setdefault(threading.get_ident(), object())
+
+    def save_in_chunks(wrapper, endpoint, objs, chunk_size=None, lookup=None):
+        assert wrapper is clients[threading.get_ident()]
+        return [({"id": 1}, None) for _ in objs]
+
+    monkeypatch.setattr(resource_utilities, "get_power_user_wrapper", client_of_thread)
+    monkeypatch.setattr(resource_utilities, "save_in_chunks", save_in_chunks)
+
+    report = resource_utilities.register_resources({}, {f"/data/{i}.txt": 7 for i in range(6)}, chunk_size=1, max_workers=3)
+
+    assert report["total"] == 6
+    assert threading.get_ident() not in clients
@@ -0,0 +1,106 @@
+import time
+
+import dash_bootstrap_components as dbc
+import fakeredis
+import pytest
+from dash import Patch, no_update
+from rq import Queue
+from rq.registry import StartedJobRegistry, FinishedJobRegistry
+
+from bfabric_web_apps.utils import queue_monitor
+from bfabric_web_apps.utils.callbacks import get_redis_queue_updates
+from bfabric_web_apps.utils.queue_monitor import get_queue_snapshot, get_queue_changes, get_registry_page
+
+
+def noop():
+    pass
+
+
+@pytest.fixture
+def connection(monkeypatch):
+    connection = fakeredis.FakeRedis()
+    monkeypatch.setattr(queue_monitor, "get_redis_connection", lambda: connection)
+    return connection
+
+
+def add_started(queue, alive=True):
+    job = queue.enqueue(noop)
+    registry = StartedJobRegistry(queue=queue)
+    if alive:
+        registry.add(job, 60)
+    else:
+        # Entry of a worker that died: its heartbeat expired, but the registry was not cleaned yet
+        queue.connection.zadd(registry.key, {job.id: time.time() - 10})
+    return job
+
+
+def finish(queue):
+    job = queue.enqueue(noop)
+    FinishedJobRegistry(queue=queue).add(job, -1)
+    return job
+
+
+def test_snapshot_skips_expired_registry_entries(connection):
+    queue = Queue("light", connection=connection)
+    alive = add_started(queue)
+    add_started(queue, alive=False)
+
+    snapshot = get_queue_snapshot()
+
+    assert snapshot["light"]["stats"]["Running"] == 1
+    assert [job["id"] for job in snapshot["light"]["jobs"] if job["status"] == "Running"] == [alive.id]
+    assert get_registry_page("light", "started")["total"] == 1
+
+
+def test_finished_jobs_without_expiry_are_counted(connection):
+    queue = Queue("light", connection=connection)
+    finish(queue)
+
+    assert get_queue_snapshot()["light"]["stats"]["Completed"] == 1
+
+
+def test_changes_report_only_the_queues_that_changed(connection):
+    light = Queue("light", connection=connection)
+    heavy = Queue("heavy", connection=connection)
+    light.enqueue(noop)
+    heavy.enqueue(noop)
+
+    _, changed, cursor = get_queue_changes()
+    assert sorted(changed) == ["heavy", "light"]
+
+    _, changed, cursor = get_queue_changes(cursor)
+    assert changed == []
+
+    finish(heavy)
+    snapshot, changed, cursor = get_queue_changes(cursor)
+    assert changed == ["heavy"]
+    assert snapshot["heavy"]["stats"]["Completed"] == 1
+
+
+def test_queue_updates_patch_only_changed_cards(connection):
+    light = Queue("light", connection=connection)
+    heavy = Queue("heavy", connection=connection)
+    light.enqueue(noop)
+    heavy.enqueue(noop)
+
+    layout, cursor = get_redis_queue_updates()
+    assert isinstance(layout, dbc.Container)
+
+    assert get_redis_queue_updates(cursor) == (no_update, no_update)
+
+    finish(light)
+    patch, cursor = get_redis_queue_updates(cursor)
+    assert isinstance(patch, Patch)
+    operations = patch.to_plotly_json()["operations"]
+    assert [operation["location"] for operation in operations] == [["props", "children", "props", "children", cursor["queues"].index("light")]]
+
+
+def test_queue_updates_rebuild_the_layout_when_queues_change(connection):
+    Queue("light", connection=connection).enqueue(noop)
+    _, cursor = get_redis_queue_updates()
+
+    Queue("heavy", connection=connection).enqueue(noop)
+    layout, cursor = get_redis_queue_updates(cursor)
+
+    assert isinstance(layout, dbc.Container)
+    assert cursor["queues"] == ["heavy", "light"]
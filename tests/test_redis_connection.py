@@ -0,0 +1,65 @@
+import pytest
+
+from bfabric_web_apps.utils import redis_connection
+from bfabric_web_apps.utils.config import settings
+from bfabric_web_apps.utils.redis_connection import get_redis_connection, redis_pool_stats
+
+
+@pytest.fixture(autouse=True)
+def connections(monkeypatch):
+    monkeypatch.setattr(redis_connection, "_connections", {})
+    monkeypatch.setattr(settings, "REDIS_HOST", "redis.example.org")
+    monkeypatch.setattr(settings, "REDIS_PORT", 6379)
+    monkeypatch.setattr(settings, "REDIS_USERNAME", None)
+    monkeypatch.setattr(settings, "REDIS_PASSWORD", None)
+    monkeypatch.setattr(settings, "REDIS_MAX_CONNECTIONS", 4)
+
+
+def test_client_is_created_lazily_and_shared():
+    client = get_redis_connection()
+
+    # No socket is opened before the first command
+    assert client.connection_pool._connections == []
+    assert get_redis_connection() is client
+    assert get_redis_connection("redis.example.org", "6379") is client
+
+
+def test_clients_are_keyed_by_server_and_user():
+    default = get_redis_connection()
+
+    assert get_redis_connection("redis.example.org", 6380) is not default
+    assert get_redis_connection("other.example.org", 6379) is not default
+    assert get_redis_connection("redis.example.org", 6379, "alice", "secret") is not default
+
+
+def test_pool_uses_the_settings():
+    pool = get_redis_connection("redis.example.org", 6379, "alice", "secret").connection_pool
+
+    assert pool.max_connections == 4
+    assert pool.connection_kwargs["username"] == "alice"
+    assert pool.connection_kwargs["socket_keepalive"] is True
+    assert pool.connection_kwargs["health_check_interval"] == settings.REDIS_HEALTH_CHECK_INTERVAL
+
+
+def test_credentials_are_only_used_together():
+    pool = get_redis_connection("redis.example.org", 6379, "alice", None).connection_pool
+
+    assert pool.connection_kwargs["username"] is None
+    assert pool.connection_kwargs["password"] is None
+
+
+def test_pool_stats_report_connections_in_use():
+    pool = get_redis_connection().connection_pool
+    assert redis_pool_stats() == {"redis.example.org:6379": {"max_connections": 4, "created": 0, "in_use": 0, "idle": 0}}
+
+    # Check out a connection the way the pool does, without connecting
+    pool.pool.get_nowait()
+    connection = pool.make_connection()
+    assert redis_pool_stats()["redis.example.org:6379"] == {"max_connections": 4, "created": 1, "in_use": 1, "idle": 0}
+
+    pool.release(connection)
+    assert redis_pool_stats()["redis.example.org:6379"] == {"max_connections": 4, "created": 1, "in_use": 0, "idle": 1}
+
+
+def test_legacy_redis_conn_is_the_shared_client():
+    assert redis_connection.redis_conn is get_redis_connection()
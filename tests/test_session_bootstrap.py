@@ -0,0 +1,90 @@
+import json
+import threading
+import time
+
+import pytest
+
+from bfabric_web_apps.utils import callbacks
+from bfabric_web_apps.utils.callbacks import bootstrap_session, process_url_and_token
+
+TOKEN_DATA = {"entityClass_data": "Order", "entity_id_data": 1, "environment": "Test", "jobId": 5, "application_data": "7"}
+
+
+@pytest.fixture
+def lookups(monkeypatch):
+    """Replaces the entity and application lookups; set "entity"/"app" to a callable per test."""
+    lookups = {
+        "entity": lambda token_data: json.dumps({"name": "Order 1"}),
+        "app": lambda token_data: json.dumps({"name": "App"}),
+    }
+    monkeypatch.setattr(callbacks.bfabric_interface, "entity_data", lambda token_data: lookups["entity"](token_data))
+    monkeypatch.setattr(callbacks.bfabric_interface, "app_data", lambda token_data: lookups["app"](token_data))
+    return lookups
+
+
+def sleeping(seconds, result):
+    def lookup(token_data):
+        time.sleep(seconds)
+        return json.dumps(result)
+    return lookup
+
+
+def test_lookups_run_concurrently(lookups):
+    barrier = threading.Barrier(2, timeout=2)
+
+    def waiting(result):
+        def lookup(token_data):
+            barrier.wait()  # Only passes if both lookups run at the same time
+            return json.dumps(result)
+        return lookup
+
+    lookups["entity"] = waiting({"name": "Order 1"})
+    lookups["app"] = waiting({"name": "App"})
+
+    entity_data, app_data, timings = bootstrap_session(TOKEN_DATA)
+
+    assert entity_data == {"name": "Order 1"}
+    assert app_data == {"name": "App"}
+    assert set(timings) == {"entity", "app", "bootstrap"}
+
+
+def test_failed_lookup_falls_back_to_an_empty_dictionary(lookups):
+    def broken(token_data):
+        raise ConnectionError("B-Fabric is unavailable")
+
+    lookups["app"] = broken
+
+    entity_data, app_data, _ = bootstrap_session(TOKEN_DATA)
+
+    assert entity_data == {"name": "Order 1"}
+    assert app_data == {}
+
+
+def test_timeout_is_shared_by_both_lookups(lookups):
+    lookups["entity"] = sleeping(0.3, {"name": "Order 1"})
+    lookups["app"] = sleeping(2, {"name": "App"})
+
+    start = time.perf_counter()
+    entity_data, app_data, timings = bootstrap_session(TOKEN_DATA, timeout=0.6)
+
+    assert time.perf_counter() - start < 1.5
+    assert entity_data == {"name": "Order 1"}
+    assert app_data == {}
+    assert "app" not in timings
+
+
+def test_session_details_use_the_fallbacks(lookups, monkeypatch):
+    monkeypatch.setattr(callbacks.bfabric_interface, "token_to_data", lambda token: json.dumps(TOKEN_DATA))
+
+    def broken(token_data):
+        raise ConnectionError("B-Fabric is unavailable")
+
+    lookups["entity"] = broken
+
+    token, token_data, entity_data, app_data, page_title, _, job_link = process_url_and_token("?token=abc")
+
+    assert token == "abc"
+    assert entity_data == {}
+    assert app_data == {"name": "App"}
+    assert page_title == "Order - Unknown (Test System)"
+    assert job_link.endswith("show.html?id=5&tab=details")
@@ -0,0 +1,69 @@
+import warnings
+
+import fakeredis
+import pytest
+
+from bfabric_web_apps.layouts import layouts
+from bfabric_web_apps.utils import callbacks, session_store
+
+
+@pytest.fixture
+def redis_conn(monkeypatch):
+    conn = fakeredis.FakeRedis()
+    monkeypatch.setattr(session_store, "get_redis_connection", lambda: conn)
+    return conn
+
+
+def store_ids(component):
+    ids = []
+    if type(component).__name__ == "Store":
+        ids.append(component.id)
+    children = getattr(component, "children", None)
+    for child in children if isinstance(children, list) else [children]:
+        if child is not None and not isinstance(child, str):
+            ids.extend(store_ids(child))
+    return ids
+
+
+def test_session_round_trip(redis_conn):
+    token_data = {"user_data": "alice", "jobId": 7, "token_expires": "2000-01-01 00:00:00"}
+    session_id = session_store.create_session("tok", token_data, {"id": 1}, {"name": "app"}, "https://job")
+
+    session = session_store.load_session(session_id)
+    assert session.exists()
+    assert session.token_data == token_data
+    assert session.entity_data == {"id": 1}
+    assert session.job_link == "https://job"
+    assert redis_conn.ttl(session_store._session_key(session_id)) > 0
+
+    session_store.delete_session(session_id)
+    assert not session_store.load_session(session_id).exists()
+    assert session_store.load_session(session_id).get("token_data", {}) == {}
+
+
+def test_bug_report_reads_the_session(redis_conn, monkeypatch):
+    token_data = {"user_data": "alice", "jobId": 7}
+    session_id = session_store.create_session("tok", token_data, {"id": 1}, {}, None)
+    sent = []
+
+    monkeypatch.setattr(callbacks, "get_logger", lambda token_data: None)
+    monkeypatch.setattr(callbacks.bfabric_interface, "token_to_data", lambda token: pytest.fail("token was validated again"))
+    monkeypatch.setattr(callbacks.bfabric_interface, "send_bug_report", lambda *args: sent.append(args) or True)
+
+    assert callbacks.submit_bug_report(1, "broken", session_id=session_id) == (True, False)
+    assert sent == [(token_data, {"id": 1}, "broken")]
+
+
+def test_layout_keeps_the_browser_stores_by_default():
+    with pytest.warns(DeprecationWarning):
+        default_ids = store_ids(layouts.get_static_layout("App"))
+
+    client_ids = store_ids(layouts.get_static_layout("App", layout_config={"client_stores": True}))
+    assert {"session_id", "token", "token_data", "entity", "app_data"} <= set(client_ids)
+    assert set(default_ids) == set(client_ids)
+
+
+def test_layout_can_keep_session_objects_server_side():
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        assert store_ids(layouts.get_static_layout("App", layout_config={"client_stores": False})) == ["session_id"]
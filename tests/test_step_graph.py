@@ -0,0 +1,120 @@
+import threading
+import time
+
+import pytest
+
+import bfabric_web_apps
+from bfabric_web_apps.objects.StepGraph import StepGraph, run_concurrently
+from bfabric_web_apps.utils import charging, get_power_user_wrapper as power_user_module
+from bfabric_web_apps.utils.config import settings
+
+
+def test_steps_run_after_their_dependencies():
+    order = []
+    graph = StepGraph(max_workers=4)
+    graph.add("save_files", lambda results: order.append("save_files") or "saved")
+    graph.add("bash", lambda results: order.append("bash") or results["save_files"] + " + ran", deps=["save_files"])
+    graph.add("charges", lambda results: order.append("charges"), deps=["bash"])
+
+    results = graph.run()
+
+    assert order == ["save_files", "bash", "charges"]
+    assert results["bash"] == "saved + ran"
+
+
+def test_independent_steps_overlap():
+    barrier = threading.Barrier(2, timeout=2)
+    graph = StepGraph(max_workers=2)
+    graph.add("root", lambda results: None)
+    graph.add("datasets", lambda results: barrier.wait(), deps=["root"])
+    graph.add("resources", lambda results: barrier.wait(), deps=["root"])
+
+    graph.run()
+
+    assert graph.errors == {}
+
+
+def test_failed_step_is_recorded_and_dependents_still_run():
+    def broken(results):
+        raise RuntimeError("boom")
+
+    graph = StepGraph(max_workers=2)
+    graph.add("workunits", broken)
+    graph.add("resources", lambda results: results["workunits"] is None, deps=["workunits"])
+
+    results = graph.run()
+
+    assert isinstance(graph.errors["workunits"], RuntimeError)
+    assert results["resources"] is True
+
+
+def test_add_rejects_duplicate_and_unknown_steps():
+    graph = StepGraph()
+    graph.add("bash", lambda results: None)
+
+    with pytest.raises(ValueError):
+        graph.add("bash", lambda results: None)
+    with pytest.raises(ValueError):
+        graph.add("resources", lambda results: None, deps=["workunits"])
+
+
+def test_critical_path_follows_the_slowest_chain():
+    graph = StepGraph(max_workers=3)
+    graph.add("save_files", lambda results: None)
+    graph.add("bash", lambda results: time.sleep(0.2), deps=["save_files"])
+    graph.add("attachments", lambda results: None, deps=["save_files"])
+    graph.add("workunits", lambda results: time.sleep(0.05), deps=["bash"])
+
+    graph.run()
+
+    assert [name for name, _ in graph.critical_path()] == ["save_files", "bash", "workunits"]
+    assert graph.timing_report().startswith("Total ")
+
+
+def test_run_concurrently_keeps_item_order():
+    def slow_square(value):
+        time.sleep(0.01 * (5 - value))
+        return value * value
+
+    assert run_concurrently(slow_square, range(5), max_workers=5) == [0, 1, 4, 9, 16]
+    assert run_concurrently(slow_square, [3]) == [9]
+    assert run_concurrently(slow_square, []) == []
+
+
+def test_concurrent_charges_use_a_client_per_thread(monkeypatch, tmp_path):
+    clients = []
+
+    class FakeBfabric:
+        def __init__(self):
+            self.threads = set()
+            clients.append(self)
+
+        @classmethod
+        def from_config(cls, config_path, config_env):
+            return cls()
+
+        def read(self, endpoint, query):
+            self.threads.add(threading.get_ident())
+            return [{"id": 1}]
+
+        def save(self, endpoint, obj):
+            self.threads.add(threading.get_ident())
+            time.sleep(0.01)
+            return [dict(obj, id=obj.get("containerid"))]
+
+    config = tmp_path / ".bfabricpy.yml"
+    config.write_text("config")
+    monkeypatch.setattr(bfabric_web_apps, "CONFIG_FILE_PATH", str(config))
+    monkeypatch.setattr(power_user_module, "Bfabric", FakeBfabric)
+    monkeypatch.setattr(settings, "LOG_SHIPPER_ENABLED", False)
+    power_user_module.clear_power_user_wrappers()
+
+    try:
+        token_data = {"environment": "Test", "jobId": 1, "user_data": "alice"}
+        charges = run_concurrently(lambda container_id: charging.create_charge(token_data, container_id, 5)[0]["id"], range(4), max_workers=4)
+    finally:
+        power_user_module.clear_power_user_wrappers()
+
+    assert charges == [0, 1, 2, 3]
+    assert len(clients) > 1
+    assert all(len(client.threads) == 1 for client in clients)
@@ -0,0 +1,67 @@
+import pytest
+
+from bfabric_web_apps.objects import TTLCache as ttl_cache_module
+from bfabric_web_apps.objects.TTLCache import TTLCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(ttl_cache_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_get_returns_stored_value_until_expiry(clock):
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("token", "data")
+
+    clock[0] += 59
+    assert cache.get("token") == "data"
+
+    clock[0] += 1
+    assert cache.get("token", "missing") == "missing"
+    assert len(cache) == 0
+
+
+def test_per_entry_ttl_overrides_default(clock):
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("short", 1, ttl=5)
+    cache.set("long", 2)
+
+    clock[0] += 10
+    assert cache.get("short") is None
+    assert cache.get("long") == 2
+
+
+def test_non_positive_ttl_is_not_stored(clock):
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("expired token", "data", ttl=-1)
+
+    assert cache.get("expired token") is None
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_invalidate_and_stats(clock):
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1)
+
+    assert cache.invalidate("a") is True
+    assert cache.invalidate("a") is False
+    assert cache.get("a") is None
+
+    stats = cache.stats()
+    assert stats["size"] == 0
+    assert stats["hits"] == 0
+    assert stats["misses"] == 1
@@ -0,0 +1,80 @@
+import signal
+
+import pytest
+
+from bfabric_web_apps.utils import redis_worker_init
+from bfabric_web_apps.utils.redis_worker_init import plan_worker_processes, _drain_workers
+
+
+@pytest.mark.parametrize("processes, concurrency, expected", [
+    (3, None, [["light", "heavy"]] * 3),
+    (4, {"heavy": 1}, [["heavy"], ["light"], ["light"], ["light"]]),
+    (2, {"light": 1, "heavy": 1}, [["light"], ["heavy"]]),
+])
+def test_plan_worker_processes(processes, concurrency, expected):
+    assert plan_worker_processes(["light", "heavy"], processes, concurrency) == expected
+
+
+def test_plan_caps_limits_exceeding_the_processes(capsys):
+    plan = plan_worker_processes(["light", "heavy"], 3, {"heavy": 5})
+
+    assert plan == [["heavy"]] * 3
+    assert "exceed 3 processes" in capsys.readouterr().out
+
+
+class FakeProcess:
+    """Worker process stub exiting after `exits_after` SIGTERMs, or only when killed if None."""
+
+    def __init__(self, pid, exits_after):
+        self.pid = pid
+        self.name = f"rq-worker-{pid}"
+        self.exits_after = exits_after
+        self.signals = []
+        self.killed = False
+
+    def is_alive(self):
+        return not self.killed and (self.exits_after is None or len(self.signals) < self.exits_after)
+
+    def join(self, timeout=None):
+        pass
+
+    def kill(self):
+        self.killed = True
+
+
+@pytest.fixture
+def processes(monkeypatch):
+    processes = {}
+
+    def kill(pid, signum):
+        processes[pid].signals.append(signum)
+
+    monkeypatch.setattr(redis_worker_init.os, "kill", kill)
+
+    def make(pid, exits_after):
+        processes[pid] = FakeProcess(pid, exits_after)
+        return processes[pid]
+    return make
+
+
+def test_drain_stops_idle_workers_with_one_sigterm(processes):
+    workers = [processes(1, exits_after=1), processes(2, exits_after=1)]
+
+    _drain_workers(workers, drain_timeout=None)
+
+    assert [worker.signals for worker in workers] == [[signal.SIGTERM], [signal.SIGTERM]]
+    assert not any(worker.killed for worker in workers)
+
+
+def test_drain_escalates_for_busy_and_stuck_workers(processes):
+    idle = processes(1, exits_after=1)
+    busy = processes(2, exits_after=2)
+    stuck = processes(3, exits_after=None)
+
+    _drain_workers([idle, busy, stuck], drain_timeout=0)
+
+    assert idle.signals == [signal.SIGTERM]
+    assert busy.signals == [signal.SIGTERM, signal.SIGTERM]
+    assert not busy.killed
+    assert stuck.signals == [signal.SIGTERM, signal.SIGTERM]
+    assert stuck.killed
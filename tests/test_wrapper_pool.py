@@ -0,0 +1,38 @@
+import pytest
+
+from bfabric_web_apps.objects.BfabricInterface import BfabricInterface
+
+
+@pytest.fixture
+def interface(monkeypatch):
+    interface = BfabricInterface()
+    interface._wrappers.clear()
+    monkeypatch.setattr(interface, "token_response_to_bfabric", lambda token_data: object())
+    yield interface
+    interface._wrappers.clear()
+
+
+def token_data(user, password):
+    return {"user_data": user, "environment": "Test", "userWsPassword": password}
+
+
+def test_wrapper_is_reused_for_the_same_credentials(interface):
+    first = interface.get_wrapper(token_data("alice", "secret"))
+
+    assert interface.get_wrapper(token_data("alice", "secret")) is first
+    assert interface.get_wrapper(token_data("bob", "other")) is not first
+
+
+def test_wrapper_is_not_reused_with_other_credentials(interface):
+    first = interface.get_wrapper(token_data("alice", "secret"))
+
+    assert interface.get_wrapper(token_data("alice", "changed")) is not first
+
+
+def test_token_data_is_required(interface):
+    interface.get_wrapper(token_data("alice", "secret"))
+
+    with pytest.raises(RuntimeError):
+        interface.get_wrapper(None)
+    with pytest.raises(RuntimeError):
+        interface.get_wrapper({"user_data": "alice", "environment": "Test"})